@@ -1,6 +1,21 @@
+from collections import defaultdict
+from datetime import timedelta
+
 from django.contrib import admin
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from agenda_modesta.core.loadtest import percentil_exato
+from agenda_modesta.subscriptions.models import Subscritor
 
-from .models import Agenda, GoogleCalendarChannel
+from .models import Agenda, ExecucaoSync, GoogleCalendarChannel
+
+# Resumo por tenant no topo da lista de ExecucaoSync
+JANELA_RESUMO = timedelta(days=7)
+# Resyncs por 410 na janela a partir dos quais o tenant é sinalizado
+LIMIAR_RESYNC_410 = 3
+# Execuções mais recentes lidas para o p95 (o resto do resumo é agregado no banco)
+AMOSTRA_P95 = 20_000
 
 
 @admin.register(Agenda)
@@ -22,3 +37,69 @@ class GoogleCalendarChannelAdmin(admin.ModelAdmin):
     list_display = ["channel_id", "subscritor", "expiration", "criado_em"]
     readonly_fields = ["id", "channel_id", "resource_id", "criado_em"]
     list_filter = ["subscritor"]
+
+
+def resumo_por_subscritor(desde) -> list[dict]:
+    """
+    Execuções, p95 de duração, resyncs por 410 e erros de cada subscritor
+    desde ``desde``. Sinalizados primeiro, depois pelo p95 mais alto.
+
+    As contagens saem agregadas do banco; para o p95 só as
+    ``AMOSTRA_P95`` execuções mais recentes da janela vêm para o Python.
+    """
+    janela = ExecucaoSync.objects.filter(iniciado_em__gte=desde).order_by()
+    contagens = janela.values("subscritor_id").annotate(
+        execucoes=Count("pk"),
+        resyncs_410=Count("pk", filter=Q(resync_410=True)),
+        erros=Count("pk", filter=~Q(erro="")),
+    )
+    duracoes = defaultdict(list)
+    amostra = janela.order_by("-iniciado_em").values_list("subscritor_id", "duracao_ms")[:AMOSTRA_P95]
+    for subscritor_id, duracao_ms in amostra:
+        duracoes[subscritor_id].append(duracao_ms)
+
+    linhas = list(contagens)
+    subscritores = Subscritor.objects.select_related("usuario").in_bulk([linha["subscritor_id"] for linha in linhas])
+    resumo = []
+    for linha in linhas:
+        subscritor_id = linha.pop("subscritor_id")
+        valores = duracoes.get(subscritor_id)
+        resumo.append({
+            "subscritor": subscritores.get(subscritor_id, subscritor_id),
+            **linha,
+            "p95_ms": round(percentil_exato(sorted(valores), 0.95)) if valores else None,
+            "alerta": linha["resyncs_410"] >= LIMIAR_RESYNC_410,
+        })
+    return sorted(resumo, key=lambda linha: (not linha["alerta"], -(linha["p95_ms"] or 0)))
+
+
+@admin.register(ExecucaoSync)
+class ExecucaoSyncAdmin(admin.ModelAdmin):
+    change_list_template = "admin/agenda/execucaosync/change_list.html"
+    list_display = [
+        "iniciado_em", "subscritor", "origem", "tipo", "resync_410", "duracao_ms",
+        "chamadas_api", "paginas", "criados", "atualizados", "removidos", "pulados", "sucesso",
+    ]
+    list_filter = ["origem", "tipo", "resync_410"]
+    list_select_related = ["subscritor__usuario"]
+    search_fields = ["subscritor__nome_empresa", "google_calendar_id"]
+    date_hierarchy = "iniciado_em"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(boolean=True, description="Sucesso")
+    def sucesso(self, obj):
+        return obj.sucesso
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {
+            **(extra_context or {}),
+            "resumo_tenants": resumo_por_subscritor(timezone.now() - JANELA_RESUMO),
+            "janela_resumo_dias": JANELA_RESUMO.days,
+            "limiar_resync_410": LIMIAR_RESYNC_410,
+        }
+        return super().changelist_view(request, extra_context=extra_context)
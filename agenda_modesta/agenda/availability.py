@@ -0,0 +1,212 @@
+"""
+Busca de horários livres na agenda de um subscritor.
+
+Os intervalos ocupados são carregados com uma única consulta por faixa de datas
+e unidos com um sweep-line; os buracos resultantes, recortados pelo expediente
+de cada dia, viram as sugestões de horário.
+
+O resultado é cacheado por "versão" da agenda do subscritor: qualquer save ou
+delete de Agenda troca a versão (ver ``signals.py``) e invalida todas as
+entradas antigas de uma vez, sem precisar varrer chaves.
+"""
+
+import hashlib
+import time
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+CACHE_TIMEOUT = 10 * 60  # segundos
+_VERSAO_KEY = "agenda:versao:{subscritor_id}"
+
+
+# ---------------------------------------------------------------------------
+# Versão da agenda (invalidação de cache por tenant)
+# ---------------------------------------------------------------------------
+
+def get_versao_agenda(subscritor_id) -> int:
+    """Retorna a versão atual da agenda do subscritor (cria se não existir)."""
+    key = _VERSAO_KEY.format(subscritor_id=subscritor_id)
+    versao = cache.get(key)
+    if versao is None:
+        # time_ns garante que uma versão recriada após eviction nunca
+        # coincide com uma versão antiga ainda presente no cache.
+        cache.add(key, time.time_ns(), None)
+        versao = cache.get(key)
+    return versao
+
+
+def incrementar_versao_agenda(subscritor_id):
+    """Invalida todos os resultados cacheados da agenda do subscritor."""
+    key = _VERSAO_KEY.format(subscritor_id=subscritor_id)
+    cache.set(key, time.time_ns(), None)
+
+
+# ---------------------------------------------------------------------------
+# Algoritmo
+# ---------------------------------------------------------------------------
+
+def mesclar_intervalos(intervalos):
+    """
+    Une intervalos (inicio, fim) sobrepostos ou encostados via sweep-line.
+    Retorna a lista de blocos ocupados, ordenada e sem sobreposição.
+    """
+    eventos = []
+    for inicio, fim in intervalos:
+        if fim > inicio:
+            eventos.append((inicio, 1))
+            eventos.append((fim, -1))
+    # Em um mesmo instante, aberturas antes de fechamentos: blocos encostados
+    # (um termina às 10h, outro começa às 10h) viram um bloco só.
+    eventos.sort(key=lambda e: (e[0], -e[1]))
+
+    blocos = []
+    profundidade = 0
+    abertura = None
+    for instante, delta in eventos:
+        if profundidade == 0 and delta == 1:
+            abertura = instante
+        profundidade += delta
+        if profundidade == 0:
+            blocos.append((abertura, instante))
+    return blocos
+
+
+def _janelas_expediente(data_inicial, data_final, hora_inicio, hora_fim, tz):
+    """Gera (inicio, fim) do expediente de cada dia entre as datas (inclusive)."""
+    dia = data_inicial
+    while dia <= data_final:
+        inicio = timezone.make_aware(datetime.combine(dia, hora_inicio), tz)
+        fim = timezone.make_aware(datetime.combine(dia, hora_fim), tz)
+        if fim > inicio:
+            yield inicio, fim
+        dia += timedelta(days=1)
+
+
+def encontrar_horarios_livres(
+    ocupados,
+    duracao: timedelta,
+    data_inicial,
+    data_final,
+    hora_inicio,
+    hora_fim,
+    limite: int = 5,
+    passo: timedelta = timedelta(minutes=30),
+    a_partir_de=None,
+    tz=None,
+):
+    """
+    Retorna até ``limite`` horários livres (inicio, fim) de tamanho ``duracao``.
+
+    ``ocupados`` é um iterável de (inicio, fim) aware; ``hora_inicio`` e
+    ``hora_fim`` delimitam o expediente diário no fuso ``tz``. Dentro de cada
+    buraco, os candidatos avançam de ``passo`` em ``passo``. Horários antes de
+    ``a_partir_de`` são descartados.
+    """
+    tz = tz or timezone.get_current_timezone()
+    blocos = mesclar_intervalos(ocupados)
+    horarios = []
+    idx = 0
+
+    for janela_inicio, janela_fim in _janelas_expediente(
+        data_inicial, data_final, hora_inicio, hora_fim, tz,
+    ):
+        cursor = janela_inicio
+        if a_partir_de and a_partir_de > cursor:
+            cursor = a_partir_de
+
+        # Blocos que terminam antes da janela nunca mais interessam
+        while idx < len(blocos) and blocos[idx][1] <= janela_inicio:
+            idx += 1
+
+        j = idx
+        while cursor < janela_fim:
+            if j < len(blocos) and blocos[j][0] < janela_fim:
+                bloco_inicio, bloco_fim = blocos[j]
+                buraco_fim = min(bloco_inicio, janela_fim)
+                j += 1
+            else:
+                bloco_fim = None
+                buraco_fim = janela_fim
+
+            inicio = cursor
+            while inicio + duracao <= buraco_fim:
+                horarios.append((inicio, inicio + duracao))
+                if len(horarios) >= limite:
+                    return horarios
+                inicio += passo
+
+            if bloco_fim is None:
+                break
+            cursor = max(cursor, bloco_fim)
+
+    return horarios
+
+
+# ---------------------------------------------------------------------------
+# Consulta
+# ---------------------------------------------------------------------------
+
+def _arredondar_para_cima(dt, passo: timedelta):
+    """Arredonda ``dt`` para o próximo múltiplo de ``passo`` (a partir da hora cheia)."""
+    base = dt.replace(minute=0, second=0, microsecond=0)
+    passos = -(-(dt - base) // passo)  # ceil
+    return base + passos * passo
+
+
+def buscar_horarios_livres(
+    subscritor,
+    duracao: timedelta,
+    data_inicial,
+    data_final,
+    hora_inicio,
+    hora_fim,
+    limite: int = 5,
+    passo: timedelta = timedelta(minutes=30),
+):
+    """
+    Busca os próximos horários livres do subscritor, com cache por versão.
+
+    Faz uma única consulta pelos agendamentos que cruzam a janela pedida e
+    delega o cálculo a :func:`encontrar_horarios_livres`.
+    """
+    from .models import Agenda
+
+    tz = timezone.get_current_timezone()
+    a_partir_de = _arredondar_para_cima(timezone.localtime(timezone.now(), tz), passo)
+
+    params = (
+        duracao, data_inicial, data_final, hora_inicio, hora_fim,
+        limite, passo, a_partir_de,
+    )
+    digest = hashlib.md5(repr(params).encode(), usedforsecurity=False).hexdigest()
+    versao = get_versao_agenda(subscritor.pk)
+    key = f"agenda:horarios_livres:{subscritor.pk}:{versao}:{digest}"
+
+    horarios = cache.get(key)
+    if horarios is not None:
+        return horarios
+
+    janela_inicio = timezone.make_aware(datetime.combine(data_inicial, hora_inicio), tz)
+    janela_fim = timezone.make_aware(datetime.combine(data_final, hora_fim), tz)
+    ocupados = Agenda.objects.filter(
+        subscritor=subscritor,
+        data_inicio__lt=janela_fim,
+        data_fim__gt=janela_inicio,
+    ).values_list("data_inicio", "data_fim")
+
+    horarios = encontrar_horarios_livres(
+        ocupados,
+        duracao=duracao,
+        data_inicial=data_inicial,
+        data_final=data_final,
+        hora_inicio=hora_inicio,
+        hora_fim=hora_fim,
+        limite=limite,
+        passo=passo,
+        a_partir_de=a_partir_de,
+        tz=tz,
+    )
+    cache.set(key, horarios, CACHE_TIMEOUT)
+    return horarios
@@ -1,4 +1,7 @@
+from datetime import time, timedelta
+
 from django import forms
+from django.utils import timezone
 
 from agenda_modesta.projects.models import Projeto
 
@@ -67,3 +70,43 @@ class StepDetalhesForm(forms.Form):
         widget=forms.DateTimeInput(attrs={"class": "form-input", "type": "datetime-local"}),
     )
 
+
+
+class HorariosLivresForm(forms.Form):
+    """Parâmetros da busca de horários livres (querystring)."""
+    duracao = forms.IntegerField(
+        label="Duração (min)",
+        min_value=5,
+        max_value=24 * 60,
+        initial=60,
+        widget=forms.NumberInput(attrs={"class": "form-input", "step": 15}),
+    )
+    data_inicial = forms.DateField(required=False)
+    data_final = forms.DateField(required=False)
+    hora_inicio = forms.TimeField(required=False)
+    hora_fim = forms.TimeField(required=False)
+    limite = forms.IntegerField(required=False, min_value=1, max_value=50)
+
+    DIAS_PADRAO = 14
+    HORA_INICIO_PADRAO = time(9, 0)
+    HORA_FIM_PADRAO = time(18, 0)
+    LIMITE_PADRAO = 5
+
+    def clean(self):
+        cleaned = super().clean()
+        hoje = timezone.localdate()
+        cleaned["data_inicial"] = cleaned.get("data_inicial") or hoje
+        cleaned["data_final"] = cleaned.get("data_final") or (
+            cleaned["data_inicial"] + timedelta(days=self.DIAS_PADRAO)
+        )
+        cleaned["hora_inicio"] = cleaned.get("hora_inicio") or self.HORA_INICIO_PADRAO
+        cleaned["hora_fim"] = cleaned.get("hora_fim") or self.HORA_FIM_PADRAO
+        cleaned["limite"] = cleaned.get("limite") or self.LIMITE_PADRAO
+
+        if cleaned["data_final"] < cleaned["data_inicial"]:
+            raise forms.ValidationError("A data final deve ser posterior à inicial.")
+        if (cleaned["data_final"] - cleaned["data_inicial"]).days > 90:
+            raise forms.ValidationError("A janela de busca é limitada a 90 dias.")
+        if cleaned["hora_fim"] <= cleaned["hora_inicio"]:
+            raise forms.ValidationError("O fim do expediente deve ser após o início.")
+        return cleaned
@@ -5,26 +5,62 @@ Requer UMA das opções:
   GOOGLE_CALENDAR_CREDENTIALS_FILE – caminho para o arquivo JSON da service account
   GOOGLE_CALENDAR_CREDENTIALS_JSON – JSON da chave da service account (string)
 
-E obrigatoriamente:
-  GOOGLE_CALENDAR_ID – ID do calendário compartilhado
+Cada subscritor usa o próprio calendário (``Subscritor.google_calendar_id``,
+configurado no admin); quem não tiver um usa o compartilhado:
+  GOOGLE_CALENDAR_ID – ID do calendário compartilhado (padrão)
+
+Eventos, canais de webhook e sync_tokens ficam sempre amarrados ao
+calendário em que foram criados (``Agenda.google_calendar_id``,
+``GoogleCalendarChannel.google_calendar_id``).
 
 Para receber push notifications (webhook):
   GOOGLE_CALENDAR_WEBHOOK_URL – URL pública https que o Google chamará
                                  ex.: https://meudominio.com/agenda/google/webhook/
+
+Todas as chamadas pedem só os campos que usamos (``fields``, ver
+``CAMPOS_EVENTO``) e o cliente negocia gzip. Com
+``GOOGLE_API_MEDIR_TRAFEGO=True`` cada sync loga quantos bytes trafegou.
 """
 
+import gzip
+import hashlib
 import json
 import logging
+import random
+import time
 import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta, timezone as dt_tz
+from zoneinfo import ZoneInfo
 
+import httplib2
 from django.conf import settings
 from django.utils import timezone
 from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
 
+from agenda_modesta.core.metrics import Contador
+
+from .google_quota import executar
+
 logger = logging.getLogger(__name__)
 
+SYNC_ITENS = Contador(
+    "google_sync_itens_total", "Itens do sync Google→App por resultado (criado, atualizado, removido, pulado).",
+)
+
+# Partial responses: só os campos que o sync e o push leem de um evento
+CAMPOS_EVENTO = "id,status,etag,updated,summary,description,start,end,extendedProperties/private"
+CAMPOS_VERSAO = "id,etag,updated"  # resposta de insert/update (versao_evento)
+CAMPOS_LISTA_SYNC = f"nextPageToken,nextSyncToken,items({CAMPOS_EVENTO})"
+CAMPOS_LISTA_PROXIMOS = "items(id,summary,description,start,end,htmlLink)"
+CAMPOS_CANAL = "id,resourceId,expiration"
+
+# (acumulador, estimar_rede) de ``medir_trafego`` no contexto atual (None = não medindo)
+_trafego: ContextVar[tuple[dict, bool] | None] = ContextVar("google_trafego", default=None)
+
 
 # ---------------------------------------------------------------------------
 # Autenticação
@@ -51,68 +87,126 @@ def get_calendar_service():
             "Configure GOOGLE_CALENDAR_CREDENTIALS_FILE ou "
             "GOOGLE_CALENDAR_CREDENTIALS_JSON nas settings."
         )
-    return build("calendar", "v3", credentials=credentials)
+    # O googleapiclient já manda Accept-Encoding: gzip e "(gzip)" no
+    # User-Agent, que o Google exige para comprimir; o httplib2 descomprime.
+    http = _HttpMedido(AuthorizedHttp(credentials, http=httplib2.Http(timeout=30)))
+    return build("calendar", "v3", http=http)
+
+
+class _HttpMedido:
+    """Repassa as chamadas ao http do cliente, somando bytes dentro de ``medir_trafego``."""
+
+    def __init__(self, http):
+        self._http = http
+
+    def request(self, *args, **kwargs):
+        resp, conteudo = self._http.request(*args, **kwargs)
+        medicao = _trafego.get()
+        if medicao is not None and conteudo:
+            trafego, estimar_rede = medicao
+            trafego["requests"] += 1
+            trafego["json"] += len(conteudo)
+            if estimar_rede:
+                # O httplib2 não expõe o tamanho comprimido; estima recomprimindo
+                comprimido = "-content-encoding" in resp
+                trafego["rede"] += len(gzip.compress(conteudo)) if comprimido else len(conteudo)
+        return resp, conteudo
+
+    def __getattr__(self, nome):
+        return getattr(self._http, nome)
+
+
+def medicao_habilitada() -> bool:
+    return getattr(settings, "GOOGLE_API_MEDIR_TRAFEGO", False)
+
+
+@contextmanager
+def medir_trafego(estimar_rede: bool = True):
+    """
+    Soma requests e bytes de JSON das chamadas ao Google no bloco e, com
+    ``estimar_rede`` (custa uma recompressão por resposta), os bytes na rede.
+    """
+    externo = _trafego.get()
+    estimar_rede = estimar_rede or (externo is not None and externo[1])
+    trafego = {"requests": 0, "rede": 0, "json": 0}
+    token = _trafego.set((trafego, estimar_rede))
+    try:
+        yield trafego
+    finally:
+        _trafego.reset(token)
+        if externo is not None:  # medições aninhadas também contam no bloco de fora
+            for chave, valor in trafego.items():
+                externo[0][chave] += valor
 
 
 # ---------------------------------------------------------------------------
 # App → Google (push de eventos)
 # ---------------------------------------------------------------------------
 
-def criar_evento(agenda):
-    """Cria um evento no Google Calendar e retorna o event_id."""
+def criar_evento(agenda, **limites):
+    """
+    Cria um evento no Google Calendar e retorna o evento criado (id, etag, updated…).
+    ``limites`` (tentativas, espera_maxima) vão para ``google_quota.executar``.
+    """
     service = get_calendar_service()
     event_body = _agenda_to_event_body(agenda)
-    event = (
-        service.events()
-        .insert(
-            calendarId=settings.GOOGLE_CALENDAR_ID,
-            body=event_body,
-        )
-        .execute()
+    calendar_id = agenda.subscritor.calendario_google
+    event = executar(
+        service.events().insert(calendarId=calendar_id, body=event_body, fields=CAMPOS_VERSAO),
+        calendar_id,
+        **limites,
     )
     logger.info("Evento Google criado: %s", event["id"])
-    return event["id"]
+    return event
 
 
-def atualizar_evento(agenda):
-    """Atualiza um evento existente ou cria um novo se não houver ID."""
+def atualizar_evento(agenda, **limites):
+    """Atualiza um evento existente (ou cria, se não houver ID) e retorna o evento."""
     if not agenda.google_event_id:
-        return criar_evento(agenda)
+        return criar_evento(agenda, **limites)
     service = get_calendar_service()
     event_body = _agenda_to_event_body(agenda)
-    event = (
-        service.events()
-        .update(
-            calendarId=settings.GOOGLE_CALENDAR_ID,
-            eventId=agenda.google_event_id,
-            body=event_body,
-        )
-        .execute()
+    calendar_id = calendario_da_agenda(agenda)
+    event = executar(
+        service.events().update(
+            calendarId=calendar_id, eventId=agenda.google_event_id, body=event_body, fields=CAMPOS_VERSAO,
+        ),
+        calendar_id,
+        **limites,
     )
     logger.info("Evento Google atualizado: %s", event["id"])
-    return event["id"]
+    return event
 
 
-def deletar_evento(agenda):
+def deletar_evento(agenda, **limites):
     """Remove o evento do Google Calendar."""
     if not agenda.google_event_id:
         return
+    remover_evento(calendario_da_agenda(agenda), agenda.google_event_id, **limites)
+
+
+def remover_evento(calendar_id: str, event_id: str, **limites):
+    """Remove um evento pelo id; serve também depois que a Agenda já foi apagada."""
     service = get_calendar_service()
-    service.events().delete(
-        calendarId=settings.GOOGLE_CALENDAR_ID,
-        eventId=agenda.google_event_id,
-    ).execute()
-    logger.info("Evento Google deletado: %s", agenda.google_event_id)
+    executar(service.events().delete(calendarId=calendar_id, eventId=event_id), calendar_id, **limites)
+    logger.info("Evento Google deletado: %s", event_id)
+
+
+def calendario_da_agenda(agenda) -> str:
+    """Calendário onde o evento da agenda está (ou será criado)."""
+    return agenda.google_calendar_id or agenda.subscritor.calendario_google
 
 
 def _agenda_to_event_body(agenda):
     """Converte uma instância Agenda em dict compatível com a API do Google."""
     tz = getattr(settings, "GOOGLE_CALENDAR_TIMEZONE", "America/Sao_Paulo")
+    # Sempre no fuso do evento: o mesmo instante gera sempre o mesmo corpo (e hash)
+    zona = ZoneInfo(tz)
     body = {
         "summary": agenda.titulo,
         "description": agenda.descricao,
-        "start": {"dateTime": agenda.data_inicio.isoformat(), "timeZone": tz},
-        "end": {"dateTime": agenda.data_fim.isoformat(), "timeZone": tz},
+        "start": {"dateTime": agenda.data_inicio.astimezone(zona).isoformat(), "timeZone": tz},
+        "end": {"dateTime": agenda.data_fim.astimezone(zona).isoformat(), "timeZone": tz},
         "extendedProperties": {
             "private": {"agenda_modesta_id": str(agenda.pk)},
         },
@@ -120,13 +214,37 @@ def _agenda_to_event_body(agenda):
     return body
 
 
+def versao_evento(evento: dict) -> dict:
+    """Campos de Agenda que guardam a versão do evento no Google."""
+    from django.utils.dateparse import parse_datetime
+
+    return {
+        "google_etag": evento.get("etag", ""),
+        "google_atualizado_em": parse_datetime(evento["updated"]) if evento.get("updated") else None,
+    }
+
+
+def evento_inalterado(agenda, evento: dict) -> bool:
+    """O item do Google é a mesma versão já aplicada (ou enviada) pela app?"""
+    if evento.get("etag") and agenda.google_etag:
+        return evento["etag"] == agenda.google_etag
+    versao = versao_evento(evento)["google_atualizado_em"]
+    return bool(versao and agenda.google_atualizado_em and versao <= agenda.google_atualizado_em)
+
+
+def hash_evento(agenda) -> str:
+    """sha256 do corpo que seria enviado ao Google para a agenda."""
+    corpo = json.dumps(_agenda_to_event_body(agenda), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(corpo.encode()).hexdigest()
+
+
 # ---------------------------------------------------------------------------
 # Google → App (pull de eventos)
 # ---------------------------------------------------------------------------
 
-def listar_eventos(max_results=10, days_ahead=30):
+def listar_eventos(max_results=10, days_ahead=30, calendar_id=None):
     """
-    Lista os próximos eventos do calendário compartilhado do Google.
+    Lista os próximos eventos de um calendário do Google (padrão: o compartilhado).
     """
     try:
         service = get_calendar_service()
@@ -139,17 +257,18 @@ def listar_eventos(max_results=10, days_ahead=30):
     time_max = (now + timedelta(days=days_ahead)).isoformat().replace("+00:00", "Z")
 
     try:
-        result = (
-            service.events()
-            .list(
-                calendarId=settings.GOOGLE_CALENDAR_ID,
+        calendar_id = calendar_id or settings.GOOGLE_CALENDAR_ID
+        result = executar(
+            service.events().list(
+                calendarId=calendar_id,
                 timeMin=time_min,
                 timeMax=time_max,
                 maxResults=max_results,
                 singleEvents=True,
                 orderBy="startTime",
-            )
-            .execute()
+                fields=CAMPOS_LISTA_PROXIMOS,
+            ),
+            calendar_id,
         )
     except Exception:
         logger.exception("Erro ao listar eventos do Google Calendar")
@@ -172,30 +291,36 @@ def listar_eventos(max_results=10, days_ahead=30):
     return eventos
 
 
-def buscar_evento(event_id: str) -> dict | None:
+def buscar_evento(event_id: str, calendar_id=None) -> dict | None:
     """Busca um único evento pelo ID."""
     service = get_calendar_service()
     try:
-        return (
-            service.events()
-            .get(calendarId=settings.GOOGLE_CALENDAR_ID, eventId=event_id)
-            .execute()
+        calendar_id = calendar_id or settings.GOOGLE_CALENDAR_ID
+        return executar(
+            service.events().get(calendarId=calendar_id, eventId=event_id, fields=CAMPOS_EVENTO), calendar_id,
         )
     except Exception:
         logger.exception("Erro ao buscar evento %s", event_id)
         return None
 
 
-def listar_eventos_alterados(sync_token: str = "") -> tuple[list[dict], str]:
+def listar_eventos_alterados(sync_token: str = "", calendar_id=None,
+                             estatisticas: dict | None = None) -> tuple[list[dict], str]:
     """
-    Faz sync incremental via syncToken.
+    Faz sync incremental via syncToken (que só vale para o mesmo calendário).
     Retorna (lista_de_eventos, next_sync_token).
     Na primeira chamada (sem token), traz todos os eventos futuros.
+    ``estatisticas``, se passado, recebe ``paginas`` e ``resync_410``.
     """
+    if estatisticas is None:
+        estatisticas = {}
+    estatisticas.setdefault("paginas", 0)
+    estatisticas.setdefault("resync_410", False)
     service = get_calendar_service()
     kwargs = {
-        "calendarId": settings.GOOGLE_CALENDAR_ID,
+        "calendarId": calendar_id or settings.GOOGLE_CALENDAR_ID,
         "singleEvents": True,
+        "fields": CAMPOS_LISTA_SYNC,
     }
     if sync_token:
         kwargs["syncToken"] = sync_token
@@ -212,14 +337,16 @@ def listar_eventos_alterados(sync_token: str = "") -> tuple[list[dict], str]:
             kwargs["pageToken"] = page_token
 
         try:
-            result = service.events().list(**kwargs).execute()
+            result = executar(service.events().list(**kwargs), kwargs["calendarId"])
         except Exception as exc:
             # 410 GONE → syncToken expirou, precisa full sync
             if hasattr(exc, "resp") and exc.resp.status == 410:
                 logger.warning("syncToken expirado, fazendo full sync")
-                return listar_eventos_alterados(sync_token="")
+                estatisticas["resync_410"] = True
+                return listar_eventos_alterados(sync_token="", calendar_id=calendar_id, estatisticas=estatisticas)
             raise
 
+        estatisticas["paginas"] += 1
         all_items.extend(result.get("items", []))
         page_token = result.get("nextPageToken")
         if not page_token:
@@ -233,34 +360,45 @@ def listar_eventos_alterados(sync_token: str = "") -> tuple[list[dict], str]:
 # Webhook / Push Notifications
 # ---------------------------------------------------------------------------
 
-def registrar_webhook(subscritor) -> dict:
+def _expiracao_canal() -> datetime:
+    """
+    Expiração pedida ao Google para um canal novo: ``GOOGLE_WEBHOOK_TTL_DAYS``
+    menos um jitter aleatório de até ``GOOGLE_WEBHOOK_EXPIRATION_JITTER_HOURS``,
+    para que canais registrados juntos não vençam (e renovem) juntos.
+    """
+    ttl = timedelta(days=getattr(settings, "GOOGLE_WEBHOOK_TTL_DAYS", 14))
+    jitter = timedelta(hours=getattr(settings, "GOOGLE_WEBHOOK_EXPIRATION_JITTER_HOURS", 24))
+    return datetime.now(dt_tz.utc) + ttl - jitter * random.random()  # noqa: S311
+
+
+def registrar_webhook(subscritor, sync_token: str = "") -> dict:
     """
     Registra um canal de push notification no Google Calendar.
     Retorna dict com channel_id, resource_id, expiration.
     """
     from .models import GoogleCalendarChannel
+    from .webhook import gerar_token, mapear_canal
 
     service = get_calendar_service()
+    calendar_id = subscritor.calendario_google
     webhook_url = getattr(settings, "GOOGLE_CALENDAR_WEBHOOK_URL", "")
     if not webhook_url:
         raise RuntimeError("GOOGLE_CALENDAR_WEBHOOK_URL não configurada.")
 
     channel_id = str(uuid.uuid4())
+    token = gerar_token()
     # Google permite até ~30 dias de TTL
-    expiration_ms = int((datetime.now(dt_tz.utc) + timedelta(days=14)).timestamp() * 1000)
+    expiration_ms = int(_expiracao_canal().timestamp() * 1000)
 
     body = {
         "id": channel_id,
         "type": "web_hook",
         "address": webhook_url,
+        "token": token,
         "expiration": expiration_ms,
     }
 
-    result = (
-        service.events()
-        .watch(calendarId=settings.GOOGLE_CALENDAR_ID, body=body)
-        .execute()
-    )
+    result = executar(service.events().watch(calendarId=calendar_id, body=body, fields=CAMPOS_CANAL), calendar_id)
 
     expiration_dt = datetime.fromtimestamp(
         int(result["expiration"]) / 1000,
@@ -271,9 +409,12 @@ def registrar_webhook(subscritor) -> dict:
         subscritor=subscritor,
         channel_id=result["id"],
         resource_id=result["resourceId"],
-        google_calendar_id=settings.GOOGLE_CALENDAR_ID,
+        google_calendar_id=calendar_id,
         expiration=expiration_dt,
+        token=token,
+        sync_token=sync_token,
     )
+    mapear_canal(channel)
 
     logger.info(
         "Webhook registrado: channel=%s resource=%s expira=%s",
@@ -288,20 +429,43 @@ def registrar_webhook(subscritor) -> dict:
     }
 
 
+def canal_atual(subscritor):
+    """
+    Canal mais recente do subscritor no calendário atual dele. Canais de um
+    calendário anterior não servem: o sync_token é por calendário.
+    """
+    from .models import GoogleCalendarChannel
+
+    return (
+        GoogleCalendarChannel.objects.filter(
+            subscritor=subscritor,
+            google_calendar_id=subscritor.calendario_google,
+        )
+        .order_by("-criado_em")
+        .first()
+    )
+
+
 def cancelar_webhook(channel):
     """Cancela um canal de push notification."""
+    from .webhook import desmapear_canal
+
     service = get_calendar_service()
     try:
-        service.channels().stop(
-            body={
-                "id": channel.channel_id,
-                "resourceId": channel.resource_id,
-            }
-        ).execute()
+        executar(
+            service.channels().stop(
+                body={
+                    "id": channel.channel_id,
+                    "resourceId": channel.resource_id,
+                }
+            ),
+            channel.google_calendar_id,
+        )
         logger.info("Webhook cancelado: %s", channel.channel_id)
     except Exception:
         logger.exception("Erro ao cancelar webhook %s", channel.channel_id)
     finally:
+        desmapear_canal(channel.channel_id)
         channel.delete()
 
 
@@ -327,15 +491,88 @@ def _parse_google_datetime(dt_dict: dict) -> datetime:
     return dt
 
 
-def sincronizar_eventos_google(subscritor, usuario, sync_token: str = ""):
+def sincronizar_eventos_google(subscritor, usuario, sync_token: str = "", origem: str = "comando"):
     """
     Puxa eventos do Google Calendar e cria/atualiza/remove Agendas locais.
+    Itens cuja versão (etag/updated) já está aplicada, como o eco dos nossos
+    próprios pushes, são pulados sem escrita no banco nem signals.
+    Cada execução fica registrada em ``ExecucaoSync`` (``origem`` é um
+    ``OrigemSync``), inclusive as que falham.
     Retorna o novo sync_token para futuras chamadas incrementais.
     """
-    from .models import Agenda
+    from .models import ExecucaoSync, TipoSync
+
+    calendar_id = subscritor.calendario_google
+    execucao = ExecucaoSync(
+        subscritor=subscritor,
+        google_calendar_id=calendar_id,
+        origem=origem,
+        tipo=TipoSync.INCREMENTAL if sync_token else TipoSync.COMPLETO,
+    )
+    contagens = dict.fromkeys(("criados", "atualizados", "removidos", "pulados"), 0)
+    paginacao = {}
+    inicio = time.perf_counter()
+    with medir_trafego(estimar_rede=medicao_habilitada()) as trafego:
+        try:
+            items, next_sync_token = listar_eventos_alterados(
+                sync_token, calendar_id=calendar_id, estatisticas=paginacao,
+            )
+            _aplicar_itens(subscritor, usuario, calendar_id, items, contagens)
+        except Exception as exc:
+            execucao.erro = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            execucao.duracao_ms = round((time.perf_counter() - inicio) * 1000)
+            _registrar_execucao(execucao, trafego, paginacao, contagens)
+
+    for resultado, total in contagens.items():
+        if total:
+            SYNC_ITENS.incrementar(total, resultado=resultado.removesuffix("s"))
+    logger.info(
+        "Sincronização Google→App de %s finalizada em %dms: criados=%d atualizados=%d removidos=%d pulados=%d "
+        "(%d requests, %d bytes de JSON)",
+        calendar_id,
+        execucao.duracao_ms,
+        *contagens.values(),
+        trafego["requests"],
+        trafego["json"],
+    )
+    return next_sync_token
+
+
+def _registrar_execucao(execucao, trafego: dict, paginacao: dict, contagens: dict):
+    """Grava a telemetria do sync; falhar aqui nunca derruba o sync."""
+    execucao.chamadas_api = trafego["requests"]
+    execucao.bytes_json = trafego["json"]
+    execucao.bytes_rede = trafego["rede"] if medicao_habilitada() else None
+    execucao.paginas = paginacao.get("paginas", 0)
+    execucao.resync_410 = paginacao.get("resync_410", False)
+    for campo, total in contagens.items():
+        setattr(execucao, campo, total)
+    try:
+        execucao.save()
+    except Exception:
+        logger.exception("Erro ao registrar execução do sync de %s", execucao.google_calendar_id)
+
+
+def purgar_execucoes(lote: int = 5000) -> int:
+    """
+    Apaga a telemetria mais velha que ``GOOGLE_SYNC_EXECUCOES_RETENCAO_DIAS``,
+    em lotes, para não travar a tabela. Retorna quantas linhas saíram.
+    """
+    from .models import ExecucaoSync
 
-    items, next_sync_token = listar_eventos_alterados(sync_token)
-    criados = atualizados = removidos = 0
+    limite = timezone.now() - timedelta(days=getattr(settings, "GOOGLE_SYNC_EXECUCOES_RETENCAO_DIAS", 30))
+    antigas = ExecucaoSync.objects.filter(iniciado_em__lt=limite).order_by()
+    apagadas = 0
+    while pks := list(antigas.values_list("pk", flat=True)[:lote]):
+        apagadas += ExecucaoSync.objects.filter(pk__in=pks).delete()[0]
+    return apagadas
+
+
+def _aplicar_itens(subscritor, usuario, calendar_id: str, items: list[dict], contagens: dict):
+    """Aplica os itens do Google às Agendas do subscritor, somando em ``contagens``."""
+    from .models import Agenda
 
     for item in items:
         google_event_id = item.get("id", "")
@@ -347,7 +584,7 @@ def sincronizar_eventos_google(subscritor, usuario, sync_token: str = ""):
                 google_event_id=google_event_id,
                 subscritor=subscritor,
             ).delete()
-            removidos += deleted_count
+            contagens["removidos"] += deleted_count
             continue
 
         # Verificar se é um evento que já veio da app (evita duplicar)
@@ -361,14 +598,22 @@ def sincronizar_eventos_google(subscritor, usuario, sync_token: str = ""):
             except Agenda.DoesNotExist:
                 continue  # evento órfão, ignorar
 
+            if evento_inalterado(agenda, item):
+                contagens["pulados"] += 1
+                continue
+
             agenda.titulo = item.get("summary", agenda.titulo)
             agenda.descricao = item.get("description", agenda.descricao)
             agenda.data_inicio = _parse_google_datetime(item.get("start", {}))
             agenda.data_fim = _parse_google_datetime(item.get("end", {}))
             agenda.ultima_sincronizacao = timezone.now()
+            # O Google já tem este conteúdo: um save igual depois não gera push
+            agenda.google_payload_hash = hash_evento(agenda)
+            for campo, valor in versao_evento(item).items():
+                setattr(agenda, campo, valor)
             agenda._skip_google_sync = True
             agenda.save()
-            atualizados += 1
+            contagens["atualizados"] += 1
             continue
 
         # Evento criado diretamente no Google → criar Agenda local
@@ -377,6 +622,10 @@ def sincronizar_eventos_google(subscritor, usuario, sync_token: str = ""):
             subscritor=subscritor,
         ).first()
 
+        if existing and evento_inalterado(existing, item):
+            contagens["pulados"] += 1
+            continue
+
         data_inicio = _parse_google_datetime(item.get("start", {}))
         data_fim = _parse_google_datetime(item.get("end", {}))
 
@@ -386,9 +635,12 @@ def sincronizar_eventos_google(subscritor, usuario, sync_token: str = ""):
             existing.data_inicio = data_inicio
             existing.data_fim = data_fim
             existing.ultima_sincronizacao = timezone.now()
+            existing.google_payload_hash = hash_evento(existing)
+            for campo, valor in versao_evento(item).items():
+                setattr(existing, campo, valor)
             existing._skip_google_sync = True
             existing.save()
-            atualizados += 1
+            contagens["atualizados"] += 1
         else:
             agenda = Agenda(
                 usuario=usuario,
@@ -399,19 +651,13 @@ def sincronizar_eventos_google(subscritor, usuario, sync_token: str = ""):
                 data_fim=data_fim,
                 origem="google",
                 google_event_id=google_event_id,
-                google_calendar_id=settings.GOOGLE_CALENDAR_ID,
+                google_calendar_id=calendar_id,
                 confirmado=True,
                 notificar_email=False,
                 ultima_sincronizacao=timezone.now(),
+                **versao_evento(item),
             )
+            agenda.google_payload_hash = hash_evento(agenda)
             agenda._skip_google_sync = True
             agenda.save()
-            criados += 1
-
-    logger.info(
-        "Sincronização Google→App finalizada: criados=%d atualizados=%d removidos=%d",
-        criados,
-        atualizados,
-        removidos,
-    )
-    return next_sync_token
+            contagens["criados"] += 1
@@ -0,0 +1,512 @@
+"""
+Emulador local da API do Google Calendar v3, para testes e benchmarks.
+
+Implementa, em memória, só o que ``google_calendar.py`` usa:
+
+- ``events.insert/update/delete/get/list`` com ``syncToken``/``pageToken``
+  (mudanças desde o token, incluindo removidos) e 410 quando o token expira;
+- ``events.watch`` e ``channels.stop``;
+- requests em lote (``/batch/calendar/v3``, multipart/mixed);
+- partial responses (``fields``).
+
+É um objeto ``http`` no formato do httplib2, então o cliente oficial roda
+sem alterações por cima dele (``build(..., http=emulador)``)::
+
+    emulador = EmuladorGoogleCalendar(latencia=0.05)
+    emulador.semear("estudio@group.calendar.google.com", 500)
+    with emulador.ativar():
+        sincronizar_eventos_google(subscritor, usuario)
+
+Dá para simular a rede e o Google: ``latencia`` por request, cota
+(``cota=(requests, janela_s)`` responde 403 rateLimitExceeded) e erros
+injetados com ``falhar``.
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_tz
+from email.parser import Parser
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import httplib2
+
+PREFIXO_API = "/calendar/v3/"
+CAMINHO_BATCH = "/batch/calendar/v3"
+PAGINA_PADRAO = 250  # maxResults padrão do Google
+PAGINA_MAXIMA = 2500
+
+
+class _ErroApi(Exception):
+    def __init__(self, status: int, reason: str, mensagem: str = ""):
+        super().__init__(mensagem or reason)
+        self.status = status
+        self.reason = reason
+        self.mensagem = mensagem or reason
+
+
+def _agora() -> datetime:
+    return datetime.now(dt_tz.utc)
+
+
+def _rfc3339(momento: datetime) -> str:
+    return momento.strftime("%Y-%m-%dT%H:%M:%S.") + f"{momento.microsecond // 1000:03d}Z"
+
+
+def _parse_momento(valor: str) -> datetime | None:
+    if not valor:
+        return None
+    momento = datetime.fromisoformat(valor.replace("Z", "+00:00"))
+    if momento.tzinfo is None:
+        momento = momento.replace(tzinfo=dt_tz.utc)
+    return momento
+
+
+def _inicio(evento: dict) -> datetime:
+    start = evento.get("start", {})
+    return _parse_momento(start.get("dateTime") or start.get("date", "")) or datetime.min.replace(tzinfo=dt_tz.utc)
+
+
+# ---------------------------------------------------------------------------
+# Partial responses (parâmetro ``fields``)
+# ---------------------------------------------------------------------------
+
+def parse_fields(expressao: str) -> dict:
+    """``"a,b/c,items(d,e)"`` → ``{"a": None, "b": {"c": None}, "items": {"d": None, "e": None}}``."""
+    arvore, posicao = _parse_lista(expressao, 0)
+    if posicao != len(expressao):
+        raise _ErroApi(400, "invalidParameter", f"fields inválido: {expressao}")
+    return arvore
+
+
+def _parse_lista(expressao: str, posicao: int) -> tuple[dict, int]:
+    arvore: dict = {}
+    while posicao < len(expressao) and expressao[posicao] != ")":
+        fim = posicao
+        while fim < len(expressao) and expressao[fim] not in ",()":
+            fim += 1
+        caminho = [parte for parte in expressao[posicao:fim].strip().split("/") if parte]
+        sub = None
+        if fim < len(expressao) and expressao[fim] == "(":
+            sub, fim = _parse_lista(expressao, fim + 1)
+            if fim >= len(expressao) or expressao[fim] != ")":
+                raise _ErroApi(400, "invalidParameter", f"fields inválido: {expressao}")
+            fim += 1
+        no = arvore
+        for nome in caminho[:-1]:
+            if nome in no and no[nome] is None:  # o campo inteiro já foi pedido
+                break
+            no = no.setdefault(nome, {})
+        else:
+            if caminho:
+                no[caminho[-1]] = sub
+        posicao = fim + 1 if fim < len(expressao) and expressao[fim] == "," else fim
+    return arvore, posicao
+
+
+def filtrar_campos(valor, arvore: dict | None):
+    """Aplica a árvore de ``parse_fields`` a um recurso (listas são filtradas item a item)."""
+    if arvore is None:
+        return valor
+    if isinstance(valor, list):
+        return [filtrar_campos(item, arvore) for item in valor]
+    if not isinstance(valor, dict):
+        return valor
+    return {chave: filtrar_campos(valor[chave], sub) for chave, sub in arvore.items() if chave in valor}
+
+
+# ---------------------------------------------------------------------------
+# Emulador
+# ---------------------------------------------------------------------------
+
+class EmuladorGoogleCalendar:
+    """Calendários em memória atrás da interface ``request()`` do httplib2 (thread-safe)."""
+
+    def __init__(self, latencia: float | tuple[float, float] = 0, cota: tuple[int, float] | None = None,
+                 pagina_padrao: int = PAGINA_PADRAO, seed=None):
+        self.latencia = latencia
+        # (requests, janela em s) aceitos antes de responder 403 rateLimitExceeded
+        self.cota = cota
+        self.pagina_padrao = pagina_padrao
+        # Simula um cliente antigo que não manda ``fields`` (para comparar payloads)
+        self.ignorar_fields = False
+        self.rng = random.Random(seed)  # noqa: S311
+        self._lock = threading.RLock()
+        self._calendarios: dict[str, dict] = {}
+        self._seq = 0
+        self._sync_tokens: dict[str, tuple[str, int]] = {}
+        self._paginas: dict[str, dict] = {}
+        self._falhas: list[dict] = []
+        self._janela_cota: deque[float] = deque()
+        self.canais: dict[str, dict] = {}
+        self.notificacoes: list[dict] = []
+        # Estatísticas: requests HTTP recebidos, operações por tipo (lotes contam
+        # cada parte) e eventos devolvidos por events.list
+        self.requests = 0
+        self.operacoes: dict[str, int] = {}
+        self.itens_listados = 0
+
+    # ------------------------------------------------------------ uso direto
+
+    def servico(self):
+        """Resource do Calendar v3 apontado para o emulador (o mesmo http da app)."""
+        from googleapiclient.discovery import build
+
+        from .google_calendar import _HttpMedido
+
+        return build("calendar", "v3", http=_HttpMedido(self), cache_discovery=False)
+
+    @contextmanager
+    def ativar(self):
+        """Faz ``google_calendar.get_calendar_service`` devolver o emulador no bloco."""
+        from unittest import mock
+
+        from . import google_calendar
+
+        with mock.patch.object(google_calendar, "get_calendar_service", self.servico):
+            yield self
+
+    def falhar(self, status: int, reason: str = "backendError", vezes: int = 1, operacao: str | None = None):
+        """Faz as próximas ``vezes`` operações (de um tipo, ou qualquer uma) falharem."""
+        with self._lock:
+            self._falhas.append({"status": status, "reason": reason, "vezes": vezes, "operacao": operacao})
+
+    def expirar_sync_tokens(self, calendar_id: str | None = None):
+        """Invalida os syncTokens emitidos: o próximo uso recebe 410 (full sync)."""
+        with self._lock:
+            for token, (calendario, _) in list(self._sync_tokens.items()):
+                if calendar_id is None or calendario == calendar_id:
+                    del self._sync_tokens[token]
+
+    def eventos(self, calendar_id: str, incluir_removidos: bool = False) -> list[dict]:
+        with self._lock:
+            eventos = self._calendario(calendar_id)["eventos"].values()
+            return [dict(e) for e in eventos if incluir_removidos or e["status"] != "cancelled"]
+
+    def semear(self, calendar_id: str, quantidade: int, inicio: datetime | None = None,
+               convidados: int = 0) -> list[dict]:
+        """
+        Cria ``quantidade`` eventos "nascidos no Google", um por hora útil a
+        partir de ``inicio``. ``convidados`` preenche attendees e
+        conferenceData, que pesam no payload como num calendário real.
+        """
+        inicio = (inicio or _agora()).replace(minute=0, second=0, microsecond=0)
+        criados = []
+        with self._lock:
+            for indice in range(quantidade):
+                dia, hora = divmod(indice, 10)
+                comeco = inicio + timedelta(days=dia, hours=hora)
+                corpo = {
+                    "summary": f"Sessão {indice}",
+                    "description": f"Evento semeado {indice} " + "x" * self.rng.randint(0, 200),
+                    "start": {"dateTime": comeco.isoformat(), "timeZone": "UTC"},
+                    "end": {"dateTime": (comeco + timedelta(hours=1)).isoformat(), "timeZone": "UTC"},
+                }
+                if convidados:
+                    corpo["attendees"] = [
+                        {"email": f"convidado{n}@exemplo.com", "responseStatus": "needsAction"}
+                        for n in range(convidados)
+                    ]
+                    corpo["conferenceData"] = {
+                        "conferenceId": uuid.uuid4().hex[:10],
+                        "entryPoints": [{"entryPointType": "video", "uri": "https://meet.google.com/abc-defg-hij"}],
+                    }
+                criados.append(self._inserir(calendar_id, corpo))
+        return [dict(e) for e in criados]
+
+    def alterar(self, calendar_id: str, quantidade: int) -> list[str]:
+        """Edita o título de ``quantidade`` eventos sorteados; retorna os IDs."""
+        with self._lock:
+            vivos = [e for e in self._calendario(calendar_id)["eventos"].values() if e["status"] != "cancelled"]
+            escolhidos = self.rng.sample(vivos, k=min(quantidade, len(vivos)))
+            for evento in escolhidos:
+                self._tocar(calendar_id, evento, {**evento, "summary": f"{evento.get('summary', '')} (editado)"})
+            return [evento["id"] for evento in escolhidos]
+
+    def remover(self, calendar_id: str, quantidade: int) -> list[str]:
+        """Remove ``quantidade`` eventos sorteados; retorna os IDs."""
+        with self._lock:
+            vivos = [e for e in self._calendario(calendar_id)["eventos"].values() if e["status"] != "cancelled"]
+            escolhidos = self.rng.sample(vivos, k=min(quantidade, len(vivos)))
+            for evento in escolhidos:
+                self._apagar(calendar_id, evento["id"])
+            return [evento["id"] for evento in escolhidos]
+
+    # ------------------------------------------------------- interface httplib2
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=None, connection_type=None):
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        self._esperar_latencia()
+        with self._lock:
+            self.requests += 1
+        partes = urlsplit(uri)
+        if partes.path == CAMINHO_BATCH:
+            status, conteudo, tipo = self._lote(body, headers)
+        else:
+            status, conteudo = self._atender(method, partes.path, partes.query, body)
+            tipo = "application/json; charset=UTF-8"
+        resposta = httplib2.Response({"status": str(status), "content-type": tipo})
+        if "gzip" in headers.get("accept-encoding", ""):
+            # Como o httplib2 faz ao descomprimir uma resposta gzip
+            resposta["-content-encoding"] = "gzip"
+        return resposta, conteudo
+
+    # ------------------------------------------------------------- roteamento
+
+    def _atender(self, metodo: str, caminho: str, query: str, corpo) -> tuple[int, bytes]:
+        params = {chave: valores[-1] for chave, valores in parse_qs(query).items()}
+        if isinstance(corpo, bytes):
+            corpo = corpo.decode()
+        dados = json.loads(corpo) if corpo else {}
+        try:
+            operacao, args = self._rota(metodo, caminho)
+            self._verificar_falhas(operacao)
+            with self._lock:
+                self.operacoes[operacao] = self.operacoes.get(operacao, 0) + 1
+                resultado = getattr(self, f"_op_{operacao}")(*args, params=params, dados=dados)
+        except _ErroApi as erro:
+            return erro.status, self._corpo_erro(erro)
+        if resultado is None:
+            return 204, b""
+        if params.get("fields") and not self.ignorar_fields:
+            resultado = filtrar_campos(resultado, parse_fields(params["fields"]))
+        return 200, json.dumps(resultado).encode()
+
+    def _rota(self, metodo: str, caminho: str) -> tuple[str, tuple]:
+        if not caminho.startswith(PREFIXO_API):
+            raise _ErroApi(404, "notFound", caminho)
+        partes = [unquote(parte) for parte in caminho[len(PREFIXO_API):].split("/")]
+        if partes == ["channels", "stop"] and metodo == "POST":
+            return "stop", ()
+        if len(partes) >= 3 and partes[0] == "calendars" and partes[2] == "events":  # noqa: PLR2004
+            calendario, resto = partes[1], partes[3:]
+            rotas = {
+                ("GET", 0): "list", ("POST", 0): "insert",
+                ("GET", 1): "get", ("PUT", 1): "update", ("DELETE", 1): "delete",
+            }
+            if resto == ["watch"] and metodo == "POST":
+                return "watch", (calendario,)
+            if (metodo, len(resto)) in rotas:
+                return rotas[metodo, len(resto)], (calendario, *resto)
+        raise _ErroApi(404, "notFound", f"{metodo} {caminho}")
+
+    def _lote(self, corpo, headers) -> tuple[int, bytes, str]:
+        """Executa cada parte de um multipart/mixed e devolve as respostas na mesma ordem."""
+        if isinstance(corpo, bytes):
+            corpo = corpo.decode()
+        mensagem = Parser().parsestr(f"content-type: {headers.get('content-type', '')}\r\n\r\n{corpo}")
+        if not mensagem.is_multipart():
+            return 400, self._corpo_erro(_ErroApi(400, "badRequest", "lote sem multipart")), "application/json"
+
+        fronteira = f"batch_{uuid.uuid4().hex}"
+        saida = []
+        for parte in mensagem.get_payload():
+            requisicao = parte.get_payload().replace("\r\n", "\n")
+            linha, resto = requisicao.split("\n", 1)
+            metodo, alvo, _ = linha.split(" ", 2)
+            corpo_parte = resto.split("\n\n", 1)[1] if "\n\n" in resto else ""
+            url = urlsplit(alvo)
+            status, conteudo = self._atender(metodo, url.path, url.query, corpo_parte.strip() or None)
+            content_id = parte["Content-ID"] or ""
+            saida.append(
+                f"--{fronteira}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id.strip('<>')}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"  # noqa: PLR2004
+                f"Content-Type: application/json; charset=UTF-8\r\n\r\n{conteudo.decode()}\r\n",
+            )
+        saida.append(f"--{fronteira}--\r\n")
+        return 200, "".join(saida).encode(), f"multipart/mixed; boundary={fronteira}"
+
+    # ------------------------------------------------------------- simulação
+
+    def _esperar_latencia(self):
+        latencia = self.latencia
+        if isinstance(latencia, tuple):
+            latencia = self.rng.uniform(*latencia)
+        if latencia:
+            time.sleep(latencia)
+
+    def _verificar_falhas(self, operacao: str):
+        with self._lock:
+            for falha in self._falhas:
+                if falha["operacao"] in (None, operacao):
+                    falha["vezes"] -= 1
+                    if falha["vezes"] <= 0:
+                        self._falhas.remove(falha)
+                    raise _ErroApi(falha["status"], falha["reason"])
+            if self.cota:
+                limite, janela = self.cota
+                agora = time.monotonic()
+                while self._janela_cota and self._janela_cota[0] <= agora - janela:
+                    self._janela_cota.popleft()
+                if len(self._janela_cota) >= limite:
+                    raise _ErroApi(403, "rateLimitExceeded", "Rate Limit Exceeded")
+                self._janela_cota.append(agora)
+
+    @staticmethod
+    def _corpo_erro(erro: _ErroApi) -> bytes:
+        dominio = "usageLimits" if erro.reason in {"rateLimitExceeded", "userRateLimitExceeded"} else "global"
+        return json.dumps({"error": {
+            "code": erro.status,
+            "message": erro.mensagem,
+            "errors": [{"domain": dominio, "reason": erro.reason, "message": erro.mensagem}],
+        }}).encode()
+
+    # --------------------------------------------------------------- estado
+
+    def _calendario(self, calendar_id: str) -> dict:
+        return self._calendarios.setdefault(calendar_id, {"eventos": {}})
+
+    def _proxima_versao(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    def _tocar(self, calendar_id: str, evento: dict, corpo: dict) -> dict:
+        """Grava uma nova versão do evento (etag/updated/seq novos) e notifica os canais."""
+        seq = self._proxima_versao()
+        atualizado = {
+            **corpo,
+            "kind": "calendar#event",
+            "id": evento["id"],
+            "etag": f'"{seq:016d}"',
+            "created": evento.get("created") or _rfc3339(_agora()),
+            "updated": _rfc3339(_agora()),
+            "sequence": evento.get("sequence", -1) + 1,
+            "_seq": seq,
+        }
+        atualizado.setdefault("status", "confirmed")
+        self._calendario(calendar_id)["eventos"][evento["id"]] = atualizado
+        self._notificar(calendar_id)
+        return atualizado
+
+    def _inserir(self, calendar_id: str, corpo: dict) -> dict:
+        event_id = uuid.UUID(int=self.rng.getrandbits(128)).hex
+        base = {
+            "id": event_id,
+            "htmlLink": f"https://www.google.com/calendar/event?eid={event_id}",
+            "iCalUID": f"{event_id}@google.com",
+            "creator": {"email": calendar_id},
+            "organizer": {"email": calendar_id, "self": True},
+            "reminders": {"useDefault": True},
+            "eventType": "default",
+        }
+        return self._tocar(calendar_id, {"id": event_id}, {**base, **corpo, "status": "confirmed"})
+
+    def _apagar(self, calendar_id: str, event_id: str):
+        evento = self._evento(calendar_id, event_id)
+        if evento["status"] == "cancelled":
+            raise _ErroApi(410, "deleted", "Resource has been deleted")
+        seq = self._proxima_versao()
+        evento.update({"status": "cancelled", "etag": f'"{seq:016d}"', "updated": _rfc3339(_agora()), "_seq": seq})
+        self._notificar(calendar_id)
+
+    def _evento(self, calendar_id: str, event_id: str) -> dict:
+        evento = self._calendario(calendar_id)["eventos"].get(event_id)
+        if evento is None:
+            raise _ErroApi(404, "notFound", "Not Found")
+        return evento
+
+    def _notificar(self, calendar_id: str):
+        for canal in self.canais.values():
+            if canal["calendar_id"] == calendar_id:
+                self.notificacoes.append({
+                    "X-Goog-Channel-ID": canal["id"],
+                    "X-Goog-Channel-Token": canal.get("token", ""),
+                    "X-Goog-Resource-State": "exists",
+                })
+
+    @staticmethod
+    def _publico(evento: dict) -> dict:
+        return {chave: valor for chave, valor in evento.items() if not chave.startswith("_")}
+
+    # ------------------------------------------------------------- operações
+
+    def _op_insert(self, calendar_id, params, dados):
+        return self._publico(self._inserir(calendar_id, dados))
+
+    def _op_update(self, calendar_id, event_id, params, dados):
+        evento = self._evento(calendar_id, event_id)
+        base = {k: evento[k] for k in ("htmlLink", "iCalUID", "creator", "organizer", "reminders", "eventType")
+                if k in evento}
+        return self._publico(self._tocar(calendar_id, evento, {**base, **dados}))
+
+    def _op_delete(self, calendar_id, event_id, params, dados):
+        self._apagar(calendar_id, event_id)
+
+    def _op_get(self, calendar_id, event_id, params, dados):
+        return self._publico(self._evento(calendar_id, event_id))
+
+    def _op_list(self, calendar_id, params, dados):
+        if params.get("pageToken"):
+            pagina = self._paginas.pop(params["pageToken"], None)
+            if pagina is None:
+                raise _ErroApi(400, "invalid", "pageToken inválido")
+            return self._pagina(calendar_id, **pagina)
+
+        if params.get("syncToken"):
+            if any(params.get(p) for p in ("timeMin", "timeMax", "orderBy", "q")):
+                raise _ErroApi(400, "invalid", "syncToken não combina com filtros")
+            origem = self._sync_tokens.get(params["syncToken"])
+            if origem is None or origem[0] != calendar_id:
+                raise _ErroApi(410, "fullSyncRequired", "Sync token is no longer valid, a full sync is required.")
+            desde = origem[1]
+            eventos = [e for e in self._calendario(calendar_id)["eventos"].values() if e["_seq"] > desde]
+            eventos.sort(key=lambda e: e["_seq"])
+        else:
+            mostrar_removidos = params.get("showDeleted") == "true"
+            minimo, maximo = _parse_momento(params.get("timeMin", "")), _parse_momento(params.get("timeMax", ""))
+            eventos = [
+                e for e in self._calendario(calendar_id)["eventos"].values()
+                if (mostrar_removidos or e["status"] != "cancelled")
+                and (minimo is None or _inicio(e) >= minimo)
+                and (maximo is None or _inicio(e) < maximo)
+            ]
+            eventos.sort(key=_inicio if params.get("orderBy") == "startTime" else lambda e: e["_seq"])
+
+        tamanho = min(int(params.get("maxResults") or self.pagina_padrao), PAGINA_MAXIMA)
+        ids = [e["id"] for e in eventos]
+        return self._pagina(calendar_id, ids=ids, inicio=0, tamanho=tamanho, versao=self._seq)
+
+    def _pagina(self, calendar_id, ids, inicio, tamanho, versao):
+        eventos = self._calendario(calendar_id)["eventos"]
+        fatia = ids[inicio:inicio + tamanho]
+        resultado = {
+            "kind": "calendar#events",
+            "etag": f'"{versao:016d}"',
+            "summary": calendar_id,
+            "timeZone": "UTC",
+            "accessRole": "owner",
+            "items": [self._publico(eventos[event_id]) for event_id in fatia if event_id in eventos],
+        }
+        self.itens_listados += len(resultado["items"])
+        if inicio + tamanho < len(ids):
+            token = uuid.uuid4().hex
+            self._paginas[token] = {"ids": ids, "inicio": inicio + tamanho, "tamanho": tamanho, "versao": versao}
+            resultado["nextPageToken"] = token
+        else:
+            token = uuid.uuid4().hex
+            self._sync_tokens[token] = (calendar_id, versao)
+            resultado["nextSyncToken"] = token
+        return resultado
+
+    def _op_watch(self, calendar_id, params, dados):
+        resource_id = uuid.uuid4().hex
+        canal = {
+            "kind": "api#channel",
+            "id": dados["id"],
+            "resourceId": resource_id,
+            "resourceUri": f"https://www.googleapis.com/calendar/v3/calendars/{calendar_id}/events",
+            "expiration": str(dados.get("expiration") or int((_agora() + timedelta(days=7)).timestamp() * 1000)),
+        }
+        self.canais[dados["id"]] = {**canal, "calendar_id": calendar_id, "token": dados.get("token", "")}
+        return canal
+
+    def _op_stop(self, params, dados):
+        canal = self.canais.get(dados.get("id", ""))
+        if canal is None or canal["resourceId"] != dados.get("resourceId"):
+            raise _ErroApi(404, "notFound", "Channel not found")
+        del self.canais[dados["id"]]
@@ -0,0 +1,220 @@
+"""
+Limitador de chamadas à API do Google Calendar, compartilhado pelo cluster.
+
+Toda chamada de ``agenda/google_calendar.py`` passa por ``executar``, que
+antes de cada request tira uma ficha de dois token buckets no Redis:
+
+- ``projeto``: a cota do projeto no Google Cloud, dividida por web e workers;
+- ``calendario:<id>``: a cota por calendário/usuário.
+
+Os dois são verificados e debitados atomicamente num script Lua (relógio do
+próprio Redis), então vários processos nunca passam juntos da taxa
+configurada. Se o Google ainda assim responder 429 ou 403 de cota, o bucket
+afetado fica pausado por um backoff exponencial com jitter, que vale para
+todo o cluster, e a chamada é repetida até ``GOOGLE_API_MAX_TENTATIVAS``.
+
+Com ``GOOGLE_API_LIMITER_ENABLED=False`` (ex.: testes) as chamadas vão direto.
+"""
+
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+
+from agenda_modesta.core.metrics import Contador, Histograma
+from agenda_modesta.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+PREFIXO = "google:quota:"
+MOTIVOS_COTA_USUARIO = {"userRateLimitExceeded"}
+MOTIVOS_COTA = {"rateLimitExceeded", "quotaExceeded", *MOTIVOS_COTA_USUARIO}
+
+LIMITER_ESPERA = Histograma(
+    "google_api_limiter_wait_seconds", "Tempo esperando ficha do limitador antes de uma chamada ao Google.",
+)
+ERROS_COTA = Contador(
+    "google_api_quota_errors_total", "Respostas de cota excedida do Google por bucket (projeto, calendario).",
+)
+
+# KEYS: buckets; ARGV: pares (taxa por segundo, capacidade) na mesma ordem.
+# Retorna 0 e debita uma ficha de cada bucket, ou os ms a esperar sem debitar.
+_TOMAR_FICHA_LUA = """
+local t = redis.call('TIME')
+local agora = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local espera = 0
+local fichas = {}
+for i, chave in ipairs(KEYS) do
+    local taxa = tonumber(ARGV[2 * i - 1])
+    local capacidade = tonumber(ARGV[2 * i])
+    local dados = redis.call('HMGET', chave, 'fichas', 'ts', 'pausa_ate')
+    local atual = tonumber(dados[1]) or capacidade
+    local ts = tonumber(dados[2]) or agora
+    local pausa_ate = tonumber(dados[3]) or 0
+    atual = math.min(capacidade, atual + (agora - ts) * taxa / 1000)
+    fichas[i] = atual
+    if pausa_ate > agora then
+        espera = math.max(espera, pausa_ate - agora)
+    end
+    if atual < 1 then
+        espera = math.max(espera, math.ceil((1 - atual) * 1000 / taxa))
+    end
+end
+if espera > 0 then
+    return espera
+end
+for i, chave in ipairs(KEYS) do
+    redis.call('HSET', chave, 'fichas', fichas[i] - 1, 'ts', agora)
+    redis.call('PEXPIRE', chave, 600000)
+end
+return 0
+"""
+
+# KEYS[1]: bucket; ARGV[1]: pausa em ms. Estende (nunca encurta) a pausa.
+_PAUSAR_LUA = """
+local t = redis.call('TIME')
+local agora = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local ate = agora + tonumber(ARGV[1])
+local atual = tonumber(redis.call('HGET', KEYS[1], 'pausa_ate')) or 0
+if ate > atual then
+    redis.call('HSET', KEYS[1], 'pausa_ate', ate)
+    redis.call('PEXPIRE', KEYS[1], math.max(600000, tonumber(ARGV[1]) + 1000))
+end
+return ate
+"""
+
+_scripts = {}
+
+
+class CotaGoogleExcedida(RuntimeError):
+    """A chamada não passou pelo limitador ou esgotou as tentativas por cota."""
+
+    def __init__(self, msg: str, atraso: float):
+        super().__init__(msg)
+        # Sugestão de quando tentar de novo (s), para retries de tasks
+        self.atraso = atraso
+
+
+def limitador_habilitado() -> bool:
+    return getattr(settings, "GOOGLE_API_LIMITER_ENABLED", False)
+
+
+def _config(nome: str, padrao):
+    return getattr(settings, nome, padrao)
+
+
+def _script(nome: str, fonte: str):
+    if nome not in _scripts:
+        _scripts[nome] = get_redis().register_script(fonte)
+    return _scripts[nome]
+
+
+def _buckets(calendar_id: str | None) -> list[tuple[str, float, int]]:
+    """[(chave, taxa/s, capacidade)] que a chamada precisa respeitar."""
+    buckets = [(
+        f"{PREFIXO}projeto",
+        _config("GOOGLE_API_TAXA_PROJETO", 20),
+        _config("GOOGLE_API_RAJADA_PROJETO", 40),
+    )]
+    if calendar_id:
+        buckets.append((
+            f"{PREFIXO}calendario:{calendar_id}",
+            _config("GOOGLE_API_TAXA_CALENDARIO", 5),
+            _config("GOOGLE_API_RAJADA_CALENDARIO", 10),
+        ))
+    return buckets
+
+
+def tomar_ficha(calendar_id: str | None = None, espera_maxima: float | None = None):
+    """Bloqueia até haver ficha nos buckets da chamada (ou ``GOOGLE_API_ESPERA_MAXIMA``)."""
+    buckets = _buckets(calendar_id)
+    chaves = [chave for chave, _, _ in buckets]
+    args = [valor for _, taxa, capacidade in buckets for valor in (taxa, capacidade)]
+    limite = espera_maxima if espera_maxima is not None else _config("GOOGLE_API_ESPERA_MAXIMA", 30)
+
+    inicio = time.monotonic()
+    while True:
+        espera_ms = _script("tomar", _TOMAR_FICHA_LUA)(keys=chaves, args=args)
+        esperado = time.monotonic() - inicio
+        if not espera_ms:
+            LIMITER_ESPERA.observar(esperado)
+            return
+        espera = espera_ms / 1000
+        if esperado + espera > limite:
+            LIMITER_ESPERA.observar(esperado)
+            msg = f"Sem ficha do limitador do Google em {limite}s ({', '.join(chaves)})"
+            raise CotaGoogleExcedida(msg, atraso=espera)
+        # Jitter para os processos acordados juntos não disputarem a mesma ficha
+        time.sleep(espera * random.uniform(1, 1.2))  # noqa: S311
+
+
+def _motivos(exc) -> list[str]:
+    """``reason`` dos erros do corpo da resposta (``error.errors`` ou ``error_details``)."""
+    detalhes = getattr(exc, "error_details", None) or []
+    try:
+        detalhes = [*detalhes, *json.loads(getattr(exc, "content", b"") or b"{}")["error"]["errors"]]
+    except (ValueError, KeyError, TypeError):
+        pass
+    return [d.get("reason", "") for d in detalhes if isinstance(d, dict)]
+
+
+def motivo_cota(exc) -> str | None:
+    """``reason`` do erro se for de cota (429 / 403 rateLimitExceeded…), senão ``None``."""
+    status = getattr(getattr(exc, "resp", None), "status", None)
+    motivos = _motivos(exc)
+    if status == 429:  # noqa: PLR2004
+        return next(iter(motivos), "") or "rateLimitExceeded"
+    if status == 403:  # noqa: PLR2004
+        return next((m for m in motivos if m in MOTIVOS_COTA), None)
+    return None
+
+
+def atraso_backoff(tentativa: int) -> float:
+    """Backoff exponencial com "full jitter": aleatório em [base, base·2^tentativa]."""
+    base = _config("GOOGLE_API_BACKOFF_BASE", 1.0)
+    teto = _config("GOOGLE_API_BACKOFF_MAXIMO", 64.0)
+    return random.uniform(base, min(teto, base * 2**tentativa))  # noqa: S311
+
+
+def _pausar(calendar_id: str | None, motivo: str, atraso: float):
+    """Pausa o bucket responsável pelo estouro para o cluster inteiro."""
+    if motivo in MOTIVOS_COTA_USUARIO and calendar_id:
+        escopo, chave = "calendario", f"{PREFIXO}calendario:{calendar_id}"
+    else:
+        escopo, chave = "projeto", f"{PREFIXO}projeto"
+    ERROS_COTA.incrementar(bucket=escopo)
+    if limitador_habilitado():
+        _script("pausar", _PAUSAR_LUA)(keys=[chave], args=[int(atraso * 1000)])
+
+
+def executar(requisicao, calendar_id: str | None = None, tentativas: int | None = None,
+             espera_maxima: float | None = None):
+    """
+    ``requisicao.execute()`` passando pelo limitador, com backoff em erros
+    de cota. Outros erros propagam na hora. Quem não pode esperar (ex.: um
+    request web) limita ``tentativas``/``espera_maxima`` e trata
+    ``CotaGoogleExcedida``.
+    """
+    tentativas = tentativas or _config("GOOGLE_API_MAX_TENTATIVAS", 5)
+    for tentativa in range(tentativas):
+        if limitador_habilitado():
+            tomar_ficha(calendar_id, espera_maxima)
+        try:
+            return requisicao.execute()
+        except Exception as exc:
+            motivo = motivo_cota(exc)
+            if motivo is None:
+                raise
+            atraso = atraso_backoff(tentativa)
+            _pausar(calendar_id, motivo, atraso)
+            if tentativa == tentativas - 1:
+                msg = f"Cota do Google excedida ({motivo}) após {tentativas} tentativas"
+                raise CotaGoogleExcedida(msg, atraso=atraso) from exc
+            logger.warning(
+                "Cota do Google excedida (%s) em %s; nova tentativa em %.1fs", motivo, calendar_id, atraso,
+            )
+            if not limitador_habilitado():
+                time.sleep(atraso)  # com o limitador, a pausa do bucket já segura a próxima ficha
+    return None
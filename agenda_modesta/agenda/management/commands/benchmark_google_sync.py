@@ -0,0 +1,156 @@
+"""
+Benchmark do sync Google → App contra o emulador local da API
+(``agenda/google_emulador.py``), sem service account nem rede.
+
+Uso:
+  python manage.py benchmark_google_sync                          # 2000 eventos
+  python manage.py benchmark_google_sync --eventos 20000 --alterados 2000 --latencia-ms 80
+  python manage.py benchmark_google_sync --cota-rps 10            # com 403 de cota
+  python manage.py benchmark_google_sync --comparar loadtest-results/google-sync-anterior.json
+
+Mede, para um subscritor temporário: o sync completo (sem syncToken), o
+incremental depois de ``--alterados`` edições e ``--removidos`` remoções
+no Google, e o incremental sem mudanças (só o custo fixo). Também compara
+o payload do sync completo com e sem ``fields``. Tudo roda numa transação
+desfeita no final; o resultado vai para
+``loadtest-results/google-sync-<data>-<commit>.json``.
+"""
+
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from agenda_modesta.agenda.google_calendar import listar_eventos_alterados, medir_trafego, sincronizar_eventos_google
+from agenda_modesta.agenda.google_emulador import EmuladorGoogleCalendar
+from agenda_modesta.agenda.models import Agenda
+from agenda_modesta.core.loadtest import commit_atual
+from agenda_modesta.users.models import User
+
+CALENDARIO = "benchmark@group.calendar.google.com"
+
+
+class Command(BaseCommand):
+    help = "Mede a vazão do sync completo e incremental do Google Calendar contra o emulador local."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--eventos", type=int, default=2000, help="Eventos no calendário emulado.")
+        parser.add_argument("--alterados", type=int, default=200, help="Eventos editados antes do incremental.")
+        parser.add_argument("--removidos", type=int, default=50, help="Eventos removidos antes do incremental.")
+        parser.add_argument("--convidados", type=int, default=5, help="Attendees por evento (peso do payload).")
+        parser.add_argument("--latencia-ms", type=float, default=0, help="Latência simulada por request.")
+        parser.add_argument("--cota-rps", type=int, default=0, help="Requests/s antes do 403 de cota (0 = sem cota).")
+        parser.add_argument("--pagina", type=int, default=250, help="maxResults padrão do emulador.")
+        parser.add_argument(
+            "--com-limitador", action="store_true", help="Mantém o limitador do Redis (google_quota) ligado.",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--saida", default="", help="Arquivo JSON de resultado.")
+        parser.add_argument("--comparar", default="", help="JSON de uma execução anterior para comparar.")
+
+    def handle(self, *args, **options):
+        emulador = EmuladorGoogleCalendar(
+            latencia=options["latencia_ms"] / 1000,
+            cota=(options["cota_rps"], 1.0) if options["cota_rps"] else None,
+            pagina_padrao=options["pagina"],
+            seed=options["seed"],
+        )
+        emulador.semear(CALENDARIO, options["eventos"], convidados=options["convidados"])
+
+        limitador = settings.GOOGLE_API_LIMITER_ENABLED and options["com_limitador"]
+        with override_settings(GOOGLE_API_LIMITER_ENABLED=limitador), emulador.ativar(), transaction.atomic():
+            cenarios = self._executar(emulador, options)
+            transaction.set_rollback(True)
+
+        resultado = {
+            "meta": {
+                "commit": commit_atual(settings.BASE_DIR),
+                "data": datetime.now().astimezone().isoformat(),
+                **{chave: options[chave] for chave in (
+                    "eventos", "alterados", "removidos", "convidados", "latencia_ms", "cota_rps", "pagina", "seed",
+                )},
+                "limitador": limitador,
+            },
+            "cenarios": cenarios,
+        }
+        caminho = self._salvar(resultado, options["saida"])
+        self._imprimir(resultado)
+        self.stdout.write(self.style.SUCCESS(f"Resultado salvo em {caminho}"))
+
+        if options["comparar"]:
+            self._comparar(resultado, json.loads(Path(options["comparar"]).read_text()))
+
+    def _executar(self, emulador, options) -> dict:
+        usuario = User.objects.create(username=f"benchmark-google-{options['seed']}", name="Benchmark Google")
+        subscritor = usuario.subscritor
+        subscritor.google_calendar_id = CALENDARIO
+        subscritor.save(update_fields=["google_calendar_id"])
+
+        cenarios = {}
+        cenarios["completo"], token = self._medir(emulador, subscritor, usuario, "")
+        cenarios["completo"]["agendas"] = Agenda.objects.filter(subscritor=subscritor).count()
+
+        emulador.alterar(CALENDARIO, options["alterados"])
+        emulador.remover(CALENDARIO, options["removidos"])
+        cenarios["incremental"], token = self._medir(emulador, subscritor, usuario, token)
+        cenarios["incremental_vazio"], _ = self._medir(emulador, subscritor, usuario, token)
+
+        # Mesmo sync completo, só a transferência: com e sem partial response
+        for nome, ignorar in (("payload_com_fields", False), ("payload_sem_fields", True)):
+            emulador.ignorar_fields = ignorar
+            with medir_trafego() as trafego:
+                listar_eventos_alterados("", calendar_id=CALENDARIO)
+            cenarios[nome] = {"requests": trafego["requests"], "bytes_rede": trafego["rede"],
+                              "bytes_json": trafego["json"]}
+        emulador.ignorar_fields = False
+        return cenarios
+
+    def _medir(self, emulador, subscritor, usuario, sync_token: str) -> tuple[dict, str]:
+        requests_antes, itens_antes = emulador.requests, emulador.itens_listados
+        inicio = time.perf_counter()
+        with medir_trafego() as trafego:
+            token = sincronizar_eventos_google(subscritor=subscritor, usuario=usuario, sync_token=sync_token)
+        duracao = time.perf_counter() - inicio
+        return {
+            "duracao_s": round(duracao, 3),
+            "itens": emulador.itens_listados - itens_antes,
+            "requests": emulador.requests - requests_antes,
+            "bytes_rede": trafego["rede"],
+            "bytes_json": trafego["json"],
+        }, token
+
+    def _salvar(self, resultado: dict, saida: str) -> Path:
+        if saida:
+            caminho = Path(saida)
+        else:
+            nome = f"google-sync-{datetime.now():%Y%m%d-%H%M%S}-{resultado['meta']['commit']}.json"  # noqa: DTZ005
+            caminho = Path(settings.BASE_DIR) / "loadtest-results" / nome
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        caminho.write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+        return caminho
+
+    def _imprimir(self, resultado: dict):
+        self.stdout.write(f"{'cenário':<20} {'duração s':>10} {'itens/s':>9} {'requests':>9} {'KB rede':>9} {'KB JSON':>9}")
+        for nome, c in resultado["cenarios"].items():
+            duracao = c.get("duracao_s")
+            vazao = round(c["itens"] / duracao) if c.get("itens") and duracao else "-"
+            self.stdout.write(
+                f"{nome:<20} {duracao if duracao is not None else '-':>10} {vazao:>9} {c['requests']:>9} "
+                f"{c['bytes_rede'] / 1024:>9.1f} {c['bytes_json'] / 1024:>9.1f}",
+            )
+
+    def _comparar(self, atual: dict, anterior: dict):
+        self.stdout.write(f"\nComparação com {anterior['meta']['commit']} (duração s / KB JSON):")
+        for nome, c in atual["cenarios"].items():
+            antes = anterior["cenarios"].get(nome)
+            if not antes:
+                continue
+            if c.get("duracao_s") and antes.get("duracao_s"):
+                variacao = (c["duracao_s"] - antes["duracao_s"]) / antes["duracao_s"] * 100
+                self.stdout.write(f"{nome:<20} {antes['duracao_s']:>8} → {c['duracao_s']:>8} ({variacao:+.1f}%)")
+            self.stdout.write(f"{'':<20} {antes['bytes_json'] / 1024:>8.1f} → {c['bytes_json'] / 1024:>8.1f} KB")
@@ -0,0 +1,74 @@
+"""
+Partições da tabela de agendamentos (``agenda/particoes.py``).
+
+Uso:
+  python manage.py particoes_agenda            # lista partições, linhas e tamanhos
+  python manage.py particoes_agenda --manter   # cria os próximos meses e arquiva os anos vencidos
+  python manage.py particoes_agenda --custo-id # EXPLAIN da busca só por id contra (id, data_inicio)
+
+Os índices "quentes" (partições mensais a partir do mês atual) devem ficar
+estáveis com o tempo; o histórico cresce só nas partições de arquivo.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from agenda_modesta.agenda.particoes import (
+    custo_busca_por_id,
+    listar_particoes,
+    manter_particoes,
+    mes_da_particao,
+    particionada,
+)
+
+
+class Command(BaseCommand):
+    help = "Lista e mantém as partições da tabela de agendamentos (Postgres)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--manter",
+            action="store_true",
+            help="Cria as partições dos próximos meses e arquiva os anos vencidos antes de listar.",
+        )
+        parser.add_argument(
+            "--custo-id",
+            action="store_true",
+            help="Mede a leitura de um agendamento só pelo id e pelo (id, data_inicio).",
+        )
+
+    def handle(self, *args, **options):
+        if not particionada():
+            msg = "A tabela agenda_agenda não é particionada (só Postgres, depois da migration 0011)."
+            raise CommandError(msg)
+
+        if options["manter"]:
+            resultado = manter_particoes()
+            self.stdout.write(
+                self.style.SUCCESS(f"Criadas: {resultado['criadas'] or '-'}; arquivadas: {resultado['arquivadas'] or '-'}"),
+            )
+
+        mes_atual = timezone.now().date().replace(day=1)
+        quentes = 0
+        self.stdout.write(f"{'partição':<26} {'linhas':>10} {'MB dados':>9} {'MB índices':>11}  faixa")
+        for particao in listar_particoes():
+            mes = mes_da_particao(particao["nome"])
+            if mes is not None and mes >= mes_atual:
+                quentes += particao["bytes_indices"]
+            self.stdout.write(
+                f"{particao['nome']:<26} {particao['linhas']:>10} {particao['bytes_dados'] / 2**20:>9.1f} "
+                f"{particao['bytes_indices'] / 2**20:>11.1f}  {particao['faixa']}",
+            )
+        self.stdout.write(f"Índices das partições do mês atual em diante: {quentes / 2**20:.1f} MB")
+
+        if options["custo_id"]:
+            custo = custo_busca_por_id()
+            if custo is None:
+                self.stdout.write("Sem agendamentos para medir.")
+                return
+            for rotulo, chave in (("só id", "id"), ("id + data_inicio", "id_e_data")):
+                medida = custo[chave]
+                self.stdout.write(
+                    f"{rotulo:<17} {medida['particoes']:>3} partições  planejamento {medida['planejamento_ms']:.3f} ms"
+                    f"  execução {medida['execucao_ms']:.3f} ms",
+                )
@@ -6,16 +6,19 @@ Uso:
   python manage.py sync_google_calendar --full         # sync completo
   python manage.py sync_google_calendar --register     # registrar webhook
   python manage.py sync_google_calendar --unregister   # cancelar webhooks
+  python manage.py sync_google_calendar --full --medir # bytes trafegados por subscritor
 """
 
 from django.core.management.base import BaseCommand
 
 from agenda_modesta.agenda.google_calendar import (
+    canal_atual,
     cancelar_webhook,
+    medir_trafego,
     registrar_webhook,
     sincronizar_eventos_google,
 )
-from agenda_modesta.agenda.models import GoogleCalendarChannel
+from agenda_modesta.agenda.models import GoogleCalendarChannel, OrigemSync
 from agenda_modesta.subscriptions.models import Subscritor
 
 
@@ -44,6 +47,11 @@ class Command(BaseCommand):
             default="",
             help="UUID do subscritor. Se omitido, processa todos.",
         )
+        parser.add_argument(
+            "--medir",
+            action="store_true",
+            help="Mostra requests e bytes trafegados com o Google em cada sync.",
+        )
 
     def handle(self, *args, **options):
         subscritores = self._get_subscritores(options["subscritor"])
@@ -55,7 +63,7 @@ class Command(BaseCommand):
         if options["register"]:
             self._register(subscritores)
 
-        self._sync(subscritores, full=options["full"])
+        self._sync(subscritores, full=options["full"], medir=options["medir"])
 
     def _get_subscritores(self, subscritor_id: str):
         if subscritor_id:
@@ -91,23 +99,28 @@ class Command(BaseCommand):
                 self.style.SUCCESS(f"Webhook {ch.channel_id} cancelado.")
             )
 
-    def _sync(self, subscritores, full: bool):
+    def _sync(self, subscritores, full: bool, medir: bool = False):
         for sub in subscritores:
             usuario = sub.usuario  # owner do subscritor
 
-            channel = GoogleCalendarChannel.objects.filter(
-                subscritor=sub,
-            ).order_by("-criado_em").first()
+            channel = canal_atual(sub)
 
             sync_token = "" if full else (channel.sync_token if channel else "")
 
-            self.stdout.write(f"Sincronizando {sub} (full={full})…")
+            self.stdout.write(f"Sincronizando {sub} em {sub.calendario_google} (full={full})…")
             try:
-                new_token = sincronizar_eventos_google(
-                    subscritor=sub,
-                    usuario=usuario,
-                    sync_token=sync_token,
-                )
+                with medir_trafego() as trafego:
+                    new_token = sincronizar_eventos_google(
+                        subscritor=sub,
+                        usuario=usuario,
+                        sync_token=sync_token,
+                        origem=OrigemSync.COMANDO,
+                    )
+                if medir:
+                    self.stdout.write(
+                        f"  {trafego['requests']} requests, {trafego['rede']} bytes na rede (estimado), "
+                        f"{trafego['json']} bytes de JSON",
+                    )
                 if channel:
                     channel.sync_token = new_token
                     channel.save(update_fields=["sync_token"])
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.11 on 2026-10-19 14:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agenda', '0004_remove_agenda_local'),
+        ('projects', '0001_initial'),
+        ('subscriptions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='agenda',
+            index=models.Index(fields=['subscritor', 'data_inicio'], name='agenda_sub_inicio_idx'),
+        ),
+    ]
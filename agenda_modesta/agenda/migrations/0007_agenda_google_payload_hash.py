@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agenda', '0006_agenda_lembrete_pendente_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agenda',
+            name='google_payload_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
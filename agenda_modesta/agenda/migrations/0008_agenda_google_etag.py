@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-19 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agenda', '0007_agenda_google_payload_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agenda',
+            name='google_atualizado_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='agenda',
+            name='google_etag',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agenda', '0008_agenda_google_etag'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='googlecalendarchannel',
+            name='token',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.11 on 2026-10-19 15:13
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agenda', '0009_googlecalendarchannel_token'),
+        ('subscriptions', '0003_subscritor_google_calendar_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExecucaoSync',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('google_calendar_id', models.CharField(max_length=255)),
+                ('origem', models.CharField(choices=[('webhook', 'Webhook'), ('manual', 'Botão sincronizar'), ('ativacao', 'Ativação'), ('comando', 'Management command')], max_length=20)),
+                ('tipo', models.CharField(choices=[('completo', 'Completo'), ('incremental', 'Incremental')], max_length=20)),
+                ('resync_410', models.BooleanField(default=False, verbose_name='Resync por 410')),
+                ('iniciado_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('duracao_ms', models.PositiveIntegerField(default=0)),
+                ('chamadas_api', models.PositiveIntegerField(default=0)),
+                ('paginas', models.PositiveIntegerField(default=0)),
+                ('bytes_json', models.PositiveBigIntegerField(default=0)),
+                ('bytes_rede', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('criados', models.PositiveIntegerField(default=0)),
+                ('atualizados', models.PositiveIntegerField(default=0)),
+                ('removidos', models.PositiveIntegerField(default=0)),
+                ('pulados', models.PositiveIntegerField(default=0)),
+                ('erro', models.TextField(blank=True)),
+                ('subscritor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='execucoes_sync', to='subscriptions.subscritor')),
+            ],
+            options={
+                'verbose_name': 'Execução de sync Google',
+                'verbose_name_plural': 'Execuções de sync Google',
+                'ordering': ['-iniciado_em'],
+                'indexes': [models.Index(fields=['iniciado_em'], name='execsync_iniciado_idx'), models.Index(fields=['subscritor', 'iniciado_em'], name='execsync_sub_iniciado_idx')],
+            },
+        ),
+    ]
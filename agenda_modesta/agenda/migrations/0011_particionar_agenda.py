@@ -0,0 +1,27 @@
+# Converte agenda_agenda numa tabela particionada por data_inicio (só Postgres).
+# Copia todas as linhas numa transação: rodar numa janela de manutenção.
+
+from django.db import migrations
+
+
+def particionar(apps, schema_editor):
+    from agenda_modesta.agenda.particoes import particionada, particionar_tabela
+
+    conexao = schema_editor.connection
+    if conexao.vendor != "postgresql" or particionada(conexao):
+        return
+    with conexao.cursor() as cursor:
+        particionar_tabela(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agenda", "0010_execucaosync"),
+        # A FK de EntregaNotificacao precisa sair antes: não há FK para uma tabela particionada por id
+        ("notifications", "0002_entreganotificacao_agenda_sem_fk"),
+    ]
+
+    operations = [
+        migrations.RunPython(particionar),
+    ]
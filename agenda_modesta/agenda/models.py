@@ -1,12 +1,14 @@
 import uuid
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
+from agenda_modesta.core.models import CamposAlteradosMixin
 from agenda_modesta.subscriptions.models import Subscritor
 from agenda_modesta.projects.models import Projeto
 
 
-class Agenda(models.Model):
+class Agenda(CamposAlteradosMixin, models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
     usuario = models.ForeignKey(
@@ -50,6 +52,12 @@ class Agenda(models.Model):
     data_atualizacao = models.DateTimeField(auto_now=True)
 
     ultima_sincronizacao = models.DateTimeField(blank=True, null=True)
+    # sha256 do último corpo de evento enviado/recebido do Google (evita push repetido)
+    google_payload_hash = models.CharField(max_length=64, blank=True, editable=False)
+    # Versão do evento no Google (etag/updated) na última troca; o sync de
+    # entrada pula itens com a mesma versão
+    google_etag = models.CharField(max_length=255, blank=True, editable=False)
+    google_atualizado_em = models.DateTimeField(blank=True, null=True, editable=False)
 
     # Flag para evitar loop infinito nos signals (app→Google→webhook→app)
     _skip_google_sync = False
@@ -58,10 +66,31 @@ class Agenda(models.Model):
         ordering = ["-data_inicio"]
         verbose_name = "Agendamento"
         verbose_name_plural = "Agendamentos"
+        indexes = [
+            # Consultas por faixa de datas do subscritor (lista, semana, horários livres)
+            models.Index(fields=["subscritor", "data_inicio"], name="agenda_sub_inicio_idx"),
+            # Varredura de lembretes: só as linhas ainda pendentes entram no índice
+            models.Index(
+                fields=["data_inicio"],
+                condition=models.Q(notificar_email=True, notificado=False),
+                name="agenda_lembrete_pendente_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.titulo
 
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # Tabela particionada por data_inicio (agenda/particoes.py): com a data
+        # lida do banco o UPDATE abre só a partição da linha. Se outra gravação
+        # mudou a data no meio tempo, repete só pelo id
+        original = getattr(self, "_valores_originais", {}).get("data_inicio")
+        if original is not None and values and super()._do_update(
+            base_qs.filter(data_inicio=original), using, pk_val, values, update_fields, forced_update,
+        ):
+            return True
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+
 
 class GoogleCalendarChannel(models.Model):
     """Armazena dados do canal push (webhook) do Google Calendar."""
@@ -77,6 +106,8 @@ class GoogleCalendarChannel(models.Model):
     google_calendar_id = models.CharField(max_length=255)
     expiration = models.DateTimeField()
     sync_token = models.CharField(max_length=255, blank=True)
+    # Devolvido pelo Google em X-Goog-Channel-Token (ver agenda/webhook.py)
+    token = models.CharField(max_length=64, blank=True)
     criado_em = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -85,3 +116,61 @@ class GoogleCalendarChannel(models.Model):
 
     def __str__(self):
         return f"Channel {self.channel_id} ({self.subscritor})"
+
+
+class OrigemSync(models.TextChoices):
+    WEBHOOK = "webhook", "Webhook"
+    MANUAL = "manual", "Botão sincronizar"
+    ATIVACAO = "ativacao", "Ativação"
+    COMANDO = "comando", "Management command"
+
+
+class TipoSync(models.TextChoices):
+    COMPLETO = "completo", "Completo"
+    INCREMENTAL = "incremental", "Incremental"
+
+
+class ExecucaoSync(models.Model):
+    """Telemetria de uma execução de ``sincronizar_eventos_google``."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    subscritor = models.ForeignKey(
+        Subscritor,
+        on_delete=models.CASCADE,
+        related_name="execucoes_sync",
+    )
+    google_calendar_id = models.CharField(max_length=255)
+    origem = models.CharField(max_length=20, choices=OrigemSync.choices)
+    # Tipo pedido; um incremental com syncToken expirado vira completo (resync_410)
+    tipo = models.CharField(max_length=20, choices=TipoSync.choices)
+    resync_410 = models.BooleanField("Resync por 410", default=False)
+
+    iniciado_em = models.DateTimeField(default=timezone.now)
+    duracao_ms = models.PositiveIntegerField(default=0)
+    chamadas_api = models.PositiveIntegerField(default=0)
+    paginas = models.PositiveIntegerField(default=0)
+    bytes_json = models.PositiveBigIntegerField(default=0)
+    # Estimado, só com GOOGLE_API_MEDIR_TRAFEGO (ver google_calendar.medir_trafego)
+    bytes_rede = models.PositiveBigIntegerField(null=True, blank=True)
+
+    criados = models.PositiveIntegerField(default=0)
+    atualizados = models.PositiveIntegerField(default=0)
+    removidos = models.PositiveIntegerField(default=0)
+    pulados = models.PositiveIntegerField(default=0)
+    erro = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-iniciado_em"]
+        verbose_name = "Execução de sync Google"
+        verbose_name_plural = "Execuções de sync Google"
+        indexes = [
+            models.Index(fields=["iniciado_em"], name="execsync_iniciado_idx"),
+            models.Index(fields=["subscritor", "iniciado_em"], name="execsync_sub_iniciado_idx"),
+        ]
+
+    def __str__(self):
+        return f"Sync {self.get_tipo_display().lower()} de {self.subscritor} em {self.iniciado_em:%d/%m/%Y %H:%M}"
+
+    @property
+    def sucesso(self) -> bool:
+        return not self.erro
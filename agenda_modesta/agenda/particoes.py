@@ -0,0 +1,393 @@
+"""
+Particionamento da tabela ``agenda_agenda`` por ``data_inicio`` (Postgres).
+
+A migration ``0011_particionar_agenda`` troca a tabela por uma particionada
+por faixa (``PARTITION BY RANGE (data_inicio)``), com:
+
+- uma partição por mês (``agenda_agenda_p202605``) do primeiro ano ainda
+  fora do arquivo até ``AGENDA_PARTICOES_MESES_A_FRENTE`` meses à frente;
+- uma partição por ano (``agenda_agenda_arq2023``) para o que passou de
+  ``AGENDA_ARQUIVO_MESES``: os meses do ano são copiados para ela, em ordem
+  de (subscritor, data_inicio), sem espaço livre nas páginas
+  (``fillfactor=100``), com TOAST em lz4 (se o servidor tiver) e, opcionalmente, num tablespace
+  mais barato (``AGENDA_ARQUIVO_TABLESPACE``). Na migration, os anos que
+  já passaram do arquivo vão direto para partições anuais, só os que têm
+  linhas: uma data perdida em 1970 cria uma partição, não 600 meses;
+- ``agenda_agenda_padrao`` (DEFAULT) para datas fora de todas as faixas.
+
+As consultas do dia a dia filtram ou ordenam por ``data_inicio`` (lista,
+semana, dashboard, lembretes), então o Postgres só abre as partições
+recentes e os índices delas, que não crescem com o histórico.
+
+O Postgres não deixa uma partição de fora da chave primária, que passa a
+ser ``(id, data_inicio)``; para o Django a pk continua ``id``. Pelo mesmo
+motivo ``EntregaNotificacao.agenda`` não tem mais FK no banco
+(``db_constraint=False``); o CASCADE continua pelo ORM.
+
+Uma busca só por ``id`` não tem como podar partições: consulta o índice da
+pk de cada uma (uma descida de B-tree por partição, mais o planejamento).
+Onde a data está à mão ela vai junto: o ``save()`` da Agenda usa a
+``data_inicio`` lida do banco (``Agenda._do_update``), o push para o Google
+grava por ``atualizar_agenda`` e a varredura de lembretes marca o lote
+dentro da própria janela. Ficam só por ``id`` as telas de detalhe e edição
+(a URL só tem o id), as tasks que recebem o id e a exclusão; o custo é
+medido por ``custo_busca_por_id`` (``manage.py particoes_agenda --custo-id``).
+
+``manter_particoes`` (task ``manter_particoes_agenda``, diária) cria as
+partições dos próximos meses e arquiva os anos vencidos. Fora do Postgres,
+ou antes da migration, tudo aqui é no-op.
+"""
+
+import json
+import logging
+from datetime import UTC, date, datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+TABELA = "agenda_agenda"
+PADRAO = f"{TABELA}_padrao"
+PREFIXO_MES = f"{TABELA}_p"
+PREFIXO_ARQUIVO = f"{TABELA}_arq"
+
+
+def _config(nome: str, padrao):
+    return getattr(settings, nome, padrao)
+
+
+# ---------------------------------------------------------------------------
+# Datas e nomes
+# ---------------------------------------------------------------------------
+
+
+def somar_meses(mes: date, meses: int) -> date:
+    """Primeiro dia do mês ``meses`` depois (ou antes) de ``mes``."""
+    indice = mes.year * 12 + mes.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def nome_mes(mes: date) -> str:
+    return f"{PREFIXO_MES}{mes:%Y%m}"
+
+
+def nome_arquivo(ano: int) -> str:
+    return f"{PREFIXO_ARQUIVO}{ano}"
+
+
+def mes_da_particao(nome: str) -> date | None:
+    """Mês de uma partição mensal pelo nome (``None`` para as outras)."""
+    sufixo = nome.removeprefix(PREFIXO_MES)
+    if sufixo == nome or len(sufixo) != 6 or not sufixo.isdigit():  # noqa: PLR2004
+        return None
+    return date(int(sufixo[:4]), int(sufixo[4:]), 1)
+
+
+def _limite(dia: date) -> str:
+    """Literal de timestamptz para os limites da faixa (sempre meia-noite UTC)."""
+    return f"'{dia.isoformat()} 00:00:00+00'"
+
+
+def corte_arquivo(hoje: date, meses_arquivo: int) -> date:
+    """Mês a partir do qual nada é arquivado; anos inteiros antes dele vão para o arquivo."""
+    return somar_meses(hoje.replace(day=1), -meses_arquivo)
+
+
+def meses_para_criar(hoje: date, meses_a_frente: int, existentes: set[str]) -> list[date]:
+    """Meses de ``hoje`` até ``meses_a_frente`` adiante que ainda não têm partição."""
+    atual = hoje.replace(day=1)
+    meses = [somar_meses(atual, n) for n in range(meses_a_frente + 1)]
+    return [mes for mes in meses if nome_mes(mes) not in existentes]
+
+
+def anos_para_arquivar(existentes: set[str], corte: date) -> dict[int, list[str]]:
+    """
+    ``{ano: [partições mensais]}`` dos anos inteiros antes de ``corte``.
+    Um ano só é arquivado quando todos os seus meses já passaram do corte.
+    """
+    anos: dict[int, list[str]] = {}
+    for nome in sorted(existentes):
+        mes = mes_da_particao(nome)
+        if mes is not None and date(mes.year + 1, 1, 1) <= corte:
+            anos.setdefault(mes.year, []).append(nome)
+    return anos
+
+
+# ---------------------------------------------------------------------------
+# Banco
+# ---------------------------------------------------------------------------
+
+
+def atualizar_agenda(pk, data_inicio, **campos) -> int:
+    """
+    ``UPDATE`` de uma agenda pela chave inteira (id, data_inicio), que abre só
+    a partição da linha. Se a data mudou no meio tempo, repete só pelo id.
+    """
+    from .models import Agenda
+
+    return (
+        Agenda.objects.filter(pk=pk, data_inicio=data_inicio).update(**campos)
+        or Agenda.objects.filter(pk=pk).update(**campos)
+    )
+
+
+def particionada(conexao=connection) -> bool:
+    """A tabela da Agenda já é particionada (Postgres depois da migration)?"""
+    if conexao.vendor != "postgresql":
+        return False
+    with conexao.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABELA],
+        )
+        return cursor.fetchone() is not None
+
+
+def listar_particoes(conexao=connection) -> list[dict]:
+    """Partições com faixa, linhas estimadas e bytes de dados e de índices."""
+    with conexao.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint,
+                   pg_table_size(c.oid), pg_indexes_size(c.oid)
+              FROM pg_inherits i
+              JOIN pg_class c ON c.oid = i.inhrelid
+             WHERE i.inhparent = to_regclass(%s)
+             ORDER BY c.relname
+            """,
+            [TABELA],
+        )
+        return [
+            {"nome": nome, "faixa": faixa, "linhas": max(linhas, 0), "bytes_dados": dados, "bytes_indices": indices}
+            for nome, faixa, linhas, dados, indices in cursor.fetchall()
+        ]
+
+
+def _relacoes(plano: dict) -> set[str]:
+    """Tabelas lidas por um plano do ``EXPLAIN (FORMAT JSON)``."""
+    nomes = {plano["Relation Name"]} if "Relation Name" in plano else set()
+    for filho in plano.get("Plans", []):
+        nomes |= _relacoes(filho)
+    return nomes
+
+
+def _explicar(cursor, sql: str, parametros: list) -> dict:
+    cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}", parametros)
+    plano = cursor.fetchone()[0]
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    plano = plano[0]
+    return {
+        "particoes": len(_relacoes(plano["Plan"])),
+        "planejamento_ms": plano["Planning Time"],
+        "execucao_ms": plano["Execution Time"],
+    }
+
+
+def custo_busca_por_id(conexao=connection) -> dict | None:
+    """
+    ``EXPLAIN ANALYZE`` da leitura do agendamento mais recente só pelo id e
+    pelo (id, data_inicio): partições lidas e tempos de cada uma.
+    """
+    with conexao.cursor() as cursor:
+        cursor.execute(f"SELECT id, data_inicio FROM {TABELA} ORDER BY data_inicio DESC LIMIT 1")  # noqa: S608
+        linha = cursor.fetchone()
+        if linha is None:
+            return None
+        pk, data_inicio = linha
+        return {
+            "id": _explicar(cursor, f"SELECT * FROM {TABELA} WHERE id = %s", [pk]),  # noqa: S608
+            "id_e_data": _explicar(
+                cursor, f"SELECT * FROM {TABELA} WHERE id = %s AND data_inicio = %s", [pk, data_inicio],  # noqa: S608
+            ),
+        }
+
+
+def _nova_tabela(cursor, nome: str, opcoes: str = ""):
+    # Com os índices da principal já criados, o ATTACH os reaproveita em vez de construí-los
+    cursor.execute(
+        f"CREATE TABLE {nome} (LIKE {TABELA} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE "
+        f"INCLUDING INDEXES) {opcoes}",
+    )
+
+
+def _mover_da_padrao(cursor, destino: str, inicio: date, fim: date):
+    """Leva para ``destino`` as linhas da faixa que tinham caído na partição padrão."""
+    cursor.execute(  # noqa: S608
+        f"""
+        WITH movidas AS (
+            DELETE FROM {PADRAO} WHERE data_inicio >= {_limite(inicio)} AND data_inicio < {_limite(fim)}
+            RETURNING *
+        )
+        INSERT INTO {destino} SELECT * FROM movidas
+        """,
+    )
+
+
+def _anexar(cursor, nome: str, inicio: date, fim: date):
+    # Com o CHECK da faixa o ATTACH não varre a tabela para validá-la
+    faixa = f"data_inicio >= {_limite(inicio)} AND data_inicio < {_limite(fim)}"
+    cursor.execute(f"ALTER TABLE {nome} ADD CONSTRAINT {nome}_faixa CHECK ({faixa})")
+    cursor.execute(
+        f"ALTER TABLE {TABELA} ATTACH PARTITION {nome} FOR VALUES FROM ({_limite(inicio)}) TO ({_limite(fim)})",
+    )
+    cursor.execute(f"ALTER TABLE {nome} DROP CONSTRAINT {nome}_faixa")
+
+
+def _tem_lz4(cursor) -> bool:
+    """
+    O servidor comprime TOAST com lz4? Só do Postgres 14 em diante e só se
+    compilado com ``--with-lz4``; sem isso o ``SET COMPRESSION lz4`` dá erro.
+    """
+    cursor.execute(
+        "SELECT 'lz4' = ANY(enumvals) FROM pg_settings WHERE name = 'default_toast_compression'",
+    )
+    linha = cursor.fetchone()
+    return bool(linha and linha[0])
+
+
+def _nova_tabela_arquivo(cursor, nome: str):
+    """Tabela de arquivo: páginas cheias, TOAST em lz4 (ou o pglz padrão), tablespace opcional."""
+    tablespace = _config("AGENDA_ARQUIVO_TABLESPACE", "")
+    _nova_tabela(cursor, nome, "WITH (fillfactor = 100)" + (f" TABLESPACE {tablespace}" if tablespace else ""))
+    if _tem_lz4(cursor):
+        cursor.execute(f"ALTER TABLE {nome} ALTER COLUMN descricao SET COMPRESSION lz4")
+    else:
+        logger.info("Postgres sem lz4: %s fica com a compressão padrão (pglz)", nome)
+
+
+def criar_particao_anual(cursor, ano: int) -> str:
+    """Partição de arquivo vazia para ``ano`` (usada na migration)."""
+    nome = nome_arquivo(ano)
+    _nova_tabela_arquivo(cursor, nome)
+    _anexar(cursor, nome, date(ano, 1, 1), date(ano + 1, 1, 1))
+    return nome
+
+
+def criar_particao_mensal(cursor, mes: date) -> str:
+    nome = nome_mes(mes)
+    fim = somar_meses(mes, 1)
+    # Uma linha da faixa que caísse na padrão depois da cópia faria o ATTACH falhar
+    cursor.execute(f"LOCK TABLE {PADRAO} IN EXCLUSIVE MODE")
+    _nova_tabela(cursor, nome)
+    _mover_da_padrao(cursor, nome, mes, fim)
+    _anexar(cursor, nome, mes, fim)
+    return nome
+
+
+def arquivar_ano(cursor, ano: int, mensais: list[str]) -> str:
+    """
+    Junta os meses de ``ano`` numa partição anual compacta e apaga os mensais.
+
+    A cópia roda com os meses e a partição padrão só travados para escrita
+    (uma linha do ano que caísse na padrão depois da cópia faria o ATTACH
+    falhar); o lock exclusivo na tabela principal (DETACH) fica para o fim,
+    até o commit.
+    """
+    nome = nome_arquivo(ano)
+    inicio, fim = date(ano, 1, 1), date(ano + 1, 1, 1)
+
+    cursor.execute(f"LOCK TABLE {', '.join([*mensais, PADRAO])} IN EXCLUSIVE MODE")
+    _nova_tabela_arquivo(cursor, nome)
+    # Gravadas uma vez, na ordem das consultas por tenant
+    origem = " UNION ALL ".join(f"SELECT * FROM {mensal}" for mensal in mensais)  # noqa: S608
+    cursor.execute(f"INSERT INTO {nome} SELECT * FROM ({origem}) AS meses ORDER BY subscritor_id, data_inicio")  # noqa: S608
+    _mover_da_padrao(cursor, nome, inicio, fim)
+    for mensal in mensais:
+        cursor.execute(f"ALTER TABLE {TABELA} DETACH PARTITION {mensal}")
+        cursor.execute(f"DROP TABLE {mensal}")
+    _anexar(cursor, nome, inicio, fim)
+    return nome
+
+
+def manter_particoes(hoje: date | None = None) -> dict:
+    """Cria as partições dos próximos meses e arquiva os anos vencidos."""
+    if not particionada():
+        return {"particionada": False, "criadas": [], "arquivadas": []}
+
+    hoje = hoje or timezone.now().date()
+    existentes = {particao["nome"] for particao in listar_particoes()}
+    criadas, arquivadas = [], []
+
+    for mes in meses_para_criar(hoje, _config("AGENDA_PARTICOES_MESES_A_FRENTE", 12), existentes):
+        with transaction.atomic(), connection.cursor() as cursor:
+            criadas.append(criar_particao_mensal(cursor, mes))
+
+    corte = corte_arquivo(hoje, _config("AGENDA_ARQUIVO_MESES", 24))
+    for ano, mensais in anos_para_arquivar(existentes, corte).items():
+        if nome_arquivo(ano) in existentes:
+            logger.warning("Partição de arquivo de %s já existe; meses %s ficam como estão", ano, mensais)
+            continue
+        with transaction.atomic(), connection.cursor() as cursor:
+            arquivadas.append(arquivar_ano(cursor, ano, mensais))
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {arquivadas[-1]}")
+
+    if criadas or arquivadas:
+        logger.info("Partições da agenda: criadas %s, arquivadas %s", criadas, arquivadas)
+    return {"particionada": True, "criadas": criadas, "arquivadas": arquivadas}
+
+
+def particionar_tabela(cursor, hoje: date | None = None):
+    """
+    Converte ``agenda_agenda`` numa tabela particionada (usado pela migration).
+
+    Copia as linhas para a tabela nova e recria nela os índices e FKs da
+    antiga, com os mesmos nomes, depois da carga. Partições mensais só a
+    partir do primeiro ano fora do arquivo; os anteriores com linhas ganham
+    direto a partição anual.
+    """
+    cursor.execute(
+        """
+        SELECT indexdef FROM pg_indexes
+         WHERE schemaname = current_schema() AND tablename = %s AND indexname <> %s
+        """,
+        [TABELA, f"{TABELA}_pkey"],
+    )
+    indices = [indexdef for (indexdef,) in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        [TABELA],
+    )
+    fks = cursor.fetchall()
+    hoje = hoje or datetime.now(tz=UTC).date()
+    inicio = date(corte_arquivo(hoje, _config("AGENDA_ARQUIVO_MESES", 24)).year, 1, 1)
+    cursor.execute(f"SELECT min(data_inicio) FROM {TABELA}")  # noqa: S608
+    primeiro = cursor.fetchone()[0]
+    cursor.execute(
+        f"SELECT DISTINCT extract(year FROM data_inicio AT TIME ZONE 'UTC')::int FROM {TABELA} "  # noqa: S608
+        f"WHERE data_inicio < {_limite(inicio)}",
+    )
+    anos = sorted(ano for (ano,) in cursor.fetchall())
+
+    legado = f"{TABELA}_legado"
+    cursor.execute(f"ALTER TABLE {TABELA} RENAME CONSTRAINT {TABELA}_pkey TO {legado}_pkey")
+    cursor.execute(f"ALTER TABLE {TABELA} RENAME TO {legado}")
+    cursor.execute(
+        f"CREATE TABLE {TABELA} (LIKE {legado} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE) "
+        "PARTITION BY RANGE (data_inicio)",
+    )
+    cursor.execute(f"ALTER TABLE {TABELA} ADD CONSTRAINT {TABELA}_pkey PRIMARY KEY (id, data_inicio)")
+    cursor.execute(f"CREATE TABLE {PADRAO} PARTITION OF {TABELA} DEFAULT")
+
+    for ano in anos:
+        criar_particao_anual(cursor, ano)
+    mes = max((primeiro.astimezone(UTC).date() if primeiro else hoje).replace(day=1), inicio)
+    ultimo = somar_meses(hoje.replace(day=1), _config("AGENDA_PARTICOES_MESES_A_FRENTE", 12))
+    while mes <= ultimo:
+        criar_particao_mensal(cursor, mes)
+        mes = somar_meses(mes, 1)
+
+    # O arquivo é gravado na ordem das consultas por tenant, como em arquivar_ano
+    cursor.execute(  # noqa: S608
+        f"INSERT INTO {TABELA} SELECT * FROM {legado} WHERE data_inicio < {_limite(inicio)} "
+        "ORDER BY subscritor_id, data_inicio",
+    )
+    cursor.execute(f"INSERT INTO {TABELA} SELECT * FROM {legado} WHERE data_inicio >= {_limite(inicio)}")  # noqa: S608
+    cursor.execute(f"DROP TABLE {legado}")
+    for indexdef in indices:
+        cursor.execute(indexdef)
+    for conname, definicao in fks:
+        cursor.execute(f"ALTER TABLE {TABELA} ADD CONSTRAINT {conname} {definicao}")
+    cursor.execute(f"ANALYZE {TABELA}")
@@ -6,29 +6,63 @@ e dispara notificações por e-mail via Celery.
 import logging
 
 from django.conf import settings
+from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from agenda_modesta.core.metrics import Contador
+
 from .models import Agenda
+from .particoes import atualizar_agenda
 
 logger = logging.getLogger(__name__)
 
+# Campos que cada espelho da Agenda usa; saves que não tocam neles não
+# disparam o receiver correspondente (ver CamposAlteradosMixin.alterou).
+CAMPOS_HORARIOS = ("subscritor", "data_inicio", "data_fim")
+CAMPOS_SCHEDULER = ("titulo", "descricao", "data_inicio", "data_fim", "confirmado", "projeto")
+CAMPOS_GOOGLE = ("titulo", "descricao", "data_inicio", "data_fim")  # _agenda_to_event_body
+CAMPOS_LEMBRETES = ("data_inicio", "notificar_email")
+
+GOOGLE_PUSH = Contador(
+    "agenda_google_push_total", "Saves de Agenda por ação no Google Calendar (criar, atualizar, pulado, adiado).",
+)
+# Limites do push feito dentro do request (ver google_quota.executar)
+PUSH_INTERATIVO = {"tentativas": 1, "espera_maxima": 2}
+
 
 def _google_calendar_enabled() -> bool:
     return bool(
-        getattr(settings, "GOOGLE_CALENDAR_ID", "")
-        and (
-            getattr(settings, "GOOGLE_CALENDAR_CREDENTIALS_FILE", "")
-            or getattr(settings, "GOOGLE_CALENDAR_CREDENTIALS_JSON", "")
-        ),
+        getattr(settings, "GOOGLE_CALENDAR_CREDENTIALS_FILE", "")
+        or getattr(settings, "GOOGLE_CALENDAR_CREDENTIALS_JSON", ""),
     )
 
 
+def _tem_calendario(agenda) -> bool:
+    """A agenda já está num calendário do Google, ou o tenant tem um?"""
+    return bool(agenda.google_calendar_id or agenda.subscritor.calendario_google)
+
+
+# ---------------------------------------------------------------------------
+# Cache de horários livres – invalidação por versão
+# ---------------------------------------------------------------------------
+
+@receiver(post_save, sender=Agenda)
+@receiver(post_delete, sender=Agenda)
+def invalidar_horarios_livres(sender, instance, **kwargs):
+    """Troca a versão da agenda do subscritor, invalidando o cache de horários."""
+    from .availability import incrementar_versao_agenda
+
+    if kwargs["signal"] is post_save and not instance.alterou(*CAMPOS_HORARIOS):
+        return
+    incrementar_versao_agenda(instance.subscritor_id)
+
+
 # ---------------------------------------------------------------------------
 # Django Scheduler – sync
 # ---------------------------------------------------------------------------
 
-def _get_or_create_scheduler_calendar(subscritor):
+def get_or_create_scheduler_calendar(subscritor):
     """Retorna (ou cria) o Calendar do django-scheduler para o subscritor."""
     from schedule.models import Calendar as ScheduleCalendar
 
@@ -40,13 +74,8 @@ def _get_or_create_scheduler_calendar(subscritor):
     return cal
 
 
-@receiver(post_save, sender=Agenda)
-def sync_agenda_to_scheduler(sender, instance, created, **kwargs):
-    """Cria ou atualiza um Event do django-scheduler ao salvar Agenda."""
-    from schedule.models import Event as ScheduleEvent
-
-    cal = _get_or_create_scheduler_calendar(instance.subscritor)
-
+def dados_evento_scheduler(instance) -> dict:
+    """Campos do Event do django-scheduler que espelha a Agenda."""
     # Cores por status
     color = "#10b981" if instance.confirmado else "#f59e0b"  # green / amber
 
@@ -55,6 +84,26 @@ def sync_agenda_to_scheduler(sender, instance, created, **kwargs):
     if instance.projeto and instance.projeto.cliente:
         title = f"{instance.titulo} – {instance.projeto.cliente.nome}"
 
+    return {
+        "title": title,
+        "start": instance.data_inicio,
+        "end": instance.data_fim,
+        "color_event": color,
+        "description": f"agenda_id:{instance.pk}\n{instance.descricao}",
+    }
+
+
+@receiver(post_save, sender=Agenda)
+def sync_agenda_to_scheduler(sender, instance, created, **kwargs):
+    """Cria ou atualiza um Event do django-scheduler ao salvar Agenda."""
+    from schedule.models import Event as ScheduleEvent
+
+    if not created and not instance.alterou(*CAMPOS_SCHEDULER):
+        return
+
+    cal = get_or_create_scheduler_calendar(instance.subscritor)
+    dados = dados_evento_scheduler(instance)
+
     # Tentar encontrar evento existente vinculado
     existing = ScheduleEvent.objects.filter(
         calendar=cal,
@@ -62,22 +111,11 @@ def sync_agenda_to_scheduler(sender, instance, created, **kwargs):
     ).first()
 
     if existing:
-        existing.title = title
-        existing.start = instance.data_inicio
-        existing.end = instance.data_fim
-        existing.color_event = color
-        existing.description = f"agenda_id:{instance.pk}\n{instance.descricao}"
+        for campo, valor in dados.items():
+            setattr(existing, campo, valor)
         existing.save()
     else:
-        ScheduleEvent.objects.create(
-            calendar=cal,
-            title=title,
-            start=instance.data_inicio,
-            end=instance.data_fim,
-            color_event=color,
-            creator=instance.usuario,
-            description=f"agenda_id:{instance.pk}\n{instance.descricao}",
-        )
+        ScheduleEvent.objects.create(calendar=cal, creator=instance.usuario, **dados)
 
 
 @receiver(post_delete, sender=Agenda)
@@ -85,7 +123,7 @@ def delete_agenda_from_scheduler(sender, instance, **kwargs):
     """Remove o Event do django-scheduler ao deletar Agenda."""
     from schedule.models import Event as ScheduleEvent
 
-    cal = _get_or_create_scheduler_calendar(instance.subscritor)
+    cal = get_or_create_scheduler_calendar(instance.subscritor)
     ScheduleEvent.objects.filter(
         calendar=cal,
         description__contains=f"agenda_id:{instance.pk}",
@@ -97,9 +135,44 @@ def delete_agenda_from_scheduler(sender, instance, **kwargs):
 # ---------------------------------------------------------------------------
 
 
+def enviar_agenda_google(instance, **limites) -> str:
+    """
+    Cria ou atualiza o evento da agenda no Google e guarda a versão
+    devolvida. Retorna a ação no formato de ``GOOGLE_PUSH``. Propaga
+    ``CotaGoogleExcedida`` para o chamador decidir quando tentar de novo.
+    """
+    from .google_calendar import atualizar_evento, criar_evento, hash_evento, versao_evento  # noqa: E402
+
+    criar = not instance.google_event_id
+    # Corpo idêntico ao último enviado (ou recebido) do Google: nada a fazer
+    payload_hash = hash_evento(instance)
+    if not criar and payload_hash == instance.google_payload_hash:
+        return "pulado"
+
+    evento = criar_evento(instance, **limites) if criar else atualizar_evento(instance, **limites)
+
+    # Guarda a versão devolvida pelo Google: o eco deste push no sync de
+    # entrada é reconhecido e pulado
+    campos = {"google_payload_hash": payload_hash, **versao_evento(evento)}
+    if criar:
+        campos["google_calendar_id"] = instance.subscritor.calendario_google
+    if evento.get("id") and instance.google_event_id != evento["id"]:
+        campos["google_event_id"] = evento["id"]
+    atualizar_agenda(instance.pk, instance.data_inicio, **campos)
+    for campo, valor in campos.items():
+        setattr(instance, campo, valor)
+    return "criar" if criar else "atualizar"
+
+
 @receiver(post_save, sender=Agenda)
 def sync_agenda_google(sender, instance, created, **kwargs):
-    """Cria ou atualiza evento no Google Calendar ao salvar Agenda."""
+    """
+    Cria ou atualiza evento no Google Calendar ao salvar Agenda.
+
+    O save acontece dentro de um request: sem ficha do limitador em poucos
+    segundos, o push vai para ``reenviar_agenda_google`` em vez de segurar
+    a resposta.
+    """
     # Evita loop: se o save veio do webhook não reenviar para o Google
     if getattr(instance, "_skip_google_sync", False):
         return
@@ -107,34 +180,104 @@ def sync_agenda_google(sender, instance, created, **kwargs):
     if not _google_calendar_enabled():
         return
 
-    from .google_calendar import atualizar_evento, criar_evento  # noqa: E402
+    if not created and instance.google_event_id and not instance.alterou(*CAMPOS_GOOGLE):
+        GOOGLE_PUSH.incrementar(acao="pulado")
+        return
+    if not _tem_calendario(instance):
+        return
 
-    try:
-        if created or not instance.google_event_id:
-            event_id = criar_evento(instance)
-        else:
-            event_id = atualizar_evento(instance)
+    from .google_quota import CotaGoogleExcedida  # noqa: E402
 
-        if event_id and instance.google_event_id != event_id:
-            Agenda.objects.filter(pk=instance.pk).update(google_event_id=event_id)
+    try:
+        GOOGLE_PUSH.incrementar(acao=enviar_agenda_google(instance, **PUSH_INTERATIVO))
+    except CotaGoogleExcedida as exc:
+        GOOGLE_PUSH.incrementar(acao="adiado")
+        _adiar_push_google(instance.pk, exc.atraso)
     except Exception:
         logger.exception("Erro ao sincronizar agenda %s com Google Calendar", instance.pk)
 
 
+def _adiar_push_google(agenda_id, atraso: float):
+    """Reenvia o push pelo worker depois do commit, quando a cota deve ter voltado."""
+    from agenda_modesta.notifications.tasks import reenviar_agenda_google
+
+    logger.info("Cota do Google esgotada; push da agenda %s adiado em %.1fs", agenda_id, atraso)
+    transaction.on_commit(
+        lambda: reenviar_agenda_google.apply_async((str(agenda_id),), countdown=max(atraso, 1)),
+    )
+
+
 @receiver(post_delete, sender=Agenda)
 def delete_agenda_google(sender, instance, **kwargs):
-    """Remove evento do Google Calendar ao deletar Agenda."""
-    if not _google_calendar_enabled():
+    """
+    Remove evento do Google Calendar ao deletar Agenda. Sem cota no
+    request, a remoção vai para ``remover_evento_google`` após o commit.
+    """
+    if not _google_calendar_enabled() or not instance.google_event_id:
         return
 
-    from .google_calendar import deletar_evento  # noqa: E402
+    from .google_calendar import calendario_da_agenda, deletar_evento  # noqa: E402
+    from .google_quota import CotaGoogleExcedida  # noqa: E402
 
     try:
-        deletar_evento(instance)
+        deletar_evento(instance, **PUSH_INTERATIVO)
+    except CotaGoogleExcedida as exc:
+        _adiar_remocao_google(calendario_da_agenda(instance), instance.google_event_id, exc.atraso)
     except Exception:
         logger.exception("Erro ao deletar evento Google para agenda %s", instance.pk)
 
 
+def _adiar_remocao_google(calendar_id: str, event_id: str, atraso: float):
+    """A Agenda já não existe: a task recebe o calendário e o id do evento."""
+    from agenda_modesta.notifications.tasks import remover_evento_google
+
+    logger.info("Cota do Google esgotada; remoção do evento %s adiada em %.1fs", event_id, atraso)
+    transaction.on_commit(
+        lambda: remover_evento_google.apply_async((calendar_id, event_id), countdown=max(atraso, 1)),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Lembretes – fila de timers (Redis ZSET)
+# ---------------------------------------------------------------------------
+
+
+@receiver(post_save, sender=Agenda)
+def agendar_lembretes_agenda(sender, instance, **kwargs):
+    """Atualiza os lembretes do agendamento na fila de timers após o commit."""
+    from agenda_modesta.notifications import scheduler
+
+    if not scheduler.fila_habilitada() or not instance.alterou(*CAMPOS_LEMBRETES):
+        return
+
+    def _agendar():
+        try:
+            scheduler.agendar_lembretes(instance)
+        except Exception:
+            logger.exception("Erro ao agendar lembretes da agenda %s", instance.pk)
+
+    transaction.on_commit(_agendar)
+
+
+@receiver(post_delete, sender=Agenda)
+def cancelar_lembretes_agenda(sender, instance, **kwargs):
+    """Remove os lembretes pendentes do agendamento da fila de timers."""
+    from agenda_modesta.notifications import scheduler
+
+    if not scheduler.fila_habilitada():
+        return
+
+    agenda_id = instance.pk
+
+    def _cancelar():
+        try:
+            scheduler.cancelar_lembretes(agenda_id)
+        except Exception:
+            logger.exception("Erro ao cancelar lembretes da agenda %s", agenda_id)
+
+    transaction.on_commit(_cancelar)
+
+
 @receiver(post_save, sender=Agenda)
 def enviar_notificacao_agenda(sender, instance, created, **kwargs):
     """Dispara e-mail de confirmação via Celery ao criar um agendamento."""
@@ -1,3 +1,726 @@
-from django.test import TestCase
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from agenda_modesta.agenda.availability import encontrar_horarios_livres
+from agenda_modesta.agenda.availability import mesclar_intervalos
+from agenda_modesta.agenda.models import Agenda
+from agenda_modesta.core.tests.factories import AgendaFactory
+
+TZ = ZoneInfo("America/Sao_Paulo")
+
+
+def _dt(dia, hora, minuto=0):
+    return datetime(2026, 3, dia, hora, minuto, tzinfo=TZ)
+
+
+def test_mesclar_intervalos_une_sobrepostos_e_encostados():
+    blocos = mesclar_intervalos([
+        (_dt(2, 11), _dt(2, 12)),
+        (_dt(2, 9), _dt(2, 10)),
+        (_dt(2, 10), _dt(2, 10, 30)),
+        (_dt(2, 11, 30), _dt(2, 13)),
+    ])
+    assert blocos == [(_dt(2, 9), _dt(2, 10, 30)), (_dt(2, 11), _dt(2, 13))]
+
+
+def test_encontrar_horarios_livres_respeita_ocupados_e_expediente():
+    ocupados = [(_dt(2, 9), _dt(2, 10, 30)), (_dt(2, 11), _dt(2, 17, 30))]
+    horarios = encontrar_horarios_livres(
+        ocupados,
+        duracao=timedelta(hours=1),
+        data_inicial=date(2026, 3, 2),
+        data_final=date(2026, 3, 3),
+        hora_inicio=time(9),
+        hora_fim=time(18),
+        limite=3,
+        tz=TZ,
+    )
+    # Dia 2 não tem buraco de 1h; dia 3 está livre desde as 9h
+    assert horarios == [
+        (_dt(3, 9), _dt(3, 10)),
+        (_dt(3, 9, 30), _dt(3, 10, 30)),
+        (_dt(3, 10), _dt(3, 11)),
+    ]
+
+
+def test_encontrar_horarios_livres_ignora_passado():
+    horarios = encontrar_horarios_livres(
+        [],
+        duracao=timedelta(minutes=30),
+        data_inicial=date(2026, 3, 2),
+        data_final=date(2026, 3, 2),
+        hora_inicio=time(9),
+        hora_fim=time(18),
+        limite=1,
+        a_partir_de=_dt(2, 17),
+        tz=TZ,
+    )
+    assert horarios == [(_dt(2, 17), _dt(2, 17, 30))]
+
+
+EVENTO = {"id": "evt-1", "etag": '"3181161784712000"', "updated": "2026-03-02T12:00:00.000Z"}
+
+
+@pytest.fixture
+def google(settings):
+    settings.GOOGLE_CALENDAR_ID = "agenda@group.calendar.google.com"
+    settings.GOOGLE_CALENDAR_CREDENTIALS_JSON = "{}"
+    with (
+        mock.patch("agenda_modesta.agenda.google_calendar.criar_evento", return_value=EVENTO) as criar,
+        mock.patch("agenda_modesta.agenda.google_calendar.atualizar_evento", return_value=EVENTO) as atualizar,
+    ):
+        yield criar, atualizar
+
+
+@pytest.mark.django_db
+def test_toggle_confirmado_nao_chama_o_google(client, google):
+    criar, atualizar = google
+    agenda = AgendaFactory()
+    assert criar.call_count == 1
+    client.force_login(agenda.usuario)
+
+    response = client.post(reverse("agenda:toggle_confirmado", kwargs={"pk": agenda.pk}), headers={"HX-Request": "true"})
+
+    assert response.status_code == 200  # noqa: PLR2004
+    assert Agenda.objects.get(pk=agenda.pk).confirmado is not agenda.confirmado
+    atualizar.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_so_campos_do_evento_atualizam_o_google(google):
+    _, atualizar = google
+    agenda = Agenda.objects.get(pk=AgendaFactory().pk)
+
+    agenda.ultima_sincronizacao = timezone.now()
+    agenda.save()
+    atualizar.assert_not_called()
+
+    agenda.titulo = "Mixagem"
+    agenda.save()
+    atualizar.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_confirmado_atualiza_a_cor_no_scheduler():
+    from schedule.models import Event
+
+    agenda = Agenda.objects.get(pk=AgendaFactory(confirmado=False).pk)
+    agenda.confirmado = True
+    agenda.save(update_fields=["confirmado", "data_atualizacao"])
+
+    evento = Event.objects.get(description__contains=f"agenda_id:{agenda.pk}")
+    assert evento.color_event == "#10b981"
+
+
+@pytest.mark.django_db
+def test_corpo_igual_ao_ultimo_enviado_nao_chama_o_google(google):
+    _, atualizar = google
+    salva = Agenda.objects.get(pk=AgendaFactory().pk)
+    assert salva.google_payload_hash
+
+    # Instância montada à mão (sem rastreio de campos) com o mesmo conteúdo
+    copia = Agenda(**{f.attname: getattr(salva, f.attname) for f in Agenda._meta.concrete_fields})
+    copia._state.adding = False
+    copia.save()
+    atualizar.assert_not_called()
+
+    copia.descricao = "Levar os stems"
+    copia.save()
+    atualizar.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_sync_do_google_guarda_o_hash_do_eco(google):
+    from agenda_modesta.agenda.google_calendar import hash_evento
+    from agenda_modesta.agenda.google_calendar import sincronizar_eventos_google
+
+    agenda = AgendaFactory()
+    item = {
+        "id": "evt-1",
+        "summary": "Editado no Google",
+        "description": agenda.descricao,
+        "start": {"dateTime": agenda.data_inicio.isoformat()},
+        "end": {"dateTime": agenda.data_fim.isoformat()},
+        "extendedProperties": {"private": {"agenda_modesta_id": str(agenda.pk)}},
+    }
+    with mock.patch(
+        "agenda_modesta.agenda.google_calendar.listar_eventos_alterados", return_value=([item], "tok"),
+    ):
+        sincronizar_eventos_google(agenda.subscritor, agenda.usuario)
+
+    agenda = Agenda.objects.get(pk=agenda.pk)
+    assert agenda.titulo == "Editado no Google"
+    assert agenda.google_payload_hash == hash_evento(agenda)
+
+
+@pytest.mark.django_db
+def test_sync_do_google_pula_o_eco_do_proprio_push(google):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from agenda_modesta.agenda.google_calendar import sincronizar_eventos_google
+
+    agenda = AgendaFactory()  # push devolve EVENTO, com etag e updated
+    eco = {
+        **EVENTO,
+        "summary": agenda.titulo,
+        "start": {"dateTime": agenda.data_inicio.isoformat()},
+        "end": {"dateTime": agenda.data_fim.isoformat()},
+        "extendedProperties": {"private": {"agenda_modesta_id": str(agenda.pk)}},
+    }
+    editado = {**eco, "etag": '"3181161784999000"', "summary": "Editado no Google"}
+
+    listar = "agenda_modesta.agenda.google_calendar.listar_eventos_alterados"
+    with mock.patch(listar, return_value=([eco], "tok")), CaptureQueriesContext(connection) as queries:
+        sincronizar_eventos_google(agenda.subscritor, agenda.usuario)
+    escritas = [q["sql"] for q in queries if q["sql"].startswith(("UPDATE", "INSERT"))]
+    # Só a telemetria da execução (ExecucaoSync); nenhuma Agenda tocada
+    assert [sql for sql in escritas if "agenda_execucaosync" not in sql] == []
+
+    with mock.patch(listar, return_value=([editado], "tok")):
+        sincronizar_eventos_google(agenda.subscritor, agenda.usuario)
+    agenda = Agenda.objects.get(pk=agenda.pk)
+    assert agenda.titulo == "Editado no Google"
+    assert agenda.google_etag == editado["etag"]
+
+
+@pytest.mark.django_db
+def test_webhook_nao_passa_por_sessao_nem_banco(client):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    canal = {"subscritor_id": "sub-1", "token": "segredo"}
+    headers = {"X-Goog-Channel-ID": "canal-1", "X-Goog-Resource-State": "exists"}
+    with (
+        mock.patch("agenda_modesta.agenda.webhook.buscar_canal", return_value=canal),
+        mock.patch("agenda_modesta.agenda.webhook._enfileirar_sync", return_value=True) as enfileirar,
+        CaptureQueriesContext(connection) as queries,
+    ):
+        aceito = client.post(reverse("agenda:google_webhook"), headers={**headers, "X-Goog-Channel-Token": "segredo"})
+        recusado = client.post(reverse("agenda:google_webhook"), headers={**headers, "X-Goog-Channel-Token": "x"})
+
+    assert aceito.status_code == 200  # noqa: PLR2004
+    assert recusado.status_code == 403  # noqa: PLR2004
+    assert len(queries) == 0
+    assert not hasattr(aceito.wsgi_request, "session")
+    enfileirar.assert_called_once_with("sub-1")
+
+
+def test_webhook_agrupa_rajada_em_um_sync():
+    from agenda_modesta.agenda import webhook
+
+    redis = mock.Mock()
+    redis.set.side_effect = [True, None, None]
+    with (
+        mock.patch.object(webhook, "get_redis", return_value=redis),
+        mock.patch("agenda_modesta.notifications.tasks.sincronizar_google_calendar.apply_async") as apply_async,
+    ):
+        resultados = [webhook._enfileirar_sync("sub-1") for _ in range(3)]
+
+    assert resultados == [True, False, False]
+    apply_async.assert_called_once_with(("sub-1",), countdown=webhook._debounce())
+
+
+class _RedisEmMemoria:
+    """Só os comandos de hash que o mapa de canais usa."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def hset(self, chave, campo=None, valor=None, mapping=None):
+        self.hashes.setdefault(chave, {}).update(mapping or {campo: valor})
+
+    def hget(self, chave, campo):
+        return self.hashes.get(chave, {}).get(campo)
+
+    def hexists(self, chave, campo):
+        return campo in self.hashes.get(chave, {})
+
+    def hkeys(self, chave):
+        return list(self.hashes.get(chave, {}))
+
+    def hdel(self, chave, *campos):
+        for campo in campos:
+            self.hashes.get(chave, {}).pop(campo, None)
+
+    def exists(self, chave):
+        return int(chave in self.hashes)
+
+    def delete(self, chave):
+        self.hashes.pop(chave, None)
+
+    def pipeline(self, transaction=True):  # noqa: FBT002
+        return self
+
+    def execute(self):
+        pass
+
+
+@pytest.mark.django_db
+def test_mapa_do_webhook_e_reconstruido_apos_flush_mesmo_com_canal_novo():
+    from agenda_modesta.agenda import webhook
+    from agenda_modesta.core.tests.factories import GoogleCalendarChannelFactory
+
+    antigo = GoogleCalendarChannelFactory(token="a")
+    novo = GoogleCalendarChannelFactory(token="b")
+    redis = _RedisEmMemoria()
+    with mock.patch.object(webhook, "get_redis", return_value=redis):
+        webhook.reconstruir_mapa()
+        redis.hashes.clear()  # flush / failover
+        webhook.mapear_canal(novo)  # renovação recria o hash só com este canal
+
+        assert webhook.buscar_canal(antigo.channel_id) == {"subscritor_id": str(antigo.subscritor_id), "token": "a"}
+        assert webhook.buscar_canal("desconhecido") is None
+
+
+@pytest.mark.django_db
+def test_reconstruir_mapa_nao_apaga_canal_mapeado_durante_a_leitura():
+    from agenda_modesta.agenda import webhook
+    from agenda_modesta.agenda.models import GoogleCalendarChannel
+    from agenda_modesta.core.tests.factories import GoogleCalendarChannelFactory
+
+    existente = GoogleCalendarChannelFactory(token="a")
+    redis = _RedisEmMemoria()
+    redis.hset(webhook.CANAIS_KEY, "cancelado-sem-hdel", "{}")
+    novo = None
+    canais = GoogleCalendarChannel.objects.values_list
+
+    def registrar_no_meio(*args, **kwargs):
+        # registrar_webhook → mapear_canal depois do retrato do banco
+        nonlocal novo
+        retrato = list(canais(*args, **kwargs))
+        novo = GoogleCalendarChannelFactory(token="b")
+        webhook.mapear_canal(novo)
+        return retrato
+
+    with (
+        mock.patch.object(webhook, "get_redis", return_value=redis),
+        mock.patch.object(GoogleCalendarChannel.objects, "values_list", side_effect=registrar_no_meio),
+    ):
+        assert webhook.reconstruir_mapa() == 1
+
+    with mock.patch.object(webhook, "get_redis", return_value=redis):
+        assert webhook.buscar_canal(existente.channel_id)["token"] == "a"
+        assert webhook.buscar_canal(novo.channel_id)["token"] == "b"
+        assert webhook.buscar_canal("cancelado-sem-hdel") is None
+
+
+@pytest.mark.django_db
+def test_cada_tenant_usa_o_proprio_calendario(settings):
+    from agenda_modesta.agenda.google_calendar import canal_atual
+    from agenda_modesta.agenda.google_calendar import criar_evento
+    from agenda_modesta.agenda.google_calendar import listar_eventos_alterados
+    from agenda_modesta.core.tests.factories import GoogleCalendarChannelFactory
+
+    settings.GOOGLE_CALENDAR_ID = "compartilhado@group.calendar.google.com"
+    agenda = AgendaFactory()
+    subscritor = agenda.subscritor
+    subscritor.google_calendar_id = "estudio@group.calendar.google.com"
+    subscritor.save()
+    GoogleCalendarChannelFactory(subscritor=subscritor, google_calendar_id=settings.GOOGLE_CALENDAR_ID)
+    atual = GoogleCalendarChannelFactory(subscritor=subscritor, google_calendar_id=subscritor.google_calendar_id)
+
+    service = mock.MagicMock()
+    service.events().insert().execute.return_value = EVENTO
+    service.events().list().execute.return_value = {"items": [], "nextSyncToken": "tok"}
+    with mock.patch("agenda_modesta.agenda.google_calendar.get_calendar_service", return_value=service):
+        criar_evento(agenda)
+        listar_eventos_alterados("", calendar_id=subscritor.calendario_google)
+
+    assert service.events().insert.call_args.kwargs["calendarId"] == "estudio@group.calendar.google.com"
+    assert service.events().list.call_args.kwargs["calendarId"] == "estudio@group.calendar.google.com"
+    assert canal_atual(subscritor) == atual
+
+
+def _erro_google(status, reason):
+    import json
+
+    import httplib2
+    from googleapiclient.errors import HttpError
+
+    conteudo = json.dumps({"error": {"code": status, "errors": [{"reason": reason}]}}).encode()
+    return HttpError(httplib2.Response({"status": status}), conteudo)
+
+
+def test_motivo_cota_separa_cota_de_outros_erros():
+    from agenda_modesta.agenda.google_quota import motivo_cota
+
+    assert motivo_cota(_erro_google(429, "rateLimitExceeded")) == "rateLimitExceeded"
+    assert motivo_cota(_erro_google(403, "userRateLimitExceeded")) == "userRateLimitExceeded"
+    assert motivo_cota(_erro_google(403, "forbidden")) is None
+    assert motivo_cota(_erro_google(404, "notFound")) is None
+
+
+def test_executar_repete_apos_cota_excedida():
+    from agenda_modesta.agenda import google_quota
+
+    requisicao = mock.Mock()
+    requisicao.execute.side_effect = [_erro_google(429, "rateLimitExceeded"), EVENTO]
+    with mock.patch.object(google_quota.time, "sleep") as sleep:
+        assert google_quota.executar(requisicao, "agenda@group.calendar.google.com") == EVENTO
+
+    assert requisicao.execute.call_count == 2  # noqa: PLR2004
+    sleep.assert_called_once()
+
+
+def test_executar_desiste_apos_as_tentativas():
+    from googleapiclient.errors import HttpError
+
+    from agenda_modesta.agenda import google_quota
+
+    requisicao = mock.Mock()
+    requisicao.execute.side_effect = _erro_google(403, "rateLimitExceeded")
+    with mock.patch.object(google_quota.time, "sleep"), pytest.raises(google_quota.CotaGoogleExcedida):
+        google_quota.executar(requisicao, tentativas=3)
+    assert requisicao.execute.call_count == 3  # noqa: PLR2004
+
+    # Erro que não é de cota propaga na primeira tentativa
+    requisicao = mock.Mock()
+    requisicao.execute.side_effect = _erro_google(404, "notFound")
+    with pytest.raises(HttpError):
+        google_quota.executar(requisicao)
+    assert requisicao.execute.call_count == 1
+
+
+@pytest.mark.django_db
+def test_push_sem_cota_vai_para_o_worker(google, django_capture_on_commit_callbacks):
+    from agenda_modesta.agenda.google_quota import CotaGoogleExcedida
+
+    criar, _ = google
+    criar.side_effect = CotaGoogleExcedida("sem ficha", atraso=7)
+    with (
+        mock.patch("agenda_modesta.notifications.tasks.reenviar_agenda_google.apply_async") as apply_async,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        agenda = AgendaFactory()
+
+    assert criar.call_args.kwargs == {"tentativas": 1, "espera_maxima": 2}
+    apply_async.assert_called_once_with((str(agenda.pk),), countdown=7)
+
+    criar.side_effect = None
+    from agenda_modesta.notifications.tasks import reenviar_agenda_google
+
+    reenviar_agenda_google(str(agenda.pk))
+    assert Agenda.objects.get(pk=agenda.pk).google_event_id == EVENTO["id"]
+
+
+@pytest.mark.django_db
+def test_remocao_sem_cota_vai_para_o_worker(google, django_capture_on_commit_callbacks):
+    from agenda_modesta.agenda.google_quota import CotaGoogleExcedida
+    from agenda_modesta.notifications.tasks import remover_evento_google
+
+    agenda = AgendaFactory()  # o push do save grava evt-1 no calendário do tenant
+    with (
+        mock.patch(
+            "agenda_modesta.agenda.google_calendar.deletar_evento",
+            side_effect=CotaGoogleExcedida("sem ficha", atraso=7),
+        ) as deletar,
+        mock.patch("agenda_modesta.notifications.tasks.remover_evento_google.apply_async") as apply_async,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        agenda.delete()
+
+    assert deletar.call_args.kwargs == {"tentativas": 1, "espera_maxima": 2}
+    apply_async.assert_called_once_with(("agenda@group.calendar.google.com", EVENTO["id"]), countdown=7)
+
+    with mock.patch("agenda_modesta.agenda.google_calendar.remover_evento") as remover:
+        remover_evento_google("agenda@group.calendar.google.com", "evt-apagado")
+        remover.assert_called_once_with("agenda@group.calendar.google.com", "evt-apagado")
+        # Já removido no Google: nada a repetir
+        remover.side_effect = _erro_google(410, "deleted")
+        remover_evento_google("agenda@group.calendar.google.com", "evt-apagado")
+
+
+def test_sync_pede_so_os_campos_usados_e_mede_o_trafego():
+    from agenda_modesta.agenda.google_calendar import CAMPOS_LISTA_SYNC
+    from agenda_modesta.agenda.google_calendar import _HttpMedido
+    from agenda_modesta.agenda.google_calendar import listar_eventos_alterados
+    from agenda_modesta.agenda.google_calendar import medir_trafego
+
+    service = mock.MagicMock()
+    service.events().list().execute.return_value = {"items": [EVENTO], "nextSyncToken": "tok"}
+    with mock.patch("agenda_modesta.agenda.google_calendar.get_calendar_service", return_value=service):
+        listar_eventos_alterados("", calendar_id="agenda@group.calendar.google.com")
+    assert service.events().list.call_args.kwargs["fields"] == CAMPOS_LISTA_SYNC
+    assert "attendees" not in CAMPOS_LISTA_SYNC
+
+    corpo = b'{"items": []}' * 100
+    http = mock.Mock()
+    http.request.return_value = ({"status": "200", "-content-encoding": "gzip"}, corpo)
+    medido = _HttpMedido(http)
+    medido.request("https://www.googleapis.com/calendar/v3/")  # fora da medição: não conta
+    with medir_trafego() as externo, medir_trafego() as trafego:
+        medido.request("https://www.googleapis.com/calendar/v3/")
+
+    assert trafego["requests"] == externo["requests"] == 1
+    assert trafego["json"] == len(corpo)
+    assert 0 < trafego["rede"] < len(corpo)
+
+
+@pytest.fixture
+def emulador(settings):
+    from agenda_modesta.agenda.google_emulador import EmuladorGoogleCalendar
+
+    settings.GOOGLE_CALENDAR_ID = "agenda@group.calendar.google.com"
+    emulador = EmuladorGoogleCalendar(pagina_padrao=2, seed=1)
+    with emulador.ativar():
+        yield emulador
+
+
+@pytest.mark.django_db
+def test_sync_completo_e_incremental_contra_o_emulador(emulador):
+    from googleapiclient.errors import HttpError
+
+    from agenda_modesta.agenda.google_calendar import sincronizar_eventos_google
+    from agenda_modesta.agenda.models import ExecucaoSync
+    from agenda_modesta.agenda.models import OrigemSync
+
+    agenda = AgendaFactory()
+    subscritor = agenda.subscritor
+    calendario = subscritor.calendario_google
+    emulador.semear(calendario, 5, convidados=2)
+
+    token = sincronizar_eventos_google(subscritor, agenda.usuario)
+    assert Agenda.objects.filter(subscritor=subscritor, origem="google").count() == 5  # noqa: PLR2004
+    assert emulador.operacoes["list"] == 3  # 5 eventos em páginas de 2  # noqa: PLR2004
+
+    editado, = emulador.alterar(calendario, 1)
+    removido, = emulador.remover(calendario, 1)
+    token = sincronizar_eventos_google(subscritor, agenda.usuario, sync_token=token)
+
+    assert Agenda.objects.get(google_event_id=editado).titulo.endswith("(editado)")
+    assert not Agenda.objects.filter(google_event_id=removido).exists()
+
+    # Token expirado (410): volta ao full sync sem perder nada
+    emulador.expirar_sync_tokens()
+    assert sincronizar_eventos_google(subscritor, agenda.usuario, sync_token=token)
+    assert Agenda.objects.filter(subscritor=subscritor, origem="google").count() == 4  # noqa: PLR2004
+
+    # Cada execução fica na telemetria; a última voltou ao completo por 410
+    completo, incremental, resync = ExecucaoSync.objects.order_by("iniciado_em")
+    assert (completo.tipo, completo.paginas, completo.chamadas_api, completo.criados) == ("completo", 3, 3, 5)
+    assert (incremental.atualizados, incremental.removidos, incremental.resync_410) == (1, 1, False)
+    assert (resync.tipo, resync.resync_410, resync.pulados) == ("incremental", True, 4)
+
+    emulador.falhar(500, operacao="list")
+    with pytest.raises(HttpError):
+        sincronizar_eventos_google(subscritor, agenda.usuario, origem=OrigemSync.MANUAL)
+    falha = ExecucaoSync.objects.order_by("iniciado_em").last()
+    assert falha.origem == OrigemSync.MANUAL
+    assert falha.erro.startswith("HttpError")
+
+
+@pytest.mark.django_db
+def test_push_e_canais_contra_o_emulador(emulador, settings):
+    from agenda_modesta.agenda.google_calendar import cancelar_webhook
+    from agenda_modesta.agenda.google_calendar import registrar_webhook
+    from agenda_modesta.agenda.models import GoogleCalendarChannel
+
+    settings.GOOGLE_CALENDAR_CREDENTIALS_JSON = "{}"
+    settings.GOOGLE_CALENDAR_WEBHOOK_URL = "https://exemplo.com/agenda/google/webhook/"
+    agenda = AgendaFactory()
+    agenda.refresh_from_db()
+    evento, = emulador.eventos(settings.GOOGLE_CALENDAR_ID)
+    assert agenda.google_event_id == evento["id"]
+    assert agenda.google_etag == evento["etag"]
+
+    agenda.titulo = "Mixagem"
+    agenda.save()
+    assert emulador.eventos(settings.GOOGLE_CALENDAR_ID)[0]["summary"] == "Mixagem"
+
+    with mock.patch("agenda_modesta.agenda.webhook.get_redis"):
+        registrar_webhook(agenda.subscritor)
+        canal = GoogleCalendarChannel.objects.get(subscritor=agenda.subscritor)
+        agenda.delete()
+        assert emulador.notificacoes[-1]["X-Goog-Channel-ID"] == canal.channel_id
+        cancelar_webhook(canal)
+    assert not emulador.canais
+    assert not emulador.eventos(settings.GOOGLE_CALENDAR_ID)
+
+
+def test_emulador_injeta_erros_cota_e_atende_lotes(emulador, settings):
+    from googleapiclient.errors import HttpError
+
+    from agenda_modesta.agenda import google_quota
+
+    calendario = settings.GOOGLE_CALENDAR_ID
+    ids = [evento["id"] for evento in emulador.semear(calendario, 3)]
+    servico = emulador.servico()
+
+    emulador.falhar(503, operacao="get")
+    with pytest.raises(HttpError):
+        google_quota.executar(servico.events().get(calendarId=calendario, eventId=ids[0]))
+
+    # Cota de 1 request/janela: o executar espera o backoff e consegue
+    emulador.cota = (1, 0.05)
+    with mock.patch.object(google_quota, "atraso_backoff", return_value=0.05):
+        for event_id in ids[:2]:
+            assert google_quota.executar(servico.events().get(calendarId=calendario, eventId=event_id))["id"] == event_id
+    emulador.cota = None
+
+    respostas = {}
+    lote = servico.new_batch_http_request(callback=lambda rid, resposta, erro: respostas.update({rid: (resposta, erro)}))
+    for event_id in [*ids, "inexistente"]:
+        lote.add(servico.events().get(calendarId=calendario, eventId=event_id, fields="id"))
+    lote.execute()
+    assert [respostas[str(n)][0] for n in range(1, 4)] == [{"id": event_id} for event_id in ids]
+    assert respostas["4"][1].resp.status == 404  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_benchmark_google_sync(tmp_path):
+    import json
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    saida = tmp_path / "resultado.json"
+    call_command(
+        "benchmark_google_sync", "--eventos", "30", "--alterados", "5", "--removidos", "2", "--pagina", "10",
+        "--saida", str(saida), stdout=StringIO(),
+    )
+
+    cenarios = json.loads(saida.read_text())["cenarios"]
+    assert cenarios["completo"]["itens"] == cenarios["completo"]["agendas"] == 30  # noqa: PLR2004
+    assert 0 < cenarios["incremental"]["itens"] <= 7  # remoções podem cair em eventos editados  # noqa: PLR2004
+    assert cenarios["incremental_vazio"]["itens"] == 0
+    assert cenarios["payload_com_fields"]["bytes_json"] < cenarios["payload_sem_fields"]["bytes_json"]
+    assert not Agenda.objects.exists()  # transação desfeita
+
+
+@pytest.mark.django_db
+def test_admin_de_execucoes_sinaliza_resync_frequente(admin_client):
+    from agenda_modesta.agenda.admin import LIMIAR_RESYNC_410
+    from agenda_modesta.agenda.admin import resumo_por_subscritor
+    from agenda_modesta.agenda.models import ExecucaoSync
+
+    estavel, instavel = AgendaFactory().subscritor, AgendaFactory().subscritor
+    for duracao in (100, 200, 300, 400):
+        ExecucaoSync.objects.create(subscritor=estavel, origem="webhook", tipo="incremental", duracao_ms=duracao)
+    for _ in range(LIMIAR_RESYNC_410):
+        ExecucaoSync.objects.create(
+            subscritor=instavel, origem="webhook", tipo="incremental", duracao_ms=50, resync_410=True,
+        )
+
+    resumo = resumo_por_subscritor(timezone.now() - timedelta(days=1))
+    assert [(linha["subscritor"], linha["alerta"]) for linha in resumo] == [(instavel, True), (estavel, False)]
+    assert resumo[1]["p95_ms"] == 385  # noqa: PLR2004
+
+    response = admin_client.get(reverse("admin:agenda_execucaosync_changelist"))
+    assert response.status_code == 200  # noqa: PLR2004
+    assert "volta ao sync completo" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_execucoes_sync_antigas_sao_purgadas_e_o_p95_le_so_a_amostra(settings, monkeypatch):
+    from agenda_modesta.agenda import admin as agenda_admin
+    from agenda_modesta.agenda.google_calendar import purgar_execucoes
+    from agenda_modesta.agenda.models import ExecucaoSync
+
+    settings.GOOGLE_SYNC_EXECUCOES_RETENCAO_DIAS = 30
+    subscritor = AgendaFactory().subscritor
+    agora = timezone.now()
+    for dias in (40, 31, 2, 1):
+        ExecucaoSync.objects.create(
+            subscritor=subscritor, origem="webhook", tipo="incremental",
+            iniciado_em=agora - timedelta(days=dias), duracao_ms=dias * 100, erro="x" if dias == 1 else "",
+        )
+
+    assert purgar_execucoes(lote=1) == 2  # noqa: PLR2004
+    assert ExecucaoSync.objects.count() == 2  # noqa: PLR2004
+
+    monkeypatch.setattr(agenda_admin, "AMOSTRA_P95", 1)
+    (linha,) = agenda_admin.resumo_por_subscritor(agora - timedelta(days=7))
+    # Contagens da janela inteira; p95 só da execução mais recente
+    assert (linha["execucoes"], linha["erros"], linha["resyncs_410"], linha["p95_ms"]) == (2, 1, 0, 100)
+
+
+def test_particoes_mensais_e_anos_para_arquivar():
+    from agenda_modesta.agenda import particoes
+
+    assert particoes.somar_meses(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert particoes.somar_meses(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert particoes.mes_da_particao("agenda_agenda_padrao") is None
+
+    existentes = {"agenda_agenda_p202605", "agenda_agenda_p202607"}
+    assert particoes.meses_para_criar(date(2026, 5, 19), 2, existentes) == [date(2026, 6, 1)]
+
+    existentes = {
+        "agenda_agenda_padrao", "agenda_agenda_arq2022",
+        "agenda_agenda_p202311", "agenda_agenda_p202312", "agenda_agenda_p202401",
+    }
+    # 2024 ainda tem meses depois do corte: fica mensal
+    assert particoes.anos_para_arquivar(existentes, date(2024, 6, 1)) == {
+        2023: ["agenda_agenda_p202311", "agenda_agenda_p202312"],
+    }
+    # Meses só do ano do corte em diante; antes disso, partições anuais
+    assert particoes.corte_arquivo(date(2026, 5, 19), 24) == date(2024, 5, 1)
+
+    plano = {
+        "Node Type": "Append",
+        "Plans": [
+            {"Node Type": "Index Scan", "Relation Name": "agenda_agenda_p202605"},
+            {"Node Type": "Index Scan", "Relation Name": "agenda_agenda_arq2023"},
+        ],
+    }
+    assert particoes._relacoes(plano) == {"agenda_agenda_p202605", "agenda_agenda_arq2023"}  # noqa: SLF001
+
+
+@pytest.mark.parametrize(("linha", "lz4"), [(None, False), ((False,), False), ((True,), True)])
+def test_arquivo_so_pede_lz4_se_o_servidor_tiver(linha, lz4):
+    from agenda_modesta.agenda import particoes
+
+    cursor = mock.Mock()
+    cursor.fetchone.return_value = linha  # None: Postgres 13, sem default_toast_compression
+    particoes._nova_tabela_arquivo(cursor, "agenda_agenda_arq2023")  # noqa: SLF001
+
+    comandos = [chamada.args[0] for chamada in cursor.execute.call_args_list]
+    assert any("SET COMPRESSION lz4" in comando for comando in comandos) is lz4
+
+
+@pytest.mark.django_db
+def test_save_da_agenda_atualiza_pela_data_lida_do_banco():
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from agenda_modesta.agenda.particoes import atualizar_agenda
+
+    agenda = Agenda.objects.get(pk=AgendaFactory().pk)
+    agenda.titulo = "Novo título"
+    with CaptureQueriesContext(connection) as queries:
+        agenda.save(update_fields=["titulo"])
+    (update,) = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "agenda_agenda"')]
+    assert '"data_inicio" =' in update.split("WHERE", 1)[1]
+
+    # Outra gravação mudou a data no meio tempo: cai no UPDATE só por id
+    Agenda.objects.filter(pk=agenda.pk).update(data_inicio=agenda.data_inicio + timedelta(days=1))
+    agenda.titulo = "Outro título"
+    agenda.save(update_fields=["titulo"])
+    assert Agenda.objects.get(pk=agenda.pk).titulo == "Outro título"
+    assert atualizar_agenda(agenda.pk, agenda.data_inicio, google_etag="v2") == 1
+    assert Agenda.objects.get(pk=agenda.pk).google_etag == "v2"
+
+
+@pytest.mark.django_db
+def test_filtro_por_dia_usa_a_faixa_no_fuso_local(client, settings):
+    from agenda_modesta.agenda.particoes import manter_particoes
+
+    settings.TIME_ZONE = "America/Sao_Paulo"
+    fuso = ZoneInfo("America/Sao_Paulo")
+    noite = AgendaFactory(data_inicio=datetime(2026, 3, 10, 23, 30, tzinfo=fuso))
+    subscritor = noite.subscritor
+    AgendaFactory(subscritor=subscritor, data_inicio=datetime(2026, 3, 11, 0, 10, tzinfo=fuso))
+    client.force_login(subscritor.usuario)
+
+    response = client.get(reverse("agenda:list"), {"data_inicio": "2026-03-10", "data_fim": "2026-03-10"})
+    assert list(response.context["agendamentos"]) == [noite]
+    response = client.get(reverse("agenda:list"), {"data_inicio": "2026-02-30"})  # data inválida é ignorada
+    assert response.status_code == 200  # noqa: PLR2004
+
+    # Fora do Postgres não há partições a manter
+    assert manter_particoes() == {"particionada": False, "criadas": [], "arquivadas": []}
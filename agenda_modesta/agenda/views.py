@@ -6,15 +6,15 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods, require_POST
 from django.utils import timezone
 
-from .models import Agenda, GoogleCalendarChannel
-from .forms import AgendaForm, StepProjetoForm, StepDetalhesForm
+from .models import Agenda, GoogleCalendarChannel, OrigemSync
+from .forms import AgendaForm, HorariosLivresForm, StepProjetoForm, StepDetalhesForm
+from agenda_modesta.core.utils import faixa_de_dias, ler_data
 from agenda_modesta.projects.models import Projeto
-from agenda_modesta.core.utils import get_user_subscritor
 
 
 @login_required
 def agenda_list(request):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     agendamentos = Agenda.objects.filter(
         subscritor=subscritor
     ).select_related('projeto', 'projeto__cliente').order_by('data_inicio')
@@ -25,12 +25,8 @@ def agenda_list(request):
         agendamentos = agendamentos.filter(titulo__icontains=q) | agendamentos.filter(projeto__cliente__nome__icontains=q)
 
     data_inicio = request.GET.get('data_inicio', '')
-    if data_inicio:
-        agendamentos = agendamentos.filter(data_inicio__date__gte=data_inicio)
-
     data_fim = request.GET.get('data_fim', '')
-    if data_fim:
-        agendamentos = agendamentos.filter(data_inicio__date__lte=data_fim)
+    agendamentos = agendamentos.filter(**faixa_de_dias(ler_data(data_inicio), ler_data(data_fim)))
 
     confirmado = request.GET.get('confirmado', '')
     if confirmado == 'true':
@@ -52,8 +48,9 @@ def agenda_list(request):
 
 @login_required
 def agenda_create(request):
-    subscritor = get_user_subscritor(request.user)
-    projetos = Projeto.objects.filter(subscritor=subscritor, ativo=True)
+    subscritor = request.subscritor
+    # O template mostra o cliente de cada projeto no <select>
+    projetos = Projeto.objects.filter(subscritor=subscritor, ativo=True).select_related('cliente')
 
     if request.method == 'POST':
         form = AgendaForm(request.POST)
@@ -77,9 +74,10 @@ def agenda_create(request):
 
 @login_required
 def agenda_edit(request, pk):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     agenda = get_object_or_404(Agenda, pk=pk, subscritor=subscritor)
-    projetos = Projeto.objects.filter(subscritor=subscritor, ativo=True)
+    # O template mostra o cliente de cada projeto no <select>
+    projetos = Projeto.objects.filter(subscritor=subscritor, ativo=True).select_related('cliente')
 
     if request.method == 'POST':
         form = AgendaForm(request.POST, instance=agenda)
@@ -102,7 +100,7 @@ def agenda_edit(request, pk):
 @login_required
 @require_http_methods(["DELETE"])
 def agenda_delete(request, pk):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     agenda = get_object_or_404(Agenda, pk=pk, subscritor=subscritor)
     agenda.delete()
     messages.success(request, 'Agendamento excluído com sucesso!')
@@ -112,10 +110,10 @@ def agenda_delete(request, pk):
 @login_required
 @require_http_methods(["POST"])
 def toggle_confirmado(request, pk):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     agenda = get_object_or_404(Agenda, pk=pk, subscritor=subscritor)
     agenda.confirmado = not agenda.confirmado
-    agenda.save()
+    agenda.save(update_fields=['confirmado', 'data_atualizacao'])
 
     # Return the updated row
     return render(request, 'agenda/partials/agenda_item.html', {'agenda': agenda})
@@ -126,7 +124,7 @@ def toggle_confirmado(request, pk):
 @login_required
 def novo_agendamento(request):
     """Retorna o partial do passo 1 (escolher projeto) dentro do modal."""
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     projetos = Projeto.objects.filter(subscritor=subscritor, ativo=True)
     form = StepProjetoForm()
     form.fields["projeto"].queryset = projetos
@@ -137,7 +135,7 @@ def novo_agendamento(request):
 @require_http_methods(["POST"])
 def step1_projeto(request):
     """Recebe o projeto escolhido (opcional) e retorna o passo 2 (detalhes)."""
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     form = StepProjetoForm(request.POST)
     projetos = Projeto.objects.filter(subscritor=subscritor, ativo=True)
     form.fields["projeto"].queryset = projetos
@@ -157,7 +155,7 @@ def step1_projeto(request):
 @require_http_methods(["POST"])
 def step2_detalhes(request):
     """Recebe os detalhes e retorna o passo 3 (confirmação)."""
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     projeto_id = request.POST.get("projeto_id")
     projeto = None
     if projeto_id:
@@ -183,7 +181,7 @@ def step2_detalhes(request):
 @require_http_methods(["POST"])
 def step3_confirmar(request):
     """Salva o agendamento definitivamente."""
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     projeto_id = request.POST.get("projeto_id")
     projeto = None
     if projeto_id:
@@ -219,7 +217,7 @@ def step3_confirmar(request):
 @login_required
 def projetos_por_cliente(request):
     """API HTMX – retorna <option> de projetos filtrados por cliente."""
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     cliente_id = request.GET.get("cliente")
     if not cliente_id:
         return HttpResponse('<option value="">—</option>')
@@ -238,7 +236,7 @@ def agenda_week_json(request):
     from datetime import datetime, timedelta
     import json as _json
 
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
 
     # Determinar a semana: aceita ?week_start=YYYY-MM-DD, senão usa a semana atual
     week_start_str = request.GET.get("week_start", "")
@@ -257,8 +255,7 @@ def agenda_week_json(request):
 
     agendamentos = Agenda.objects.filter(
         subscritor=subscritor,
-        data_inicio__date__gte=week_start,
-        data_inicio__date__lte=week_end,
+        **faixa_de_dias(week_start, week_end),
     ).select_related("projeto", "projeto__cliente").order_by("data_inicio")
 
     events = []
@@ -281,6 +278,55 @@ def agenda_week_json(request):
     })
 
 
+@login_required
+def horarios_livres(request):
+    """
+    Sugere os próximos horários livres do subscritor.
+
+    Querystring: duracao (min), data_inicial/data_final (YYYY-MM-DD),
+    hora_inicio/hora_fim (HH:MM) do expediente e limite (K).
+    Retorna JSON, ou o partial de sugestões quando chamado via HTMX
+    (passo 2 do novo agendamento).
+    """
+    from datetime import timedelta
+
+    from .availability import buscar_horarios_livres
+
+    subscritor = request.subscritor
+    form = HorariosLivresForm(request.GET)
+    if not form.is_valid():
+        if request.htmx:
+            return render(request, "agenda/partials/horarios_livres.html", {"form": form})
+        return JsonResponse({"errors": form.errors}, status=400)
+
+    dados = form.cleaned_data
+    horarios = buscar_horarios_livres(
+        subscritor,
+        duracao=timedelta(minutes=dados["duracao"]),
+        data_inicial=dados["data_inicial"],
+        data_final=dados["data_final"],
+        hora_inicio=dados["hora_inicio"],
+        hora_fim=dados["hora_fim"],
+        limite=dados["limite"],
+    )
+
+    if request.htmx:
+        return render(request, "agenda/partials/horarios_livres.html", {
+            "form": form,
+            "horarios": [
+                (timezone.localtime(inicio), timezone.localtime(fim))
+                for inicio, fim in horarios
+            ],
+        })
+
+    return JsonResponse({
+        "slots": [
+            {"start": inicio.isoformat(), "end": fim.isoformat()}
+            for inicio, fim in horarios
+        ],
+    })
+
+
 # ============ Google Calendar – Webhook & Sync ============
 
 import logging
@@ -293,43 +339,12 @@ _gc_logger = logging.getLogger(__name__)
 def google_calendar_webhook(request):
     """
     Endpoint que o Google Calendar chama via push notification quando
-    há alterações no calendário.
-    Headers relevantes:
-      X-Goog-Channel-ID   – ID do canal (nosso channel_id)
-      X-Goog-Resource-ID  – ID do recurso
-      X-Goog-Resource-State – "sync" (handshake) ou "exists" (mudança)
+    há alterações no calendário. Em produção a URL é atendida antes pelo
+    ``WebhookGoogleMiddleware``; ver ``agenda/webhook.py``.
     """
-    channel_id = request.headers.get("X-Goog-Channel-ID", "")
-    resource_state = request.headers.get("X-Goog-Resource-State", "")
+    from .webhook import tratar_notificacao
 
-    _gc_logger.info(
-        "Webhook recebido: channel=%s state=%s",
-        channel_id,
-        resource_state,
-    )
-
-    # Handshake inicial do Google → apenas responder 200
-    if resource_state == "sync":
-        return HttpResponse(status=200)
-
-    # Buscar o canal registrado
-    try:
-        channel = GoogleCalendarChannel.objects.select_related("subscritor").get(
-            channel_id=channel_id,
-        )
-    except GoogleCalendarChannel.DoesNotExist:
-        _gc_logger.warning("Webhook de canal desconhecido: %s", channel_id)
-        return HttpResponse(status=200)  # responder 200 para não reenviar
-
-    # Disparar sincronização via Celery (não bloquear a resposta)
-    from agenda_modesta.notifications.tasks import sincronizar_google_calendar
-
-    sincronizar_google_calendar.delay(
-        str(channel.subscritor.pk),
-        channel.sync_token,
-    )
-
-    return HttpResponse(status=200)
+    return tratar_notificacao(request)
 
 
 @login_required
@@ -341,7 +356,7 @@ def registrar_google_sync(request):
     """
     from .google_calendar import registrar_webhook, sincronizar_eventos_google
 
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
 
     try:
         result = registrar_webhook(subscritor)
@@ -351,6 +366,7 @@ def registrar_google_sync(request):
             subscritor=subscritor,
             usuario=request.user,
             sync_token="",
+            origem=OrigemSync.ATIVACAO,
         )
 
         # Salvar o sync_token no canal
@@ -374,13 +390,11 @@ def registrar_google_sync(request):
 @require_POST
 def sincronizar_google_agora(request):
     """Força uma sincronização imediata Google → App."""
-    from .google_calendar import sincronizar_eventos_google
+    from .google_calendar import canal_atual, sincronizar_eventos_google
 
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
 
-    channel = GoogleCalendarChannel.objects.filter(
-        subscritor=subscritor,
-    ).order_by("-criado_em").first()
+    channel = canal_atual(subscritor)
 
     sync_token = channel.sync_token if channel else ""
 
@@ -389,6 +403,7 @@ def sincronizar_google_agora(request):
             subscritor=subscritor,
             usuario=request.user,
             sync_token=sync_token,
+            origem=OrigemSync.MANUAL,
         )
         if channel:
             channel.sync_token = new_token
@@ -0,0 +1,174 @@
+"""
+Caminho rápido do webhook do Google Calendar.
+
+O Google chama o webhook a cada alteração do calendário, às vezes em
+rajadas de centenas de notificações. Para não tocar no Postgres a cada uma:
+
+- ``channel_id → {subscritor_id, token}`` fica num hash do Redis
+  (``CANAIS_KEY``), mantido por ``registrar_webhook``/``cancelar_webhook``;
+  canal desconhecido é rejeitado com um HGET;
+- notificações do mesmo subscritor dentro de ``GOOGLE_WEBHOOK_DEBOUNCE_SECONDS``
+  viram uma única task de sync (o sync é incremental, então uma execução
+  cobre todas as mudanças da janela);
+- ``WebhookGoogleMiddleware`` atende a URL antes de sessões, auth, mensagens
+  e allauth.
+
+Se o hash sumir do Redis (flush, failover), ele é reconstruído do banco na
+primeira notificação seguinte.
+"""
+
+import json
+import logging
+import secrets
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import resolve, reverse
+
+from agenda_modesta.core.metrics import Contador
+from agenda_modesta.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CANAIS_KEY = "google:webhook:canais"
+# Campo sentinela: distingue "hash reconstruído e vazio" de "hash perdido"
+_SENTINELA = "__reconstruido__"
+PENDENTE_KEY = "google:webhook:pendente:{}"
+
+WEBHOOK_NOTIFICACOES = Contador(
+    "google_webhook_total",
+    "Notificações do webhook do Google por resultado (sync, enfileirado, agrupado, desconhecido, token_invalido).",
+)
+
+
+def _debounce() -> int:
+    return getattr(settings, "GOOGLE_WEBHOOK_DEBOUNCE_SECONDS", 5)
+
+
+def gerar_token() -> str:
+    """Token enviado ao Google no watch e devolvido em X-Goog-Channel-Token."""
+    return secrets.token_urlsafe(32)
+
+
+def mapear_canal(channel):
+    """Inclui (ou atualiza) o canal no mapa do Redis."""
+    valor = json.dumps({"subscritor_id": str(channel.subscritor_id), "token": channel.token})
+    get_redis().hset(CANAIS_KEY, channel.channel_id, valor)
+
+
+def desmapear_canal(channel_id: str):
+    get_redis().hdel(CANAIS_KEY, channel_id)
+
+
+def reconstruir_mapa() -> int:
+    """
+    Recria o mapa a partir de ``GoogleCalendarChannel`` (após perda do Redis).
+
+    Sem DEL: um ``mapear_canal`` que caia entre a leitura do banco e a
+    gravação seria apagado, e com o sentinela já de volta o mapa não seria
+    reconstruído de novo. Grava o retrato do banco por cima e só tira os
+    canais que já estavam no hash antes da leitura, não vieram no retrato e
+    não existem mais no banco.
+    """
+    from .models import GoogleCalendarChannel
+
+    client = get_redis()
+    antes = {campo.decode() if isinstance(campo, bytes) else campo for campo in client.hkeys(CANAIS_KEY)}
+    canais = GoogleCalendarChannel.objects.values_list("channel_id", "subscritor_id", "token")
+    mapa = {
+        channel_id: json.dumps({"subscritor_id": str(subscritor_id), "token": token})
+        for channel_id, subscritor_id, token in canais
+    }
+    client.hset(CANAIS_KEY, mapping={_SENTINELA: "1", **mapa})
+
+    sobras = antes - set(mapa) - {_SENTINELA}
+    if sobras:
+        vivos = set(GoogleCalendarChannel.objects.filter(channel_id__in=sobras).values_list("channel_id", flat=True))
+        if sobras - vivos:
+            client.hdel(CANAIS_KEY, *(sobras - vivos))
+    logger.info("Mapa de canais do webhook reconstruído: %d canais", len(mapa))
+    return len(mapa)
+
+
+def buscar_canal(channel_id: str) -> dict | None:
+    """``{"subscritor_id", "token"}`` do canal, ou ``None`` se desconhecido."""
+    if not channel_id or channel_id == _SENTINELA:
+        return None
+    client = get_redis()
+    valor = client.hget(CANAIS_KEY, channel_id)
+    # Sem o sentinela o hash foi perdido, ainda que um ``mapear_canal``
+    # posterior (registro, renovação) já o tenha recriado com um só canal
+    if valor is None and not client.hexists(CANAIS_KEY, _SENTINELA):
+        reconstruir_mapa()
+        valor = client.hget(CANAIS_KEY, channel_id)
+    return json.loads(valor) if valor else None
+
+
+def _enfileirar_sync(subscritor_id: str) -> bool:
+    """Agenda o sync do subscritor, no máximo um por janela de debounce."""
+    from agenda_modesta.notifications.tasks import sincronizar_google_calendar
+
+    janela = _debounce()
+    if not get_redis().set(PENDENTE_KEY.format(subscritor_id), 1, nx=True, ex=max(janela, 1)):
+        return False
+    # Sem sync_token: a task usa o do canal mais recente no momento em que roda
+    sincronizar_google_calendar.apply_async((subscritor_id,), countdown=janela)
+    return True
+
+
+def tratar_notificacao(request) -> HttpResponse:
+    """
+    Atende uma notificação do Google sem sessão, auth nem banco.
+    Headers relevantes:
+      X-Goog-Channel-ID     – ID do canal (nosso channel_id)
+      X-Goog-Channel-Token  – token gerado no registro do canal
+      X-Goog-Resource-State – "sync" (handshake) ou "exists" (mudança)
+    """
+    if request.method != "POST":
+        return HttpResponse(status=405, headers={"Allow": "POST"})
+
+    channel_id = request.headers.get("X-Goog-Channel-ID", "")
+    resource_state = request.headers.get("X-Goog-Resource-State", "")
+
+    # Handshake inicial do Google → apenas responder 200
+    if resource_state == "sync":
+        WEBHOOK_NOTIFICACOES.incrementar(resultado="sync")
+        return HttpResponse(status=200)
+
+    canal = buscar_canal(channel_id)
+    if canal is None:
+        WEBHOOK_NOTIFICACOES.incrementar(resultado="desconhecido")
+        logger.warning("Webhook de canal desconhecido: %s", channel_id)
+        return HttpResponse(status=200)  # responder 200 para não reenviar
+
+    # Canais antigos (sem token) continuam aceitos até a próxima renovação
+    token = request.headers.get("X-Goog-Channel-Token", "")
+    if canal["token"] and not secrets.compare_digest(canal["token"], token):
+        WEBHOOK_NOTIFICACOES.incrementar(resultado="token_invalido")
+        logger.warning("Webhook com token inválido: channel=%s", channel_id)
+        return HttpResponse(status=403)
+
+    enfileirado = _enfileirar_sync(canal["subscritor_id"])
+    WEBHOOK_NOTIFICACOES.incrementar(resultado="enfileirado" if enfileirado else "agrupado")
+    return HttpResponse(status=200)
+
+
+class WebhookGoogleMiddleware:
+    """
+    Atende o webhook do Google antes do resto da cadeia de middlewares.
+
+    Fica logo depois de ``SecurityMiddleware``: sessões, CSRF, auth,
+    mensagens, allauth e o ``SubscritorMiddleware`` não rodam para essa URL.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._caminho = None
+
+    def __call__(self, request):
+        if self._caminho is None:
+            self._caminho = reverse("agenda:google_webhook")
+        if request.path_info != self._caminho:
+            return self.get_response(request)
+        request.resolver_match = resolve(request.path_info)
+        return tratar_notificacao(request)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-19 15:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cliente',
+            name='excluido_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalcliente',
+            name='excluido_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -28,6 +28,8 @@ class Cliente(models.Model):
     endereco = models.CharField(max_length=255)
 
     ativo = models.BooleanField(default=True)
+    # Exclusão pedida: some das telas na hora; core/exclusao.py remove os dependentes e a linha
+    excluido_em = models.DateTimeField(blank=True, null=True, editable=False)
     data_criacao = models.DateTimeField(auto_now_add=True)
     data_atualizacao = models.DateTimeField(auto_now=True)
 
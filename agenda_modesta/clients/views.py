@@ -5,9 +5,10 @@ from django.core.paginator import Paginator
 from django.http import HttpResponse
 from django.views.decorators.http import require_http_methods
 
+from agenda_modesta.core.exclusao import marcar_cliente_excluido
+
 from .models import Cliente
 from .forms import ClienteForm
-from agenda_modesta.core.utils import get_user_subscritor
 
 
 UFS = [
@@ -19,9 +20,9 @@ UFS = [
 
 @login_required
 def client_list(request):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     clientes = Cliente.objects.filter(
-        subscritor=subscritor
+        subscritor=subscritor, excluido_em__isnull=True
     ).order_by('-data_criacao')
 
     # Filters
@@ -55,7 +56,7 @@ def client_create(request):
         if form.is_valid():
             cliente = form.save(commit=False)
             cliente.usuario = request.user
-            cliente.subscritor = get_user_subscritor(request.user)
+            cliente.subscritor = request.subscritor
             cliente.save()
             messages.success(request, 'Cliente criado com sucesso!')
             return redirect('clients:list')
@@ -70,8 +71,8 @@ def client_create(request):
 
 @login_required
 def client_edit(request, pk):
-    subscritor = get_user_subscritor(request.user)
-    cliente = get_object_or_404(Cliente, pk=pk, subscritor=subscritor)
+    subscritor = request.subscritor
+    cliente = get_object_or_404(Cliente, pk=pk, subscritor=subscritor, excluido_em__isnull=True)
 
     if request.method == 'POST':
         form = ClienteForm(request.POST, instance=cliente)
@@ -91,16 +92,22 @@ def client_edit(request, pk):
 
 @login_required
 def client_detail(request, pk):
-    subscritor = get_user_subscritor(request.user)
-    cliente = get_object_or_404(Cliente, pk=pk, subscritor=subscritor)
-    return render(request, 'clients/client_detail.html', {'cliente': cliente})
+    subscritor = request.subscritor
+    cliente = get_object_or_404(Cliente, pk=pk, subscritor=subscritor, excluido_em__isnull=True)
+    # Avaliados uma vez aqui: o template testa e itera cada lista
+    return render(request, 'clients/client_detail.html', {
+        'cliente': cliente,
+        'projetos': list(cliente.projetos.filter(excluido_em__isnull=True)),
+        'orcamentos_recentes': list(cliente.orcamentos.order_by('-data_criacao')[:5]),
+    })
 
 
 @login_required
 @require_http_methods(["DELETE"])
 def client_delete(request, pk):
-    subscritor = get_user_subscritor(request.user)
-    cliente = get_object_or_404(Cliente, pk=pk, subscritor=subscritor)
-    cliente.delete()
+    subscritor = request.subscritor
+    cliente = get_object_or_404(Cliente, pk=pk, subscritor=subscritor, excluido_em__isnull=True)
+    # Some da lista na hora; projetos, orçamentos e recibos saem numa task
+    marcar_cliente_excluido(cliente)
     messages.success(request, 'Cliente excluído com sucesso!')
     return HttpResponse("")
@@ -1,4 +1,5 @@
 import pytest
+from django.core.cache import cache
 
 from agenda_modesta.users.models import User
 from agenda_modesta.users.tests.factories import UserFactory
@@ -9,6 +10,14 @@ def _media_storage(settings, tmpdir) -> None:
     settings.MEDIA_ROOT = tmpdir.strpath
 
 
+@pytest.fixture(autouse=True)
+def _limpar_cache():
+    # O cache local sobrevive entre testes, mas os ids do banco são reutilizados
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def user(db) -> User:
     return UserFactory()
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     name = 'agenda_modesta.core'
     verbose_name = 'Core'
+
+    def ready(self):
+        import agenda_modesta.core.celery_metrics  # noqa: F401
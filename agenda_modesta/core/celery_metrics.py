@@ -0,0 +1,96 @@
+"""
+Instrumentação das tasks Celery (tempo em fila, execução, retries, falhas)
+e profundidade das filas do broker, expostas em ``/metrics/``.
+
+O horário de publicação vai num header da mensagem (``publicado_em``), então
+o tempo em fila é medido de ponta a ponta mesmo entre processos diferentes.
+"""
+
+import time
+
+from celery import current_app
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.utils.dateparse import parse_datetime
+
+from . import metrics
+from .redis_client import get_redis
+
+TASK_FILA = metrics.Histograma(
+    "celery_task_queue_wait_seconds",
+    "Tempo entre a publicação (ou ETA) e o início da execução da task.",
+)
+TASK_EXECUCAO = metrics.Histograma(
+    "celery_task_runtime_seconds",
+    "Tempo de execução da task.",
+)
+TASK_TOTAL = metrics.Contador(
+    "celery_task_total",
+    "Execuções de tasks por estado final (SUCCESS, FAILURE, RETRY, ...).",
+)
+
+_inicios: dict[str, float] = {}
+
+
+@before_task_publish.connect
+def marcar_publicacao(headers=None, **kwargs):
+    if headers is not None:
+        headers["publicado_em"] = time.time()
+
+
+def _inicio_da_fila(request) -> float | None:
+    publicado_em = getattr(request, "publicado_em", None)
+    if publicado_em is None:
+        return None
+    eta = getattr(request, "eta", None)
+    if eta:
+        eta_dt = parse_datetime(eta) if isinstance(eta, str) else eta
+        if eta_dt is not None:
+            return max(float(publicado_em), eta_dt.timestamp())
+    return float(publicado_em)
+
+
+@task_prerun.connect
+def iniciar_medicao(task_id=None, task=None, **kwargs):
+    _inicios[task_id] = time.monotonic()
+    if task is None or task.request.is_eager:
+        return
+    inicio_fila = _inicio_da_fila(task.request)
+    if inicio_fila is not None:
+        fila = (task.request.delivery_info or {}).get("routing_key", "")
+        TASK_FILA.observar(max(time.time() - inicio_fila, 0.0), task=task.name, queue=fila)
+
+
+@task_postrun.connect
+def finalizar_medicao(task_id=None, task=None, state=None, **kwargs):
+    inicio = _inicios.pop(task_id, None)
+    if task is None or inicio is None:
+        return
+    with metrics.lote() as pipe:
+        TASK_EXECUCAO.observar(time.monotonic() - inicio, pipe=pipe, task=task.name)
+        TASK_TOTAL.incrementar(pipe=pipe, task=task.name, state=state or "UNKNOWN")
+
+
+@metrics.registrar_coletor
+def profundidade_filas() -> list[str]:
+    """Gauge lido na hora do scrape: mensagens pendentes por fila no Redis."""
+    conf = current_app.conf
+    opcoes = conf.broker_transport_options or {}
+    sep = opcoes.get("sep", "\x06\x16")
+    passos = [p for p in opcoes.get("priority_steps", [0]) if p]
+    filas = [q.name for q in (conf.task_queues or [])] or [conf.task_default_queue]
+
+    pipe = get_redis().pipeline(transaction=False)
+    for fila in filas:
+        pipe.llen(fila)
+        for passo in passos:
+            pipe.llen(f"{fila}{sep}{passo}")
+    tamanhos = iter(pipe.execute())
+
+    linhas = [
+        "# HELP celery_queue_length Mensagens aguardando em cada fila do broker.",
+        "# TYPE celery_queue_length gauge",
+    ]
+    for fila in filas:
+        total = next(tamanhos) + sum(next(tamanhos) for _ in passos)
+        linhas.append(f'celery_queue_length{{queue="{fila}"}} {total}')
+    return linhas
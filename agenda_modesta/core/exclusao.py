@@ -0,0 +1,209 @@
+"""
+Exclusão de Cliente e Projeto em segundo plano.
+
+``cliente.delete()`` dentro do request faz o Collector do Django carregar e
+apagar projetos, orçamentos e recibos e desvincular os agendamentos
+(``SET_NULL``) numa transação só, que num cliente grande passa do timeout.
+Aqui a exclusão tem duas fases:
+
+1. ``marcar_cliente_excluido`` / ``marcar_projeto_excluido`` (no request):
+   grava ``excluido_em`` e ``ativo=False``, o que tira o registro das telas
+   e dos selects, e enfileira a task na fila ``heavy`` após o commit;
+2. ``excluir_cliente`` / ``excluir_projeto`` (na task): apaga ou desvincula
+   os dependentes em lotes de ``EXCLUSAO_TAMANHO_LOTE``, cada lote na sua
+   transação, e só então apaga a linha, que já não tem o que percorrer.
+   Passado ``EXCLUSAO_SEGUNDOS_POR_TASK`` a task se reagenda e continua de
+   onde parou, sem esbarrar no time limit do Celery.
+
+Os agendamentos não são apagados: como no ``SET_NULL`` do modelo, só perdem
+o projeto. O título do espelho no django-scheduler, que leva o nome do
+cliente, é corrigido com um ``bulk_update`` por lote. O evento do Google não
+tem cliente nem projeto, então nenhuma chamada à API é feita.
+
+Tudo é idempotente: uma task perdida é retomada por
+``retomar_exclusoes_pendentes``.
+"""
+
+import logging
+import time
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from agenda_modesta.agenda.models import Agenda
+from agenda_modesta.clients.models import Cliente
+from agenda_modesta.core.metrics import Contador
+from agenda_modesta.finance.models import Orcamento, Recibo
+from agenda_modesta.projects.models import Projeto
+
+logger = logging.getLogger(__name__)
+
+# Marcações mais antigas que isso sem a linha apagada: a task se perdeu
+RETOMAR_APOS = timedelta(hours=1)
+
+LINHAS_EXCLUSAO = Contador(
+    "exclusao_linhas_total", "Linhas tratadas pela exclusão em segundo plano por modelo e ação (apagado, desvinculado).",
+)
+
+
+def _tamanho_lote() -> int:
+    return getattr(settings, "EXCLUSAO_TAMANHO_LOTE", 500)
+
+
+def prazo_task() -> float:
+    """Instante (``time.monotonic``) em que a task deve parar e se reagendar."""
+    return time.monotonic() + getattr(settings, "EXCLUSAO_SEGUNDOS_POR_TASK", 30)
+
+
+# ---------------------------------------------------------------------------
+# Fase 1 – no request
+# ---------------------------------------------------------------------------
+
+
+def marcar_cliente_excluido(cliente):
+    """Tira o cliente e seus projetos das telas e agenda a exclusão após o commit."""
+    from agenda_modesta.notifications.tasks import excluir_cliente_em_lotes
+
+    agora = timezone.now()
+    with transaction.atomic():
+        cliente.ativo = False
+        cliente.excluido_em = agora
+        cliente.save(update_fields=["ativo", "excluido_em", "data_atualizacao"])
+        # Os projetos saem junto; quem os apaga é a task do cliente
+        Projeto.objects.filter(cliente=cliente, excluido_em__isnull=True).update(ativo=False, excluido_em=agora)
+    cliente_id = str(cliente.pk)
+    transaction.on_commit(lambda: excluir_cliente_em_lotes.delay(cliente_id))
+
+
+def marcar_projeto_excluido(projeto):
+    """Tira o projeto das telas e agenda a exclusão após o commit."""
+    from agenda_modesta.notifications.tasks import excluir_projeto_em_lotes
+
+    Projeto.objects.filter(pk=projeto.pk).update(ativo=False, excluido_em=timezone.now())
+    projeto_id = str(projeto.pk)
+    transaction.on_commit(lambda: excluir_projeto_em_lotes.delay(projeto_id))
+
+
+# ---------------------------------------------------------------------------
+# Fase 2 – na task
+# ---------------------------------------------------------------------------
+
+
+def _em_lotes(queryset, acao, ate: float) -> bool:
+    """
+    Aplica ``acao(pks)`` a lotes de ``queryset`` até esvaziá-lo (``True``) ou
+    chegar a ``ate`` (``False``). ``acao`` tira o lote do filtro (apagando
+    ou desvinculando), então cada consulta pega os primeiros que sobraram.
+    """
+    tamanho = _tamanho_lote()
+    while time.monotonic() < ate:
+        lote = list(queryset.order_by("pk").values_list("pk", flat=True)[:tamanho])
+        if not lote:
+            return True
+        with transaction.atomic():
+            acao(lote)
+    return False
+
+
+def _apagar(modelo, nome: str):
+    def acao(pks):
+        modelo.objects.filter(pk__in=pks).delete()
+        LINHAS_EXCLUSAO.incrementar(len(pks), modelo=nome, acao="apagado")
+
+    return acao
+
+
+def _desvincular(modelo, nome: str):
+    def acao(pks):
+        modelo.objects.filter(pk__in=pks).update(projeto=None)
+        LINHAS_EXCLUSAO.incrementar(len(pks), modelo=nome, acao="desvinculado")
+
+    return acao
+
+
+def _desvincular_agendas(subscritor_id):
+    """Tira o projeto dos agendamentos e corrige o título do espelho no scheduler."""
+    from schedule.models import Event as ScheduleEvent
+
+    def acao(pks):
+        Agenda.objects.filter(pk__in=pks).update(projeto=None)
+        # Sem projeto o título do espelho é só o da agenda (ver dados_evento_scheduler)
+        titulos = {str(pk): titulo for pk, titulo in Agenda.objects.filter(pk__in=pks).values_list("pk", "titulo")}
+        if titulos:
+            eventos = list(
+                ScheduleEvent.objects.filter(
+                    reduce(or_, (Q(description__startswith=f"agenda_id:{pk}") for pk in titulos)),
+                    calendar__slug=f"subscritor-{subscritor_id}",
+                ).only("pk", "title", "description"),
+            )
+            for evento in eventos:
+                evento.title = titulos[evento.description.split("\n", 1)[0].removeprefix("agenda_id:")]
+            ScheduleEvent.objects.bulk_update(eventos, ["title"])
+        LINHAS_EXCLUSAO.incrementar(len(pks), modelo="agenda", acao="desvinculado")
+
+    return acao
+
+
+def _liberar_projeto(projeto, ate: float) -> bool:
+    """Desvincula agendamentos, orçamentos e recibos do projeto."""
+    return (
+        _em_lotes(Agenda.objects.filter(projeto=projeto), _desvincular_agendas(projeto.subscritor_id), ate)
+        and _em_lotes(Orcamento.objects.filter(projeto=projeto), _desvincular(Orcamento, "orcamento"), ate)
+        and _em_lotes(Recibo.objects.filter(projeto=projeto), _desvincular(Recibo, "recibo"), ate)
+    )
+
+
+def excluir_projeto(projeto_id, ate: float) -> bool:
+    """
+    Apaga um projeto marcado como excluído. Retorna ``False`` se o prazo
+    acabou antes (a task chama de novo); ``True`` se terminou ou se não
+    havia o que fazer.
+    """
+    projeto = Projeto.objects.filter(pk=projeto_id, excluido_em__isnull=False).first()
+    if projeto is None:
+        return True
+    if not _liberar_projeto(projeto, ate):
+        return False
+    projeto.delete()
+    LINHAS_EXCLUSAO.incrementar(modelo="projeto", acao="apagado")
+    logger.info("Projeto %s excluído", projeto_id)
+    return True
+
+
+def excluir_cliente(cliente_id, ate: float) -> bool:
+    """Apaga um cliente marcado como excluído, com recibos, orçamentos e projetos. Ver ``excluir_projeto``."""
+    cliente = Cliente.objects.filter(pk=cliente_id, excluido_em__isnull=False).first()
+    if cliente is None:
+        return True
+
+    if not (
+        _em_lotes(Recibo.objects.filter(cliente=cliente), _apagar(Recibo, "recibo"), ate)
+        and _em_lotes(Orcamento.objects.filter(cliente=cliente), _apagar(Orcamento, "orcamento"), ate)
+    ):
+        return False
+    for projeto in Projeto.objects.filter(cliente=cliente).order_by("pk"):
+        if not _liberar_projeto(projeto, ate):
+            return False
+        projeto.delete()
+        LINHAS_EXCLUSAO.incrementar(modelo="projeto", acao="apagado")
+
+    cliente.delete()
+    LINHAS_EXCLUSAO.incrementar(modelo="cliente", acao="apagado")
+    logger.info("Cliente %s excluído", cliente_id)
+    return True
+
+
+def exclusoes_pendentes() -> tuple[list, list]:
+    """(clientes, projetos) marcados há mais de ``RETOMAR_APOS`` e ainda no banco."""
+    limite = timezone.now() - RETOMAR_APOS
+    clientes = list(Cliente.objects.filter(excluido_em__lt=limite).values_list("pk", flat=True))
+    # Projetos de cliente excluído vão junto com a task do cliente
+    projetos = list(
+        Projeto.objects.filter(excluido_em__lt=limite, cliente__excluido_em__isnull=True).values_list("pk", flat=True),
+    )
+    return clientes, projetos
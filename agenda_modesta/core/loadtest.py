@@ -0,0 +1,219 @@
+"""
+Teste de carga contra uma stack rodando localmente (``runserver``, compose).
+
+Cada usuário virtual é uma thread com a sessão de um usuário semeado por
+``seed_benchmark_data`` e repete o uso típico da interface:
+
+- carrega o dashboard ao entrar;
+- a cada 15 s faz o polling HTMX de ``proximos_agendamentos`` e ``agenda:list``;
+- entre uma ação e outra: buscas digitadas nas listas (uma request por
+  tecla, como o ``hx-trigger="keyup changed"``), navegação de semanas no
+  calendário (``agenda:week_json``) e rajadas de criação/edição de agendas.
+
+Só usa a biblioteca padrão (``http.client``), então roda em qualquer
+ambiente que tenha o projeto instalado.
+"""
+
+import http.client
+import math
+import random
+import subprocess
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from urllib.parse import urlencode, urlsplit
+
+INTERVALO_POLLING = 15  # segundos, igual ao hx-trigger="every 15s" do dashboard
+TERMOS_BUSCA = ["ana", "silva", "grav", "mix", "joão", "podcast", "rua", "2026"]
+LISTAS_BUSCA = ["clients:list", "projects:list", "agenda:list", "finance:orcamentos", "finance:recibos"]
+PERCENTIS = (0.5, 0.9, 0.95, 0.99)
+
+
+def commit_atual(diretorio) -> str:
+    """Hash curto do HEAD em ``diretorio`` (identifica o resultado de um benchmark)."""
+    try:
+        return subprocess.run(  # noqa: S603
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True, text=True, check=True, cwd=diretorio,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def percentil_exato(valores_ordenados: list[float], q: float) -> float | None:
+    """Percentil com interpolação linear entre as amostras (valores já ordenados)."""
+    if not valores_ordenados:
+        return None
+    posicao = (len(valores_ordenados) - 1) * q
+    baixo, alto = math.floor(posicao), math.ceil(posicao)
+    if baixo == alto:
+        return valores_ordenados[baixo]
+    return valores_ordenados[baixo] + (valores_ordenados[alto] - valores_ordenados[baixo]) * (posicao - baixo)
+
+
+class Estatisticas:
+    """Coleta latência e status por endpoint (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias: dict[str, list[float]] = defaultdict(list)
+        self.status: dict[str, Counter] = defaultdict(Counter)
+
+    def registrar(self, endpoint: str, latencia: float, status: int | str):
+        with self._lock:
+            self.latencias[endpoint].append(latencia)
+            self.status[endpoint][str(status)] += 1
+
+    @staticmethod
+    def _resumir(latencias: list[float], status: Counter, duracao: float) -> dict:
+        ordenadas = sorted(latencias)
+        erros = sum(n for codigo, n in status.items() if not codigo.isdigit() or int(codigo) >= 400)  # noqa: PLR2004
+        resumo = {
+            "requests": len(ordenadas),
+            "rps": round(len(ordenadas) / duracao, 2) if duracao else None,
+            "erros": erros,
+            "status": dict(status),
+            "media_ms": round(sum(ordenadas) / len(ordenadas) * 1000, 2) if ordenadas else None,
+            "max_ms": round(ordenadas[-1] * 1000, 2) if ordenadas else None,
+        }
+        for q in PERCENTIS:
+            valor = percentil_exato(ordenadas, q)
+            resumo[f"p{round(q * 100)}_ms"] = round(valor * 1000, 2) if valor is not None else None
+        return resumo
+
+    def resumo(self, duracao: float) -> dict:
+        with self._lock:
+            endpoints = {
+                nome: self._resumir(self.latencias[nome], self.status[nome], duracao)
+                for nome in sorted(self.latencias)
+            }
+            todas = [lat for lats in self.latencias.values() for lat in lats]
+            status_total = sum(self.status.values(), Counter())
+        return {"endpoints": endpoints, "total": self._resumir(todas, status_total, duracao)}
+
+
+class ClienteHTTP:
+    """Conexão keep-alive com cookies de sessão e CSRF fixos."""
+
+    def __init__(self, base_url: str, cookies: dict[str, str], csrf: str, timeout: float = 30):
+        partes = urlsplit(base_url)
+        classe = http.client.HTTPSConnection if partes.scheme == "https" else http.client.HTTPConnection
+        self._nova_conexao = lambda: classe(partes.netloc, timeout=timeout)
+        self._conexao = self._nova_conexao()
+        self.cookie = "; ".join(f"{k}={v}" for k, v in cookies.items())
+        self.csrf = csrf
+        self.origem = f"{partes.scheme}://{partes.netloc}"
+
+    def requisitar(self, metodo: str, caminho: str, params=None, dados=None, htmx=False) -> int:
+        if params:
+            caminho = f"{caminho}?{urlencode(params)}"
+        headers = {"Cookie": self.cookie}
+        if htmx:
+            headers["HX-Request"] = "true"
+        corpo = None
+        if dados is not None:
+            corpo = urlencode(dados)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+            headers["X-CSRFToken"] = self.csrf
+            headers["Referer"] = f"{self.origem}{caminho}"
+        try:
+            self._conexao.request(metodo, caminho, body=corpo, headers=headers)
+            resposta = self._conexao.getresponse()
+            resposta.read()
+        except (OSError, http.client.HTTPException):
+            self._conexao.close()
+            self._conexao = self._nova_conexao()
+            raise
+        return resposta.status
+
+    def fechar(self):
+        self._conexao.close()
+
+
+class UsuarioVirtual(threading.Thread):
+    """Um usuário logado navegando até ``fim`` (``time.monotonic()``)."""
+
+    # (ação, peso) sorteadas entre os pollings
+    ACOES = (
+        ("acao_dashboard", 2),
+        ("acao_busca", 4),
+        ("acao_semana", 3),
+        ("acao_rajada_agenda", 1),
+    )
+
+    def __init__(self, cliente: ClienteHTTP, urls: dict, perfil: dict, estatisticas: Estatisticas,
+                 fim: float, seed, pausa=(1.0, 3.0)):
+        super().__init__(daemon=True)
+        self.cliente = cliente
+        self.urls = urls
+        # {"projetos": [pk, ...], "agendas": [{"caminho": url de edição, "dados": POST}, ...]}
+        self.perfil = perfil
+        self.estatisticas = estatisticas
+        self.fim = fim
+        self.rng = random.Random(seed)  # noqa: S311
+        self.pausa = pausa
+
+    def _chamar(self, endpoint: str, metodo="GET", caminho=None, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            status = self.cliente.requisitar(metodo, caminho or self.urls[endpoint], **kwargs)
+        except Exception as exc:  # noqa: BLE001
+            status = type(exc).__name__
+        self.estatisticas.registrar(endpoint, time.perf_counter() - inicio, status)
+
+    def _esperar(self, segundos: float):
+        time.sleep(max(0.0, min(segundos, self.fim - time.monotonic())))
+
+    def run(self):
+        self.acao_dashboard()
+        proximo_polling = time.monotonic() + INTERVALO_POLLING
+        pesos = [peso for _, peso in self.ACOES]
+        while time.monotonic() < self.fim:
+            if time.monotonic() >= proximo_polling:
+                self.acao_polling()
+                proximo_polling += INTERVALO_POLLING
+            else:
+                acao = self.rng.choices(self.ACOES, pesos)[0][0]
+                getattr(self, acao)()
+            self._esperar(self.rng.uniform(*self.pausa))
+        self.cliente.fechar()
+
+    # ------------------------------------------------------------------ ações
+
+    def acao_dashboard(self):
+        self._chamar("home")
+
+    def acao_polling(self):
+        self._chamar("proximos_agendamentos", htmx=True)
+        self._chamar("agenda:list", htmx=True)
+
+    def acao_busca(self):
+        lista = self.rng.choice(LISTAS_BUSCA)
+        termo = self.rng.choice(TERMOS_BUSCA)
+        # O debounce de 500ms deixa passar algumas teclas, não todas
+        for tamanho in sorted(self.rng.sample(range(1, len(termo) + 1), k=min(3, len(termo)))):
+            self._chamar(lista, params={"q": termo[:tamanho]}, htmx=True)
+            self._esperar(self.rng.uniform(0.1, 0.6))
+
+    def acao_semana(self):
+        semana = date.today() + timedelta(weeks=self.rng.randint(-8, 8))
+        for _ in range(self.rng.randint(1, 4)):
+            self._chamar("agenda:week_json", params={"week_start": semana.isoformat()})
+            semana += timedelta(weeks=self.rng.choice((-1, 1)))
+            self._esperar(self.rng.uniform(0.2, 1.0))
+
+    def acao_rajada_agenda(self):
+        projetos = self.perfil["projetos"]
+        for _ in range(self.rng.randint(2, 5)):
+            inicio = date.today() + timedelta(days=self.rng.randint(1, 60))
+            hora = self.rng.randint(8, 18)
+            self._chamar("agenda:create", metodo="POST", dados={
+                "titulo": "Carga",
+                "data_inicio": f"{inicio}T{hora:02d}:00",
+                "data_fim": f"{inicio}T{hora + 1:02d}:00",
+                "projeto": self.rng.choice(projetos) if projetos else "",
+            })
+        agendas = self.perfil["agendas"]
+        for agenda in self.rng.sample(agendas, k=min(3, len(agendas))):
+            self._chamar("agenda:edit", metodo="POST", caminho=agenda["caminho"], dados=agenda["dados"])
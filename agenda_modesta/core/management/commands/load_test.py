@@ -0,0 +1,174 @@
+"""
+Management command que roda o teste de carga de ``core/loadtest.py``.
+
+Uso (com a stack rodando e dados de ``seed_benchmark_data``):
+  python manage.py load_test --base-url http://localhost:8000 --usuarios 50 --duracao 120
+  python manage.py load_test --comparar loadtest-results/anterior.json
+
+As sessões são criadas direto no session store (os usuários semeados não
+têm senha), então o comando precisa usar o mesmo banco/cache do servidor.
+O resultado vai para ``loadtest-results/<data>-<commit>.json``.
+"""
+
+import json
+import time
+from datetime import datetime
+from importlib import import_module
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from agenda_modesta.agenda.models import Agenda
+from agenda_modesta.core.loadtest import (
+    LISTAS_BUSCA,
+    ClienteHTTP,
+    Estatisticas,
+    UsuarioVirtual,
+    commit_atual,
+)
+from agenda_modesta.projects.models import Projeto
+from agenda_modesta.users.models import User
+
+ENDPOINTS = [
+    "home", "proximos_agendamentos", "agenda:list", "agenda:week_json", "agenda:create",
+    *LISTAS_BUSCA,
+]
+FORMATO_DATA = "%Y-%m-%dT%H:%M"
+
+
+class Command(BaseCommand):
+    help = "Teste de carga das páginas HTMX e endpoints JSON com usuários semeados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://localhost:8000")
+        parser.add_argument("--usuarios", type=int, default=20, help="Usuários virtuais simultâneos.")
+        parser.add_argument("--duracao", type=float, default=60, help="Segundos de carga.")
+        parser.add_argument("--rampa", type=float, default=5, help="Segundos para subir todos os usuários.")
+        parser.add_argument("--seed", type=int, default=42, help="Seed usada no seed_benchmark_data.")
+        parser.add_argument("--saida", default="", help="Arquivo JSON de resultado.")
+        parser.add_argument("--comparar", default="", help="JSON de uma execução anterior para comparar.")
+
+    def handle(self, *args, **options):
+        usuarios = list(
+            User.objects.filter(username__startswith=f"bench{options['seed']}-")
+            .select_related("subscritor")
+            .order_by("username")[: options["usuarios"]],
+        )
+        if not usuarios:
+            msg = f"Nenhum usuário bench{options['seed']}-*; rode antes o seed_benchmark_data."
+            raise CommandError(msg)
+
+        urls = {nome: reverse(nome) for nome in ENDPOINTS}
+        estatisticas = Estatisticas()
+        inicio = time.monotonic()
+        fim = inicio + options["rampa"] + options["duracao"]
+
+        threads = []
+        for indice, usuario in enumerate(usuarios):
+            csrf = get_random_string(32)
+            cliente = ClienteHTTP(
+                options["base_url"],
+                {settings.SESSION_COOKIE_NAME: self._criar_sessao(usuario), settings.CSRF_COOKIE_NAME: csrf},
+                csrf,
+            )
+            thread = UsuarioVirtual(
+                cliente, urls, self._perfil(usuario), estatisticas, fim, seed=f"{options['seed']}:{indice}",
+            )
+            threads.append(thread)
+
+        self.stdout.write(f"{len(threads)} usuários contra {options['base_url']} por {options['duracao']:.0f}s…")
+        atraso = options["rampa"] / len(threads)
+        for thread in threads:
+            thread.start()
+            time.sleep(atraso)
+        for thread in threads:
+            thread.join()
+        duracao = time.monotonic() - inicio
+
+        resultado = {
+            "meta": {
+                "commit": commit_atual(settings.BASE_DIR),
+                "data": timezone.now().isoformat(),
+                "base_url": options["base_url"],
+                "usuarios": len(threads),
+                "duracao_s": round(duracao, 1),
+                "seed": options["seed"],
+            },
+            **estatisticas.resumo(duracao),
+        }
+        caminho = self._salvar(resultado, options["saida"])
+        self._imprimir(resultado)
+        self.stdout.write(self.style.SUCCESS(f"Resultado salvo em {caminho}"))
+
+        if options["comparar"]:
+            self._comparar(resultado, json.loads(Path(options["comparar"]).read_text()))
+
+    def _criar_sessao(self, usuario) -> str:
+        sessao = import_module(settings.SESSION_ENGINE).SessionStore()
+        sessao[SESSION_KEY] = str(usuario.pk)
+        sessao[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        sessao[HASH_SESSION_KEY] = usuario.get_session_auth_hash()
+        sessao.create()
+        return sessao.session_key
+
+    def _perfil(self, usuario) -> dict:
+        subscritor = usuario.subscritor
+        agendas = Agenda.objects.filter(subscritor=subscritor, data_inicio__gte=timezone.now()).order_by(
+            "data_inicio",
+        )[:50]
+        return {
+            "projetos": [
+                str(pk) for pk in Projeto.objects.filter(subscritor=subscritor, ativo=True).values_list("pk", flat=True)[:50]
+            ],
+            "agendas": [
+                {
+                    "caminho": reverse("agenda:edit", kwargs={"pk": agenda.pk}),
+                    "dados": {
+                        "titulo": agenda.titulo,
+                        "descricao": agenda.descricao,
+                        "data_inicio": timezone.localtime(agenda.data_inicio).strftime(FORMATO_DATA),
+                        "data_fim": timezone.localtime(agenda.data_fim).strftime(FORMATO_DATA),
+                        "projeto": str(agenda.projeto_id or ""),
+                        **({"confirmado": "on"} if agenda.confirmado else {}),
+                        **({"notificar_email": "on"} if agenda.notificar_email else {}),
+                    },
+                }
+                for agenda in agendas
+            ],
+        }
+
+    def _salvar(self, resultado: dict, saida: str) -> Path:
+        if saida:
+            caminho = Path(saida)
+        else:
+            nome = f"{datetime.now():%Y%m%d-%H%M%S}-{resultado['meta']['commit']}.json"  # noqa: DTZ005
+            caminho = Path(settings.BASE_DIR) / "loadtest-results" / nome
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        caminho.write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+        return caminho
+
+    def _imprimir(self, resultado: dict):
+        self.stdout.write(f"{'endpoint':<28} {'reqs':>6} {'rps':>7} {'erros':>5} {'p50':>8} {'p95':>8} {'p99':>8}")
+        linhas = [*resultado["endpoints"].items(), ("TOTAL", resultado["total"])]
+        for nome, r in linhas:
+            self.stdout.write(
+                f"{nome:<28} {r['requests']:>6} {r['rps']:>7} {r['erros']:>5} "
+                f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}",
+            )
+
+    def _comparar(self, atual: dict, anterior: dict):
+        self.stdout.write(f"\nComparação com {anterior['meta']['commit']} (p95 ms / rps):")
+        for nome, r in [*atual["endpoints"].items(), ("TOTAL", atual["total"])]:
+            antes = anterior["total"] if nome == "TOTAL" else anterior["endpoints"].get(nome)
+            if not antes or not antes["p95_ms"] or r["p95_ms"] is None:
+                continue
+            variacao = (r["p95_ms"] - antes["p95_ms"]) / antes["p95_ms"] * 100
+            self.stdout.write(
+                f"{nome:<28} {antes['p95_ms']:>8} → {r['p95_ms']:>8} ({variacao:+.1f}%)  "
+                f"{antes['rps']} → {r['rps']}",
+            )
@@ -0,0 +1,351 @@
+"""
+Management command que gera dados sintéticos multi-tenant para benchmarks.
+
+Uso:
+  python manage.py seed_benchmark_data                          # 10 subscritores
+  python manage.py seed_benchmark_data --subscritores 200 --agendas 20000
+  python manage.py seed_benchmark_data --seed 7 --limpar        # recria o lote
+
+A mesma ``--seed`` (e ``--referencia``) gera exatamente os mesmos dados.
+Tudo é gravado em lote: COPY no PostgreSQL, ``bulk_create`` nos demais
+bancos. Nenhum signal roda (nem os de Agenda, nem o ``create_subscritor``);
+o espelho no django-scheduler é gravado junto com as agendas e a fila de
+lembretes é reconstruída no final.
+"""
+
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from agenda_modesta.agenda.models import Agenda
+from agenda_modesta.agenda.signals import dados_evento_scheduler
+from agenda_modesta.clients.models import Cliente
+from agenda_modesta.finance.models import (
+    FormaPagamento,
+    Orcamento,
+    PacoteServico,
+    Recibo,
+    StatusPagamento,
+)
+from agenda_modesta.projects.models import Projeto
+from agenda_modesta.subscriptions.models import Subscritor
+from agenda_modesta.users.models import User
+
+NOMES = [
+    "Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Henrique",
+    "Isabela", "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael",
+    "Sabrina", "Thiago", "Vanessa", "Wagner",
+]
+SOBRENOMES = [
+    "Almeida", "Barbosa", "Cardoso", "Costa", "Ferreira", "Gomes", "Lima", "Martins",
+    "Oliveira", "Pereira", "Ribeiro", "Rocha", "Santos", "Silva", "Souza",
+]
+CIDADES = [
+    ("São Paulo", "SP"), ("Rio de Janeiro", "RJ"), ("Belo Horizonte", "MG"),
+    ("Curitiba", "PR"), ("Porto Alegre", "RS"), ("Salvador", "BA"),
+    ("Recife", "PE"), ("Goiânia", "GO"), ("Florianópolis", "SC"), ("Fortaleza", "CE"),
+]
+SERVICOS = ["Gravação", "Mixagem", "Masterização", "Ensaio", "Podcast", "Locução", "Edição"]
+STATUS_PROJETO = [s for s, _ in Projeto.StatusProjeto.choices]
+FORMAS_PAGAMENTO = [f for f, _ in FormaPagamento.choices]
+
+
+class Gerador:
+    """Gera as linhas de um subscritor a partir de um ``random.Random`` próprio."""
+
+    def __init__(self, seed, indice: int, referencia: date, anos: int):
+        # Semente por subscritor: o lote N é igual independentemente dos outros
+        self.rng = random.Random(f"{seed}:{indice}")  # noqa: S311
+        self.referencia = datetime.combine(referencia, datetime.min.time(), tzinfo=timezone.get_current_timezone())
+        self.anos = anos
+
+    def uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def nome(self) -> str:
+        return f"{self.rng.choice(NOMES)} {self.rng.choice(SOBRENOMES)}"
+
+    def dinheiro(self, minimo: int, maximo: int) -> Decimal:
+        return Decimal(self.rng.randrange(minimo * 100, maximo * 100)) / 100
+
+    def instante(self) -> datetime:
+        """Horário comercial entre ``anos`` atrás e 90 dias à frente da referência."""
+        dia = self.rng.randint(-365 * self.anos, 90)
+        hora = self.rng.randint(8, 19)
+        minuto = self.rng.choice((0, 15, 30, 45))
+        return self.referencia + timedelta(days=dia, hours=hora, minutes=minuto)
+
+    def usuario(self, username: str) -> User:
+        nome = self.nome()
+        return User(
+            username=username,
+            email=f"{username}@bench.invalid",
+            name=nome,
+            nome_completo=nome,
+            password=f"{UNUSABLE_PASSWORD_PREFIX}bench",
+        )
+
+    def subscritor(self, usuario: User) -> Subscritor:
+        return Subscritor(id=self.uuid(), usuario=usuario, nome_empresa=f"Estúdio {usuario.name}")
+
+    def cliente(self, sub: Subscritor) -> Cliente:
+        nome = self.nome()
+        cidade, estado = self.rng.choice(CIDADES)
+        return Cliente(
+            id=self.uuid(),
+            usuario=sub.usuario,
+            subscritor=sub,
+            nome=nome,
+            email=f"{nome.lower().replace(' ', '.')}{self.rng.randrange(10_000)}@example.com",
+            telefone=f"({self.rng.randint(11, 99)}) 9{self.rng.randrange(10**8):08d}",
+            cpf_cnpj=f"{self.rng.randrange(10**11):011d}",
+            cidade=cidade,
+            estado=estado,
+            endereco=f"Rua {self.rng.choice(SOBRENOMES)}, {self.rng.randint(1, 3000)}",
+            ativo=self.rng.random() < 0.9,  # noqa: PLR2004
+        )
+
+    def pacote(self, sub: Subscritor) -> PacoteServico:
+        horas = self.rng.choice((None, 10, 20, 40))
+        return PacoteServico(
+            id=self.uuid(),
+            subscritor=sub,
+            usuario=sub.usuario,
+            nome=f"Pacote {horas}h" if horas else "Hora avulsa",
+            horas_inclusas=Decimal(horas) if horas else None,
+            valor_hora_pacote=self.dinheiro(150, 390),
+            valor_hora_referencia=Decimal(390),
+            inclui_otimizacao=self.rng.random() < 0.5,  # noqa: PLR2004
+        )
+
+    def projeto(self, sub: Subscritor, cliente: Cliente) -> Projeto:
+        inicio = self.instante().date()
+        return Projeto(
+            id=self.uuid(),
+            usuario=sub.usuario,
+            subscritor=sub,
+            cliente=cliente,
+            nome=f"{self.rng.choice(SERVICOS)} – {cliente.nome}",
+            status=self.rng.choice(STATUS_PROJETO),
+            data_inicio=inicio,
+            data_prevista_conclusao=inicio + timedelta(days=self.rng.randint(7, 120)),
+        )
+
+    def agenda(self, sub: Subscritor, projeto: Projeto | None, fracao_google: float) -> Agenda:
+        inicio = self.instante()
+        google = self.rng.random() < fracao_google
+        return Agenda(
+            id=self.uuid(),
+            usuario=sub.usuario,
+            subscritor=sub,
+            projeto=projeto,
+            titulo=self.rng.choice(SERVICOS),
+            data_inicio=inicio,
+            data_fim=inicio + timedelta(minutes=self.rng.choice((60, 90, 120, 180, 240))),
+            confirmado=self.rng.random() < 0.7,  # noqa: PLR2004
+            notificar_email=True,
+            notificado=inicio < self.referencia,
+            origem="google" if google and self.rng.random() < 0.5 else "local",  # noqa: PLR2004
+            google_calendar_id=(settings.GOOGLE_CALENDAR_ID or "primary") if google else "",
+            google_event_id=f"{self.rng.getrandbits(128):032x}" if google else "",
+        )
+
+    def _documento(self, modelo, sub, projeto, numero):
+        horas = Decimal(self.rng.randint(1, 40))
+        valor_hora = self.dinheiro(150, 390)
+        return modelo(
+            id=self.uuid(),
+            usuario=sub.usuario,
+            subscritor=sub,
+            cliente=projeto.cliente,
+            projeto=projeto,
+            numero_sequencial=numero,
+            horas_trabalhadas=horas,
+            valor_hora=valor_hora,
+            valor_total=horas * valor_hora,
+            forma_pagamento=self.rng.choice(FORMAS_PAGAMENTO),
+        )
+
+    def orcamento(self, sub, projeto, numero, pacotes) -> Orcamento:
+        orcamento = self._documento(Orcamento, sub, projeto, numero)
+        orcamento.pacote = self.rng.choice(pacotes) if pacotes and self.rng.random() < 0.3 else None  # noqa: PLR2004
+        orcamento.status_pagamento = (
+            StatusPagamento.PAGO if self.rng.random() < 0.6 else StatusPagamento.PENDENTE  # noqa: PLR2004
+        )
+        return orcamento
+
+    def recibo(self, sub, projeto, numero) -> Recibo:
+        return self._documento(Recibo, sub, projeto, numero)
+
+
+class Command(BaseCommand):
+    help = "Gera subscritores sintéticos (clientes, projetos, agendas, finanças) para benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subscritores", type=int, default=10)
+        parser.add_argument("--clientes", type=int, default=200, help="Por subscritor.")
+        parser.add_argument("--projetos", type=int, default=500, help="Por subscritor.")
+        parser.add_argument("--agendas", type=int, default=5000, help="Por subscritor.")
+        parser.add_argument("--pacotes", type=int, default=5, help="Por subscritor.")
+        parser.add_argument("--orcamentos", type=int, default=1000, help="Por subscritor.")
+        parser.add_argument("--recibos", type=int, default=500, help="Por subscritor.")
+        parser.add_argument("--anos", type=int, default=3, help="Anos de histórico das agendas.")
+        parser.add_argument(
+            "--fracao-google",
+            type=float,
+            default=0.3,
+            help="Fração das agendas com google_event_id.",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--referencia",
+            type=date.fromisoformat,
+            default=None,
+            help="Data base (YYYY-MM-DD) das agendas; padrão hoje. Fixe para repetir o mesmo lote.",
+        )
+        parser.add_argument("--lote", type=int, default=5000, help="Linhas por INSERT/COPY.")
+        parser.add_argument(
+            "--sem-copy",
+            action="store_true",
+            help="Usa bulk_create mesmo no PostgreSQL.",
+        )
+        parser.add_argument(
+            "--limpar",
+            action="store_true",
+            help="Apaga antes os usuários desta seed (e tudo em cascata).",
+        )
+
+    def handle(self, *args, **options):
+        self.opcoes = options
+        self.usar_copy = connection.vendor == "postgresql" and not options["sem_copy"]
+        self.totais = Counter()
+        prefixo = f"bench{options['seed']}-"
+        referencia = options["referencia"] or timezone.localdate()
+
+        if options["limpar"]:
+            self._limpar(prefixo)
+
+        inicio = time.monotonic()
+        for indice in range(options["subscritores"]):
+            gerador = Gerador(options["seed"], indice, referencia, options["anos"])
+            with transaction.atomic():
+                self._popular_subscritor(gerador, f"{prefixo}{indice:05d}")
+            self.stdout.write(f"Subscritor {indice + 1}/{options['subscritores']} ok")
+
+        duracao = time.monotonic() - inicio
+        total = sum(self.totais.values())
+        for modelo, quantidade in sorted(self.totais.items()):
+            self.stdout.write(f"  {modelo}: {quantidade}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} linhas em {duracao:.1f}s ({total / max(duracao, 1e-6):,.0f} linhas/s, "
+            f"{'COPY' if self.usar_copy else 'bulk_create'}).",
+        ))
+
+        self._reconstruir_lembretes()
+
+    # ------------------------------------------------------------------
+
+    def _popular_subscritor(self, gerador: Gerador, username: str):
+        from schedule.models import Calendar as ScheduleCalendar
+        from schedule.models import Event as ScheduleEvent
+
+        opcoes = self.opcoes
+        usuario = gerador.usuario(username)
+        self._gravar(User, [usuario])
+        usuario = User.objects.get(username=username)  # bulk_create não devolve o id no SQLite
+        sub = gerador.subscritor(usuario)
+        self._gravar(Subscritor, [sub])
+
+        clientes = [gerador.cliente(sub) for _ in range(max(opcoes["clientes"], 1))]
+        self._gravar(Cliente, clientes)
+        pacotes = [gerador.pacote(sub) for _ in range(opcoes["pacotes"])]
+        self._gravar(PacoteServico, pacotes)
+        projetos = [
+            gerador.projeto(sub, gerador.rng.choice(clientes)) for _ in range(max(opcoes["projetos"], 1))
+        ]
+        self._gravar(Projeto, projetos)
+
+        # Espelho do django-scheduler (o que sync_agenda_to_scheduler faria)
+        calendario, _ = ScheduleCalendar.objects.get_or_create(
+            slug=f"subscritor-{sub.pk}",
+            defaults={"name": f"Agenda – {sub}"},
+        )
+        restantes = opcoes["agendas"]
+        while restantes > 0:
+            agendas = [
+                gerador.agenda(
+                    sub,
+                    gerador.rng.choice(projetos) if gerador.rng.random() < 0.9 else None,  # noqa: PLR2004
+                    opcoes["fracao_google"],
+                )
+                for _ in range(min(restantes, opcoes["lote"]))
+            ]
+            self._gravar(Agenda, agendas)
+            self._gravar(ScheduleEvent, [
+                ScheduleEvent(calendar=calendario, creator=usuario, **dados_evento_scheduler(agenda))
+                for agenda in agendas
+            ])
+            restantes -= len(agendas)
+
+        self._gravar(Orcamento, [
+            gerador.orcamento(sub, gerador.rng.choice(projetos), numero, pacotes)
+            for numero in range(1, opcoes["orcamentos"] + 1)
+        ])
+        self._gravar(Recibo, [
+            gerador.recibo(sub, gerador.rng.choice(projetos), numero)
+            for numero in range(1, opcoes["recibos"] + 1)
+        ])
+
+    def _limpar(self, prefixo: str):
+        from schedule.models import Calendar as ScheduleCalendar
+
+        usuarios = User.objects.filter(username__startswith=prefixo)
+        slugs = [
+            f"subscritor-{pk}"
+            for pk in Subscritor.objects.filter(usuario__in=usuarios).values_list("pk", flat=True)
+        ]
+        # Os Calendars do espelho não têm FK para o subscritor; os Events caem em cascata
+        ScheduleCalendar.objects.filter(slug__in=slugs).delete()
+        apagados, _ = usuarios.delete()
+        self.stdout.write(f"Removidos {apagados} registros da seed {self.opcoes['seed']}.")
+
+    def _gravar(self, modelo, objetos: list):
+        if not objetos:
+            return
+        if self.usar_copy:
+            self._copy(modelo, objetos)
+        else:
+            modelo.objects.bulk_create(objetos, batch_size=self.opcoes["lote"])
+        self.totais[modelo._meta.label] += len(objetos)
+
+    def _copy(self, modelo, objetos: list):
+        """COPY ... FROM STDIN com os valores preparados como no INSERT do ORM."""
+        campos = [
+            campo for campo in modelo._meta.concrete_fields
+            if not (campo.primary_key and campo.db_returning)  # PK serial fica com o banco
+        ]
+        colunas = ", ".join(connection.ops.quote_name(campo.column) for campo in campos)
+        sql = f"COPY {connection.ops.quote_name(modelo._meta.db_table)} ({colunas}) FROM STDIN"
+        with connection.cursor() as cursor, cursor.cursor.copy(sql) as copy:
+            for obj in objetos:
+                copy.write_row([
+                    campo.get_db_prep_save(campo.pre_save(obj, True), connection)  # noqa: FBT003
+                    for campo in campos
+                ])
+
+    def _reconstruir_lembretes(self):
+        from agenda_modesta.notifications.scheduler import fila_habilitada, reconstruir_fila
+
+        if not fila_habilitada():
+            return
+        total = reconstruir_fila()
+        self.stdout.write(f"Fila de lembretes reconstruída: {total} lembretes.")
@@ -0,0 +1,229 @@
+"""
+Métricas agregadas no Redis e expostas no formato texto do Prometheus.
+
+Cada processo (web, workers) grava direto no Redis, então a agregação é
+global sem precisar de um pushgateway. Uma métrica é um hash:
+
+    metrics:<nome>  { '<labels>\\tcount': n, '<labels>\\tsum': s,
+                      '<labels>\\tbucket\\t<le>': n, ... }
+
+Os buckets são gravados de forma não cumulativa (um HINCRBY por observação)
+e acumulados só na renderização. Falhas do Redis nunca propagam: métricas
+são descartadas em silêncio e, em ``/metrics/``, o gauge ``agenda_metrics_up``
+vai a 0 (os coletores, que não dependem do Redis, continuam saindo).
+"""
+
+import logging
+import math
+import re
+from contextlib import contextmanager
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+PREFIXO = "metrics:"
+BUCKETS_SEGUNDOS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1, 2.5, 5, 10, 30, 60, 120, 300, 600, math.inf,
+)
+
+_registro: dict[str, "_Metrica"] = {}
+_coletores = []
+
+
+def metricas_habilitadas() -> bool:
+    return getattr(settings, "METRICS_ENABLED", False)
+
+
+def _labels(labels: dict) -> str:
+    partes = []
+    for chave in sorted(labels):
+        valor = str(labels[chave]).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        partes.append(f'{chave}="{valor}"')
+    return ",".join(partes)
+
+
+_LABEL_RE = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+_ESCAPE_RE = re.compile(r"\\(.)")
+
+
+def parse_labels(base: str) -> dict[str, str]:
+    """Inverso de ``_labels``: ``'view="x",q="y"'`` → ``{"view": "x", "q": "y"}``."""
+    return {
+        chave: _ESCAPE_RE.sub(lambda m: "\n" if m[1] == "n" else m[1], valor)
+        for chave, valor in _LABEL_RE.findall(base)
+    }
+
+
+def _le(limite: float) -> str:
+    return "+Inf" if limite == math.inf else repr(float(limite))
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.key = f"{PREFIXO}{nome}"
+        _registro[nome] = self
+
+    def _gravar(self, pipe, operacoes):
+        if not metricas_habilitadas():
+            return
+        try:
+            if pipe is not None:
+                operacoes(pipe)
+                return
+            p = get_redis().pipeline(transaction=False)
+            operacoes(p)
+            p.execute()
+        except Exception:
+            logger.debug("Falha ao gravar métrica %s", self.nome, exc_info=True)
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def incrementar(self, valor: float = 1, pipe=None, **labels):
+        campo = _labels(labels)
+        self._gravar(pipe, lambda p: p.hincrbyfloat(self.key, campo, valor))
+
+    def renderizar(self, dados: dict) -> list[str]:
+        return [
+            f"{self.nome}{{{campo}}} {float(valor)}" if campo else f"{self.nome} {float(valor)}"
+            for campo, valor in sorted(dados.items())
+        ]
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, buckets=BUCKETS_SEGUNDOS):
+        super().__init__(nome, ajuda)
+        self.buckets = tuple(sorted(buckets))
+        if self.buckets[-1] != math.inf:
+            self.buckets = (*self.buckets, math.inf)
+
+    def observar(self, valor: float, pipe=None, **labels):
+        base = _labels(labels)
+        le = next(b for b in self.buckets if valor <= b)
+
+        def _ops(p):
+            p.hincrby(self.key, f"{base}\tbucket\t{_le(le)}", 1)
+            p.hincrby(self.key, f"{base}\tcount", 1)
+            p.hincrbyfloat(self.key, f"{base}\tsum", valor)
+
+        self._gravar(pipe, _ops)
+
+    def agrupar(self, dados: dict) -> dict[str, dict]:
+        """Converte o hash em {labels: {"buckets": {le: n}, "count": n, "sum": s}}."""
+        series: dict[str, dict] = {}
+        for campo, valor in dados.items():
+            base, _, resto = campo.partition("\t")
+            serie = series.setdefault(base, {"buckets": {}, "count": 0, "sum": 0.0})
+            if resto == "count":
+                serie["count"] = int(float(valor))
+            elif resto == "sum":
+                serie["sum"] = float(valor)
+            else:
+                le = resto.split("\t", 1)[1]
+                serie["buckets"][math.inf if le == "+Inf" else float(le)] = int(valor)
+        return series
+
+    def renderizar(self, dados: dict) -> list[str]:
+        linhas = []
+        for base, serie in sorted(self.agrupar(dados).items()):
+            sep = "," if base else ""
+            acumulado = 0
+            for limite in self.buckets:
+                acumulado += serie["buckets"].get(limite, 0)
+                linhas.append(f'{self.nome}_bucket{{{base}{sep}le="{_le(limite)}"}} {acumulado}')
+            sufixo = f"{{{base}}}" if base else ""
+            linhas.append(f"{self.nome}_sum{sufixo} {serie['sum']}")
+            linhas.append(f"{self.nome}_count{sufixo} {serie['count']}")
+        return linhas
+
+
+def percentil(serie: dict, q: float) -> float | None:
+    """Estima o percentil ``q`` (0–1) de uma série agrupada por interpolação linear."""
+    total = serie["count"]
+    if not total:
+        return None
+    alvo = q * total
+    acumulado = 0
+    anterior = 0.0
+    for limite in sorted(serie["buckets"]):
+        n = serie["buckets"][limite]
+        if acumulado + n >= alvo and n:
+            if limite == math.inf:
+                return anterior
+            return anterior + (limite - anterior) * (alvo - acumulado) / n
+        acumulado += n
+        if limite != math.inf:
+            anterior = limite
+    return anterior
+
+
+def registrar_coletor(funcao):
+    """Registra uma função que gera linhas extras (ex.: gauges lidos na hora)."""
+    _coletores.append(funcao)
+    return funcao
+
+
+@contextmanager
+def lote():
+    """Agrupa várias gravações em um único round-trip ao Redis."""
+    if not metricas_habilitadas():
+        yield None
+        return
+    pipe = get_redis().pipeline(transaction=False)
+    yield pipe
+    try:
+        pipe.execute()
+    except Exception:
+        logger.debug("Falha ao gravar lote de métricas", exc_info=True)
+
+
+def ler(nome: str) -> dict:
+    """Lê o hash bruto de uma métrica registrada (campos e valores como str)."""
+    dados = get_redis().hgetall(_registro[nome].key)
+    return {k.decode(): v.decode() for k, v in dados.items()}
+
+
+def renderizar_prometheus() -> str:
+    """Renderiza todas as métricas registradas no formato texto do Prometheus."""
+    metricas = sorted(_registro.values(), key=lambda m: m.nome)
+    disponivel = True
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for metrica in metricas:
+            pipe.hgetall(metrica.key)
+        resultados = pipe.execute()
+    except RedisError:
+        # Redis fora é justamente quando o scrape importa: sai o gauge, não um 500
+        logger.exception("Redis indisponível ao renderizar as métricas")
+        metricas, resultados, disponivel = [], [], False
+
+    linhas = [
+        "# HELP agenda_metrics_up 1 se as métricas agregadas no Redis puderam ser lidas.",
+        "# TYPE agenda_metrics_up gauge",
+        f"agenda_metrics_up {int(disponivel)}",
+    ]
+    for metrica, dados in zip(metricas, resultados, strict=True):
+        dados = {k.decode(): v.decode() for k, v in dados.items()}
+        linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+        linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+        linhas.extend(metrica.renderizar(dados))
+
+    for coletor in _coletores:
+        try:
+            linhas.extend(coletor())
+        except Exception:
+            logger.exception("Erro no coletor de métricas %s", coletor.__name__)
+
+    return "\n".join(linhas) + "\n"
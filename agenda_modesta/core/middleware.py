@@ -0,0 +1,198 @@
+"""
+Instrumentação por view: quantidade de queries, tempo de SQL, tempo de
+Python e tamanho da resposta, agregados por nome de URL em
+``core/metrics.py`` (um único round-trip ao Redis por request).
+
+Requests acima de ``VIEW_METRICS_SLOW_MS`` têm a lista de queries logada e
+guardada (últimas ``AMOSTRAS_MAX``) para a página ``/desempenho/``.
+
+``SubscritorMiddleware`` resolve o tenant do usuário logado uma vez por
+request (``request.subscritor``).
+"""
+
+import json
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import connection
+from django.utils.functional import SimpleLazyObject
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+AMOSTRAS_KEY = f"{metrics.PREFIXO}views:lentas"
+AMOSTRAS_MAX = 50
+QUERIES_POR_AMOSTRA = 200
+
+VIEW_DURACAO = metrics.Histograma(
+    "http_view_duration_seconds", "Tempo total do request por view.",
+)
+VIEW_SQL = metrics.Histograma(
+    "http_view_sql_seconds", "Tempo gasto em SQL por request, por view.",
+)
+VIEW_PYTHON = metrics.Histograma(
+    "http_view_python_seconds", "Tempo fora do SQL por request, por view.",
+)
+VIEW_QUERIES = metrics.Histograma(
+    "http_view_queries", "Quantidade de queries SQL por request, por view.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, math.inf),
+)
+VIEW_BYTES = metrics.Histograma(
+    "http_view_response_bytes", "Tamanho do corpo da resposta, por view.",
+    buckets=(1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, math.inf),
+)
+
+
+class ColetorSQL:
+    """``execute_wrapper`` que conta as queries e soma o tempo gasto nelas."""
+
+    def __init__(self, guardar_sql: bool = True):
+        self.total = 0
+        self.tempo = 0.0
+        self.guardar_sql = guardar_sql
+        self.queries: list[tuple[str, float]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracao = time.perf_counter() - inicio
+            self.total += 1
+            self.tempo += duracao
+            if self.guardar_sql and len(self.queries) < QUERIES_POR_AMOSTRA:
+                self.queries.append((sql, duracao))
+
+
+def _limite_lento() -> float:
+    return getattr(settings, "VIEW_METRICS_SLOW_MS", 500) / 1000
+
+
+def _nome_view(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else "nao_resolvida"
+
+
+def _tamanho(response) -> int | None:
+    if response.streaming:
+        return None
+    return len(response.content)
+
+
+class MetricasViewMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not metrics.metricas_habilitadas():
+            return self.get_response(request)
+
+        coletor = ColetorSQL()
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(coletor):
+            response = self.get_response(request)
+        duracao = time.perf_counter() - inicio
+
+        self._registrar(request, response, coletor, duracao)
+        return response
+
+    def _registrar(self, request, response, coletor, duracao):
+        view = _nome_view(request)
+        tamanho = _tamanho(response)
+        lento = duracao >= _limite_lento()
+
+        with metrics.lote() as pipe:
+            VIEW_DURACAO.observar(duracao, pipe=pipe, view=view)
+            VIEW_SQL.observar(coletor.tempo, pipe=pipe, view=view)
+            VIEW_PYTHON.observar(max(duracao - coletor.tempo, 0.0), pipe=pipe, view=view)
+            VIEW_QUERIES.observar(coletor.total, pipe=pipe, view=view)
+            if tamanho is not None:
+                VIEW_BYTES.observar(tamanho, pipe=pipe, view=view)
+            if lento and pipe is not None:
+                amostra = {
+                    "view": view,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "duracao_ms": round(duracao * 1000, 1),
+                    "sql_ms": round(coletor.tempo * 1000, 1),
+                    "queries": [
+                        {"sql": sql, "ms": round(tempo * 1000, 2)} for sql, tempo in coletor.queries
+                    ],
+                    "total_queries": coletor.total,
+                    "quando": time.time(),
+                }
+                pipe.lpush(AMOSTRAS_KEY, json.dumps(amostra))
+                pipe.ltrim(AMOSTRAS_KEY, 0, AMOSTRAS_MAX - 1)
+
+        if lento:
+            logger.warning(
+                "Request lento: view=%s path=%s %.0fms sql=%.0fms queries=%d",
+                view, request.path, duracao * 1000, coletor.tempo * 1000, coletor.total,
+                extra={"queries": [sql for sql, _ in coletor.queries]},
+            )
+
+
+def resumo_views() -> list[dict]:
+    """p50/p95/p99 de duração, SQL e queries por view, ordenado pelo p95."""
+    series = {
+        metrica: metrica.agrupar(metrics.ler(metrica.nome))
+        for metrica in (VIEW_DURACAO, VIEW_SQL, VIEW_QUERIES, VIEW_BYTES)
+    }
+    linhas = []
+    for base, duracao in series[VIEW_DURACAO].items():
+        sql = series[VIEW_SQL].get(base)
+        queries = series[VIEW_QUERIES].get(base)
+        tamanho = series[VIEW_BYTES].get(base)
+        linha = {
+            "view": metrics.parse_labels(base).get("view", ""),
+            "requests": duracao["count"],
+            "bytes_medio": tamanho["sum"] / tamanho["count"] if tamanho and tamanho["count"] else None,
+        }
+        for q in (0.5, 0.95, 0.99):
+            sufixo = f"p{round(q * 100)}"
+            linha[f"duracao_{sufixo}"] = metrics.percentil(duracao, q)
+            linha[f"sql_{sufixo}"] = metrics.percentil(sql, q) if sql else None
+            linha[f"queries_{sufixo}"] = metrics.percentil(queries, q) if queries else None
+        linhas.append(linha)
+    return sorted(linhas, key=lambda linha: linha["duracao_p95"] or 0, reverse=True)
+
+
+def amostras_lentas() -> list[dict]:
+    from .redis_client import get_redis
+
+    return [json.loads(bruto) for bruto in get_redis().lrange(AMOSTRAS_KEY, 0, AMOSTRAS_MAX - 1)]
+
+
+class SubscritorMiddleware:
+    """
+    Resolve o tenant uma vez por request em ``request.subscritor``.
+
+    A resolução é preguiçosa (só acontece se a view usar) e vem do cache
+    (``get_user_subscritor``); anônimos recebem ``None``. Usuário logado sem
+    Subscritor é erro de cadastro: responde 403 em vez de criar um na hora.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.subscritor = SimpleLazyObject(lambda: _subscritor_da_request(request))
+        return self.get_response(request)
+
+
+def _subscritor_da_request(request):
+    from agenda_modesta.subscriptions.models import Subscritor
+
+    from .utils import get_user_subscritor
+
+    if not request.user.is_authenticated:
+        return None
+    try:
+        return get_user_subscritor(request.user)
+    except Subscritor.DoesNotExist as exc:
+        logger.error("Usuário %s autenticado sem Subscritor", request.user.pk)  # noqa: TRY400
+        raise PermissionDenied from exc
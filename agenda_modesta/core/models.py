@@ -1,3 +1,84 @@
 from django.db import models
 
-# Create your models here.
+
+class CamposAlteradosMixin:
+    """
+    Rastreia quais campos mudaram desde que a instância veio do banco.
+
+    Os valores carregados ficam em ``_valores_originais`` (arquivos pelo
+    nome, não pelo ``FieldFile``, que arrasta a instância); no ``save`` o
+    conjunto de campos alterados (restrito a ``update_fields``, se houver) é
+    guardado em ``_campos_salvos`` para os receivers de ``post_save``
+    consultarem com ``alterou(...)`` e pularem trabalho sem efeito.
+
+    Instâncias que não vieram do banco (criação, ``Model(...)`` montado à
+    mão) contam como "tudo alterado". Campos adiados (``only``/``defer``)
+    só entram na comparação depois de carregados.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._valores_originais = instance._valores_atuais()
+        return instance
+
+    def _valores_atuais(self) -> dict:
+        valores = {}
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue
+            valor = self.__dict__[field.attname]
+            if isinstance(field, models.FileField):
+                valor = getattr(valor, "name", valor)
+            valores[field.name] = valor
+        return valores
+
+    def campos_alterados(self) -> set[str] | None:
+        """Nomes dos campos diferentes do banco, ou ``None`` se não há referência."""
+        originais = getattr(self, "_valores_originais", None)
+        if originais is None:
+            return None
+        return {
+            nome for nome, valor in self._valores_atuais().items()
+            if nome not in originais or originais[nome] != valor
+        }
+
+    def alterou(self, *campos: str) -> bool:
+        """No ``post_save``: algum dos ``campos`` foi gravado com valor novo?"""
+        salvos = getattr(self, "_campos_salvos", None)
+        if salvos is None:
+            return True
+        return not salvos.isdisjoint(campos)
+
+    def save(self, *args, **kwargs):
+        alterados = self.campos_alterados()
+        update_fields = kwargs.get("update_fields")
+        if alterados is not None and update_fields is not None:
+            alterados &= set(update_fields)
+        self._campos_salvos = alterados
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            self._campos_salvos = None
+
+        atuais = self._valores_atuais()
+        if update_fields is None or getattr(self, "_valores_originais", None) is None:
+            self._valores_originais = atuais
+        else:
+            # Campos fora do update_fields continuam pendentes
+            for nome in update_fields:
+                nome = self._meta.get_field(nome).name  # noqa: PLW2901
+                if nome in atuais:
+                    self._valores_originais[nome] = atuais[nome]
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        atuais = self._valores_atuais()
+        if fields is None or getattr(self, "_valores_originais", None) is None:
+            self._valores_originais = atuais
+            return
+        # Campo adiado carregado agora (ou refresh parcial): o resto continua pendente
+        for nome in fields:
+            nome = self._meta.get_field(nome).name  # noqa: PLW2901
+            if nome in atuais:
+                self._valores_originais[nome] = atuais[nome]
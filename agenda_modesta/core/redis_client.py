@@ -0,0 +1,12 @@
+import redis
+from django.conf import settings
+
+_client = None
+
+
+def get_redis():
+    """Retorna (e reaproveita) o cliente Redis da aplicação (``REDIS_URL``)."""
+    global _client  # noqa: PLW0603
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
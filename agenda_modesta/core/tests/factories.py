@@ -0,0 +1,139 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+from factory import Faker
+from factory import LazyAttribute
+from factory import SelfAttribute
+from factory import Sequence
+from factory import SubFactory
+from factory.django import DjangoModelFactory
+
+from agenda_modesta.agenda.models import Agenda
+from agenda_modesta.agenda.models import GoogleCalendarChannel
+from agenda_modesta.clients.models import Cliente
+from agenda_modesta.finance.models import Orcamento
+from agenda_modesta.finance.models import PacoteServico
+from agenda_modesta.finance.models import Recibo
+from agenda_modesta.notifications.models import EntregaNotificacao
+from agenda_modesta.notifications.models import TipoNotificacao
+from agenda_modesta.projects.models import Projeto
+from agenda_modesta.subscriptions.models import Subscritor
+from agenda_modesta.users.tests.factories import UserFactory
+
+
+class SubscritorFactory(DjangoModelFactory[Subscritor]):
+    # O post_save de User já cria o Subscritor; get_or_create reaproveita
+    usuario = SubFactory(UserFactory)
+    nome_empresa = Faker("company", locale="pt_BR")
+
+    class Meta:
+        model = Subscritor
+        django_get_or_create = ["usuario"]
+
+
+class ClienteFactory(DjangoModelFactory[Cliente]):
+    subscritor = SubFactory(SubscritorFactory)
+    usuario = SelfAttribute("subscritor.usuario")
+    nome = Faker("name", locale="pt_BR")
+    email = Faker("email")
+    telefone = Faker("msisdn")
+    cpf_cnpj = Faker("cpf", locale="pt_BR")
+    cidade = Faker("city", locale="pt_BR")
+    estado = Faker("estado_sigla", locale="pt_BR")
+    endereco = Faker("street_address", locale="pt_BR")
+
+    class Meta:
+        model = Cliente
+
+
+class ProjetoFactory(DjangoModelFactory[Projeto]):
+    subscritor = SubFactory(SubscritorFactory)
+    usuario = SelfAttribute("subscritor.usuario")
+    cliente = SubFactory(ClienteFactory, subscritor=SelfAttribute("..subscritor"))
+    nome = Faker("catch_phrase")
+    status = Projeto.StatusProjeto.EM_ANDAMENTO
+
+    class Meta:
+        model = Projeto
+
+
+class AgendaFactory(DjangoModelFactory[Agenda]):
+    subscritor = SubFactory(SubscritorFactory)
+    usuario = SelfAttribute("subscritor.usuario")
+    projeto = SubFactory(ProjetoFactory, subscritor=SelfAttribute("..subscritor"))
+    titulo = Faker("sentence", nb_words=3)
+    data_inicio = Sequence(lambda n: timezone.now() + timedelta(hours=n + 1))
+    data_fim = LazyAttribute(lambda o: o.data_inicio + timedelta(hours=1))
+    notificar_email = False  # evita o e-mail de confirmação no post_save
+
+    class Meta:
+        model = Agenda
+
+
+class GoogleCalendarChannelFactory(DjangoModelFactory[GoogleCalendarChannel]):
+    subscritor = SubFactory(SubscritorFactory)
+    channel_id = Faker("uuid4")
+    resource_id = Faker("uuid4")
+    google_calendar_id = "primary"
+    expiration = LazyAttribute(lambda o: timezone.now() + timedelta(days=7))
+
+    class Meta:
+        model = GoogleCalendarChannel
+
+
+class PacoteServicoFactory(DjangoModelFactory[PacoteServico]):
+    subscritor = SubFactory(SubscritorFactory)
+    usuario = SelfAttribute("subscritor.usuario")
+    nome = Sequence(lambda n: f"Pacote {n}h")
+    horas_inclusas = Decimal(10)
+    valor_hora_pacote = Decimal(300)
+    valor_hora_referencia = Decimal(390)
+
+    class Meta:
+        model = PacoteServico
+
+
+class OrcamentoFactory(DjangoModelFactory[Orcamento]):
+    subscritor = SubFactory(SubscritorFactory)
+    usuario = SelfAttribute("subscritor.usuario")
+    cliente = SubFactory(ClienteFactory, subscritor=SelfAttribute("..subscritor"))
+    projeto = SubFactory(
+        ProjetoFactory,
+        subscritor=SelfAttribute("..subscritor"),
+        cliente=SelfAttribute("..cliente"),
+    )
+    numero_sequencial = Sequence(lambda n: n + 1)
+    horas_trabalhadas = Decimal(2)
+    valor_hora = Decimal(150)
+    valor_total = LazyAttribute(lambda o: o.horas_trabalhadas * o.valor_hora)
+
+    class Meta:
+        model = Orcamento
+
+
+class ReciboFactory(DjangoModelFactory[Recibo]):
+    subscritor = SubFactory(SubscritorFactory)
+    usuario = SelfAttribute("subscritor.usuario")
+    cliente = SubFactory(ClienteFactory, subscritor=SelfAttribute("..subscritor"))
+    projeto = SubFactory(
+        ProjetoFactory,
+        subscritor=SelfAttribute("..subscritor"),
+        cliente=SelfAttribute("..cliente"),
+    )
+    numero_sequencial = Sequence(lambda n: n + 1)
+    horas_trabalhadas = Decimal(2)
+    valor_hora = Decimal(150)
+    valor_total = LazyAttribute(lambda o: o.horas_trabalhadas * o.valor_hora)
+
+    class Meta:
+        model = Recibo
+
+
+class EntregaNotificacaoFactory(DjangoModelFactory[EntregaNotificacao]):
+    agenda = SubFactory(AgendaFactory)
+    tipo = TipoNotificacao.LEMBRETE
+    agendado_para = LazyAttribute(lambda o: o.agenda.data_inicio - timedelta(days=1))
+
+    class Meta:
+        model = EntregaNotificacao
@@ -0,0 +1,87 @@
+import pytest
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_save
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from agenda_modesta.subscriptions.models import Subscritor
+from agenda_modesta.users.models import User
+from agenda_modesta.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_instancia_do_banco_comeca_sem_alteracoes():
+    usuario = User.objects.get(pk=UserFactory().pk)
+    assert usuario.campos_alterados() == set()
+
+    usuario.name = "Outro Nome"
+    assert usuario.campos_alterados() == {"name"}
+
+
+def test_instancia_nova_conta_como_tudo_alterado():
+    usuario = UserFactory.build()
+    assert usuario.campos_alterados() is None
+    assert usuario.alterou("name")
+
+
+def test_update_fields_restringe_e_mantem_o_resto_pendente():
+    usuario = User.objects.get(pk=UserFactory().pk)
+    usuario.name = "Outro Nome"
+    usuario.email = "novo@example.com"
+
+    usuario.save(update_fields=["name"])
+
+    assert usuario.campos_alterados() == {"email"}
+
+
+def test_carregar_campo_adiado_nao_esquece_alteracao_pendente():
+    usuario = User.objects.only("id", "name").get(pk=UserFactory().pk)
+    usuario.name = "Outro Nome"
+    assert usuario.email  # carrega o campo adiado: refresh_from_db(fields=["email"])
+    assert usuario.campos_alterados() == {"name"}
+
+    vistos = []
+
+    def receiver(sender, instance, **kwargs):
+        vistos.append(instance.alterou("name"))
+
+    post_save.connect(receiver, sender=User)
+    try:
+        usuario.save()
+    finally:
+        post_save.disconnect(receiver, sender=User)
+    assert vistos == [True]
+
+
+def test_arquivo_guardado_pelo_nome():
+    usuario = User.objects.get(pk=UserFactory(logo_empresa="logos/a.png").pk)
+    assert usuario.logo_empresa.name == "logos/a.png"  # vira FieldFile no __dict__
+
+    assert usuario.campos_alterados() == set()
+    assert usuario._valores_atuais()["logo_empresa"] == "logos/a.png"  # noqa: SLF001
+    usuario.logo_empresa = "logos/b.png"
+    assert usuario.campos_alterados() == {"logo_empresa"}
+
+
+def test_login_nao_grava_o_subscritor():
+    usuario = User.objects.get(pk=UserFactory().pk)
+    request = RequestFactory().get("/")
+
+    with CaptureQueriesContext(connection) as queries:
+        user_logged_in.send(sender=User, request=request, user=usuario)
+
+    sqls = [q["sql"] for q in queries]
+    assert any('UPDATE "users_user"' in sql for sql in sqls)
+    assert not any("subscriptions_subscritor" in sql for sql in sqls)
+
+
+def test_mudanca_de_nome_atualiza_o_subscritor():
+    usuario = User.objects.get(pk=UserFactory().pk)
+    antes = Subscritor.objects.get(usuario=usuario).data_atualizacao
+
+    usuario.name = "Estúdio Modesto"
+    usuario.save()
+
+    assert Subscritor.objects.get(usuario=usuario).data_atualizacao > antes
@@ -0,0 +1,101 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from schedule.models import Event as ScheduleEvent
+
+from agenda_modesta.agenda.models import Agenda
+from agenda_modesta.clients.models import Cliente
+from agenda_modesta.core.exclusao import excluir_cliente
+from agenda_modesta.core.exclusao import excluir_projeto
+from agenda_modesta.core.exclusao import prazo_task
+from agenda_modesta.finance.models import Orcamento
+from agenda_modesta.finance.models import Recibo
+from agenda_modesta.projects.models import Projeto
+
+from .factories import AgendaFactory
+from .factories import ClienteFactory
+from .factories import OrcamentoFactory
+from .factories import ProjetoFactory
+from .factories import ReciboFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_excluir_cliente_marca_na_hora_e_a_task_apaga_em_lotes(
+    client, settings, django_capture_on_commit_callbacks,
+):
+    settings.EXCLUSAO_TAMANHO_LOTE = 2
+    cliente = ClienteFactory(nome="Cliente Grande")
+    subscritor = cliente.subscritor
+    projeto = ProjetoFactory(subscritor=subscritor, cliente=cliente)
+    agendas = AgendaFactory.create_batch(3, subscritor=subscritor, projeto=projeto)
+    OrcamentoFactory.create_batch(3, subscritor=subscritor, cliente=cliente, projeto=projeto)
+    ReciboFactory.create_batch(3, subscritor=subscritor, cliente=cliente, projeto=projeto)
+    client.force_login(subscritor.usuario)
+
+    with (
+        mock.patch("agenda_modesta.notifications.tasks.excluir_cliente_em_lotes.delay") as delay,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        response = client.delete(reverse("clients:delete", kwargs={"pk": cliente.pk}))
+
+    assert response.status_code == 200  # noqa: PLR2004
+    delay.assert_called_once_with(str(cliente.pk))
+    # Marcado: some das telas, mas nada foi apagado ainda
+    assert Projeto.objects.get(pk=projeto.pk).excluido_em is not None
+    assert client.get(reverse("clients:detail", kwargs={"pk": cliente.pk})).status_code == 404  # noqa: PLR2004
+    assert Recibo.objects.filter(cliente=cliente).count() == 3  # noqa: PLR2004
+    assert client.get(reverse("finance:orcamentos")).context["total_orcamentos"] == 0
+    assert client.get(reverse("finance:recibos")).context["total_recibos"] == 0
+
+    assert excluir_cliente(str(cliente.pk), prazo_task())
+
+    assert not Cliente.objects.filter(pk=cliente.pk).exists()
+    assert not Projeto.objects.filter(pk=projeto.pk).exists()
+    assert not Orcamento.objects.filter(cliente_id=cliente.pk).exists()
+    assert not Recibo.objects.filter(cliente_id=cliente.pk).exists()
+    # Os agendamentos ficam, sem projeto, e o espelho perde o nome do cliente
+    assert Agenda.objects.filter(pk__in=[a.pk for a in agendas], projeto=None).count() == 3  # noqa: PLR2004
+    titulos = set(
+        ScheduleEvent.objects.filter(calendar__slug=f"subscritor-{subscritor.pk}").values_list("title", flat=True),
+    )
+    assert titulos == {agenda.titulo for agenda in agendas}
+
+
+def test_exclusao_sem_prazo_para_e_continua_depois():
+    projeto = ProjetoFactory()
+    agenda = AgendaFactory(subscritor=projeto.subscritor, projeto=projeto)
+    Projeto.objects.filter(pk=projeto.pk).update(excluido_em=timezone.now())
+
+    assert not excluir_projeto(projeto.pk, time.monotonic())
+    assert Projeto.objects.filter(pk=projeto.pk).exists()
+
+    assert excluir_projeto(projeto.pk, prazo_task())
+    assert not Projeto.objects.filter(pk=projeto.pk).exists()
+    assert Agenda.objects.get(pk=agenda.pk).projeto_id is None
+    # Já apagado (ou exclusão não pedida): nada a fazer
+    assert excluir_projeto(projeto.pk, prazo_task())
+
+
+def test_retomar_exclusoes_pendentes_reenfileira_tasks_perdidas():
+    from agenda_modesta.notifications.tasks import retomar_exclusoes_pendentes
+
+    antigo = timezone.now() - timedelta(hours=2)
+    cliente = ClienteFactory()
+    Cliente.objects.filter(pk=cliente.pk).update(excluido_em=antigo)
+    ProjetoFactory(subscritor=cliente.subscritor, cliente=cliente, excluido_em=antigo)  # vai com o cliente
+    avulso = ProjetoFactory(excluido_em=antigo)
+    ProjetoFactory(excluido_em=timezone.now())  # task ainda em curso
+
+    with (
+        mock.patch("agenda_modesta.notifications.tasks.excluir_cliente_em_lotes.delay") as clientes,
+        mock.patch("agenda_modesta.notifications.tasks.excluir_projeto_em_lotes.delay") as projetos,
+    ):
+        assert retomar_exclusoes_pendentes() == {"clientes": 1, "projetos": 1}
+
+    clientes.assert_called_once_with(str(cliente.pk))
+    projetos.assert_called_once_with(str(avulso.pk))
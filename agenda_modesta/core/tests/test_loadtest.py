@@ -0,0 +1,48 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from agenda_modesta.core.loadtest import Estatisticas
+from agenda_modesta.core.loadtest import percentil_exato
+
+
+def test_percentil_exato_interpola_entre_amostras():
+    valores = [0.1, 0.2, 0.3, 0.4]
+    assert percentil_exato(valores, 0) == 0.1  # noqa: PLR2004
+    assert percentil_exato(valores, 0.5) == pytest.approx(0.25)
+    assert percentil_exato([], 0.5) is None
+
+
+def test_estatisticas_contam_erros_por_endpoint():
+    estatisticas = Estatisticas()
+    estatisticas.registrar("home", 0.05, 200)
+    estatisticas.registrar("home", 0.15, 500)
+    estatisticas.registrar("agenda:list", 0.01, "ConnectionRefusedError")
+
+    resumo = estatisticas.resumo(duracao=2)
+
+    assert resumo["endpoints"]["home"]["erros"] == 1
+    assert resumo["endpoints"]["home"]["p50_ms"] == pytest.approx(100)
+    assert resumo["total"]["requests"] == 3  # noqa: PLR2004
+    assert resumo["total"]["rps"] == 1.5  # noqa: PLR2004
+
+
+@pytest.mark.django_db(transaction=True)
+def test_load_test_contra_live_server(live_server, tmp_path):
+    call_command(
+        "seed_benchmark_data", "--subscritores", "1", "--clientes", "3", "--projetos", "3",
+        "--agendas", "5", "--orcamentos", "2", "--recibos", "1", "--seed", "9",
+        stdout=StringIO(),
+    )
+    saida = tmp_path / "resultado.json"
+
+    call_command(
+        "load_test", "--base-url", live_server.url, "--usuarios", "1", "--duracao", "1",
+        "--rampa", "0", "--seed", "9", "--saida", str(saida), stdout=StringIO(),
+    )
+
+    resultado = json.loads(saida.read_text())
+    assert resultado["endpoints"]["home"]["status"] == {"200": 1}
+    assert resultado["total"]["erros"] == 0
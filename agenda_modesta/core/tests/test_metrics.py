@@ -0,0 +1,57 @@
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from agenda_modesta.core.celery_metrics import TASK_EXECUCAO
+from agenda_modesta.core.metrics import percentil
+from agenda_modesta.core.middleware import ColetorSQL
+from agenda_modesta.users.models import User
+
+# Hash como fica no Redis após 3 observações de 0,02 s e 1 de 3 s
+DADOS = {
+    'task="t"\tbucket\t0.025': "3",
+    'task="t"\tbucket\t5.0': "1",
+    'task="t"\tcount': "4",
+    'task="t"\tsum': "3.06",
+}
+
+
+def test_histograma_renderiza_buckets_cumulativos():
+    linhas = TASK_EXECUCAO.renderizar(DADOS)
+    assert 'celery_task_runtime_seconds_bucket{task="t",le="0.01"} 0' in linhas
+    assert 'celery_task_runtime_seconds_bucket{task="t",le="0.025"} 3' in linhas
+    assert 'celery_task_runtime_seconds_bucket{task="t",le="+Inf"} 4' in linhas
+    assert 'celery_task_runtime_seconds_count{task="t"} 4' in linhas
+
+
+def test_percentil_interpola_dentro_do_bucket():
+    serie = TASK_EXECUCAO.agrupar(DADOS)['task="t"']
+    assert percentil(serie, 0.5) < 0.025
+    assert 2.5 < percentil(serie, 0.99) <= 5
+
+
+@pytest.mark.django_db
+def test_coletor_sql_conta_queries_e_guarda_amostra():
+    coletor = ColetorSQL()
+    with connection.execute_wrapper(coletor):
+        User.objects.count()
+        list(User.objects.all())
+    assert coletor.total == 2
+    assert coletor.tempo > 0
+    assert "COUNT" in coletor.queries[0][0].upper()
+
+
+@pytest.mark.django_db
+def test_metrics_sem_redis_responde_com_gauge_zerado(client, settings):
+    settings.METRICS_TOKEN = "segredo"
+    redis = mock.Mock()
+    redis.pipeline.return_value.execute.side_effect = RedisConnectionError("fora")
+
+    with mock.patch("agenda_modesta.core.metrics.get_redis", return_value=redis):
+        response = client.get(reverse("metrics"), headers={"Authorization": "Bearer segredo"})
+
+    assert response.status_code == 200  # noqa: PLR2004
+    assert "agenda_metrics_up 0" in response.content.decode()
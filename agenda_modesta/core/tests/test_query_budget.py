@@ -0,0 +1,158 @@
+"""
+Orçamento de queries por view.
+
+Cada view (e partial HTMX) é renderizada para dois subscritores no mesmo
+banco, um com poucas linhas e outro com muitas. As duas execuções precisam
+fazer o mesmo número de queries (nada de N+1) e ficar dentro do orçamento
+fixo da view. Se uma mudança legítima alterar a contagem, ajuste o
+orçamento junto com a mudança.
+
+As contagens são do regime normal, com o subscritor já no cache
+(``SubscritorMiddleware``).
+"""
+
+from dataclasses import dataclass
+from dataclasses import field
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from agenda_modesta.agenda.models import Agenda
+from agenda_modesta.clients.models import Cliente
+from agenda_modesta.core.utils import get_user_subscritor
+from agenda_modesta.finance.models import Orcamento
+from agenda_modesta.finance.models import PacoteServico
+from agenda_modesta.finance.models import Recibo
+from agenda_modesta.projects.models import Projeto
+
+from .factories import AgendaFactory
+from .factories import ClienteFactory
+from .factories import OrcamentoFactory
+from .factories import PacoteServicoFactory
+from .factories import ProjetoFactory
+from .factories import ReciboFactory
+from .factories import SubscritorFactory
+
+pytestmark = pytest.mark.django_db
+
+POUCAS_LINHAS = 10
+MUITAS_LINHAS = 1000
+
+
+def _popular(linhas: int) -> dict:
+    """
+    Cria um subscritor com ``linhas`` registros de cada modelo.
+    Os objetos "principais" (usados nas URLs de detalhe) passam pelas
+    factories; o volume vai por bulk_create.
+    """
+    subscritor = SubscritorFactory()
+    cliente = ClienteFactory(subscritor=subscritor)
+    projeto = ProjetoFactory(subscritor=subscritor, cliente=cliente)
+    pacote = PacoteServicoFactory(subscritor=subscritor)
+    agenda = AgendaFactory(subscritor=subscritor, projeto=projeto)
+    orcamento = OrcamentoFactory(subscritor=subscritor, cliente=cliente, projeto=projeto, pacote=pacote)
+    recibo = ReciboFactory(subscritor=subscritor, cliente=cliente, projeto=projeto)
+
+    Cliente.objects.bulk_create(ClienteFactory.build_batch(linhas, subscritor=subscritor))
+    Projeto.objects.bulk_create(ProjetoFactory.build_batch(linhas, subscritor=subscritor, cliente=cliente))
+    PacoteServico.objects.bulk_create(PacoteServicoFactory.build_batch(linhas, subscritor=subscritor))
+    Agenda.objects.bulk_create(AgendaFactory.build_batch(linhas, subscritor=subscritor, projeto=projeto))
+    Orcamento.objects.bulk_create(
+        OrcamentoFactory.build_batch(linhas, subscritor=subscritor, cliente=cliente, projeto=projeto, pacote=pacote),
+    )
+    Recibo.objects.bulk_create(
+        ReciboFactory.build_batch(linhas, subscritor=subscritor, cliente=cliente, projeto=projeto),
+    )
+
+    return {
+        "usuario": subscritor.usuario,
+        "cliente": cliente,
+        "projeto": projeto,
+        "pacote": pacote,
+        "agenda": agenda,
+        "orcamento": orcamento,
+        "recibo": recibo,
+    }
+
+
+@dataclass
+class Caso:
+    url: str
+    orcamento: int
+    objeto: str = ""  # chave de _popular() usada como pk da URL
+    metodo: str = "get"
+    htmx: bool = False
+    params: dict = field(default_factory=dict)
+
+    def __str__(self):
+        return f"{self.url}{'[htmx]' if self.htmx else ''}"
+
+
+CASOS = [
+    Caso("home", 11),
+    Caso("proximos_agendamentos", 5, htmx=True),
+    Caso("clients:list", 6),
+    Caso("clients:list", 6, htmx=True),
+    Caso("clients:detail", 7, objeto="cliente"),
+    Caso("clients:create", 4),
+    Caso("clients:edit", 5, objeto="cliente"),
+    Caso("projects:list", 7),
+    Caso("projects:list", 6, htmx=True),
+    Caso("projects:detail", 7, objeto="projeto"),
+    Caso("projects:create", 5),
+    Caso("projects:edit", 6, objeto="projeto"),
+    Caso("agenda:list", 5),
+    Caso("agenda:list", 5, htmx=True),
+    Caso("agenda:create", 5),
+    Caso("agenda:edit", 6, objeto="agenda"),
+    Caso("agenda:toggle_confirmado", 13, objeto="agenda", metodo="post", htmx=True),
+    Caso("agenda:novo_agendamento", 5, htmx=True),
+    Caso("agenda:week_json", 5),
+    Caso("agenda:horarios_livres", 5, params={"duracao": 60}),
+    Caso("finance:orcamentos", 10),
+    Caso("finance:orcamentos", 9, htmx=True),
+    Caso("finance:orcamento_create", 7),
+    Caso("finance:orcamento_edit", 8, objeto="orcamento"),
+    Caso("finance:orcamento_marcar_pago", 8, objeto="orcamento", metodo="post", htmx=True),
+    Caso("finance:get_pacote_info", 5, htmx=True),
+    Caso("finance:recibos", 9),
+    Caso("finance:recibos", 8, htmx=True),
+    Caso("finance:recibo_create", 6),
+    Caso("finance:recibo_detail", 7, objeto="recibo"),
+    Caso("finance:pacotes", 5),
+    Caso("finance:pacote_create", 4),
+    Caso("finance:pacote_edit", 5, objeto="pacote"),
+]
+
+
+def _contar_queries(client, caso: Caso, dados: dict) -> int:
+    client.force_login(dados["usuario"])
+    # Regime normal: o contexto do tenant já está no cache do SubscritorMiddleware
+    get_user_subscritor(dados["usuario"])
+    kwargs = {"pk": dados[caso.objeto].pk} if caso.objeto else {}
+    params = dict(caso.params)
+    if caso.url == "finance:get_pacote_info":
+        params["pacote"] = str(dados["pacote"].pk)
+    headers = {"HX-Request": "true"} if caso.htmx else {}
+
+    with CaptureQueriesContext(connection) as queries:
+        response = getattr(client, caso.metodo)(reverse(caso.url, kwargs=kwargs), params, headers=headers)
+
+    assert response.status_code == 200, response.status_code  # noqa: PLR2004
+    return len(queries)
+
+
+@pytest.mark.parametrize("caso", CASOS, ids=str)
+def test_queries_nao_crescem_com_o_volume(client, caso: Caso):
+    pequeno = _popular(POUCAS_LINHAS)
+    grande = _popular(MUITAS_LINHAS)
+
+    com_poucas = _contar_queries(client, caso, pequeno)
+    com_muitas = _contar_queries(client, caso, grande)
+
+    assert com_poucas == com_muitas, (
+        f"{caso}: {com_poucas} queries com {POUCAS_LINHAS} linhas, {com_muitas} com {MUITAS_LINHAS}"
+    )
+    assert com_muitas <= caso.orcamento, f"{caso}: {com_muitas} queries (orçamento {caso.orcamento})"
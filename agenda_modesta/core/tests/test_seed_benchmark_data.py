@@ -0,0 +1,40 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from schedule.models import Event as ScheduleEvent
+
+from agenda_modesta.agenda.models import Agenda
+from agenda_modesta.finance.models import Orcamento
+from agenda_modesta.subscriptions.models import Subscritor
+
+pytestmark = pytest.mark.django_db
+
+ARGS = [
+    "--subscritores", "2", "--clientes", "5", "--projetos", "8", "--agendas", "30",
+    "--pacotes", "2", "--orcamentos", "4", "--recibos", "3", "--lote", "7",
+    "--fracao-google", "0.5", "--seed", "3", "--referencia", "2026-03-02",
+]
+
+
+def _seed(*extra):
+    call_command("seed_benchmark_data", *ARGS, *extra, stdout=StringIO())
+    return sorted(Agenda.objects.values_list("pk", "data_inicio", "google_event_id"))
+
+
+def test_seed_benchmark_data_gera_volume_e_espelho_do_scheduler():
+    _seed()
+
+    assert Subscritor.objects.count() == 2  # noqa: PLR2004
+    assert Agenda.objects.count() == 60  # noqa: PLR2004
+    assert Orcamento.objects.filter(numero_sequencial=4).count() == 2  # noqa: PLR2004
+    assert 0 < Agenda.objects.exclude(google_event_id="").count() < 60  # noqa: PLR2004
+    # bulk_create não dispara signals; o espelho é gravado pelo próprio comando
+    assert ScheduleEvent.objects.count() == 60  # noqa: PLR2004
+
+
+def test_seed_benchmark_data_e_deterministico():
+    primeira = _seed()
+    segunda = _seed("--limpar")
+    assert primeira == segunda
+    assert ScheduleEvent.objects.count() == len(segunda)
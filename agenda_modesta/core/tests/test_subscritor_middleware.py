@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from agenda_modesta.subscriptions.models import Subscritor
+from agenda_modesta.users.models import User
+
+from .factories import SubscritorFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _queries_subscritor(queries) -> list[str]:
+    return [q["sql"] for q in queries if 'FROM "subscriptions_subscritor"' in q["sql"]]
+
+
+def test_subscritor_vem_do_cache_a_partir_do_segundo_request(client):
+    subscritor = SubscritorFactory()
+    client.force_login(subscritor.usuario)
+    url = reverse("clients:list")
+
+    with CaptureQueriesContext(connection) as primeiro:
+        client.get(url)
+    with CaptureQueriesContext(connection) as segundo:
+        response = client.get(url)
+
+    assert response.status_code == 200  # noqa: PLR2004
+    assert len(_queries_subscritor(primeiro)) == 1
+    assert _queries_subscritor(segundo) == []
+    assert response.wsgi_request.subscritor.pk == subscritor.pk
+
+
+def test_save_do_subscritor_invalida_o_cache(client):
+    subscritor = SubscritorFactory()
+    client.force_login(subscritor.usuario)
+    client.get(reverse("clients:list"))
+
+    subscritor.nome_empresa = "Estúdio Novo"
+    subscritor.save()
+    response = client.get(reverse("clients:list"))
+
+    assert response.wsgi_request.subscritor.nome_empresa == "Estúdio Novo"
+
+
+def test_usuario_sem_subscritor_recebe_403_sem_criar(client):
+    subscritor = SubscritorFactory()
+    subscritor.delete()
+    usuario = User.objects.get(pk=subscritor.usuario_id)
+    client.force_login(usuario)
+
+    response = client.get(reverse("clients:list"))
+
+    assert response.status_code == 403  # noqa: PLR2004
+    assert not Subscritor.objects.filter(usuario=usuario).exists()
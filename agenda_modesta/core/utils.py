@@ -1,13 +1,68 @@
+import logging
+from datetime import date, datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
 from agenda_modesta.subscriptions.models import Subscritor
 
+logger = logging.getLogger(__name__)
+
+# Campos do subscritor guardados no cache; o resto fica adiado (deferred) e
+# só vai ao banco se alguém acessar.
+CAMPOS_CACHE_SUBSCRITOR = ("id", "usuario_id", "nome_empresa", "ativo", "google_calendar_id")
+TIMEOUT_CACHE_SUBSCRITOR = 60 * 60
+
+
+def chave_cache_subscritor(usuario_id) -> str:
+    return f"subscritor:usuario:{usuario_id}"
+
+
+def invalidar_cache_subscritor(usuario_id):
+    cache.delete(chave_cache_subscritor(usuario_id))
+
 
 def get_user_subscritor(user):
     """
-    Get or create a Subscritor for the given user.
-    This handles the case where a user exists but doesn't have an associated Subscritor.
+    Retorna o Subscritor do usuário, com id e campos básicos vindos do cache.
+
+    Não cria: o Subscritor nasce no cadastro (signal ``create_subscritor``).
+    Levanta ``Subscritor.DoesNotExist`` se o usuário não tiver um.
     """
-    try:
-        return user.subscritor
-    except Subscritor.DoesNotExist:
-        return Subscritor.objects.create(usuario=user)
+    chave = chave_cache_subscritor(user.pk)
+    dados = cache.get(chave)
+    if dados is None:
+        dados = Subscritor.objects.filter(usuario_id=user.pk).values(*CAMPOS_CACHE_SUBSCRITOR).first()
+        if dados is None:
+            msg = f"Usuário {user.pk} sem Subscritor"
+            raise Subscritor.DoesNotExist(msg)
+        cache.set(chave, dados, TIMEOUT_CACHE_SUBSCRITOR)
+
+    subscritor = Subscritor.from_db(DEFAULT_DB_ALIAS, list(dados), list(dados.values()))
+    # Evita a query do __str__ (nome do usuário) e do acesso reverso
+    subscritor.usuario = user
+    return subscritor
+
+
+def faixa_de_dias(inicio: date | None, fim: date | None = None) -> dict:
+    """
+    Filtro de ``data_inicio`` para os dias ``inicio``..``fim`` (inclusive) no
+    fuso atual. Equivale a ``data_inicio__date__gte/lte``, mas compara a
+    coluna direto: o Postgres usa os índices e só abre as partições da faixa.
+    """
+    filtro = {}
+    if inicio:
+        filtro["data_inicio__gte"] = timezone.make_aware(datetime.combine(inicio, time.min))
+    if fim:
+        filtro["data_inicio__lt"] = timezone.make_aware(datetime.combine(fim + timedelta(days=1), time.min))
+    return filtro
 
+
+def ler_data(valor: str) -> date | None:
+    """``YYYY-MM-DD`` da querystring, ou ``None`` se vazio ou inválido."""
+    try:
+        return parse_date(valor or "")
+    except ValueError:
+        return None
@@ -1,5 +1,9 @@
 from django.shortcuts import render
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
 from django.utils import timezone
 from django.db.models import Sum
 
@@ -7,7 +11,7 @@ from agenda_modesta.clients.models import Cliente
 from agenda_modesta.projects.models import Projeto
 from agenda_modesta.agenda.models import Agenda
 from agenda_modesta.finance.models import Orcamento
-from agenda_modesta.core.utils import get_user_subscritor
+from agenda_modesta.core.utils import faixa_de_dias
 
 
 def _get_calendar_slug(subscritor):
@@ -24,8 +28,7 @@ def _get_calendar_slug(subscritor):
 
 @login_required
 def dashboard(request):
-    # Get or create subscritor for the user
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
 
     # Calendar slug for FullCalendar
     calendar_slug = _get_calendar_slug(subscritor)
@@ -41,7 +44,7 @@ def dashboard(request):
     today = timezone.now().date()
     agendamentos_hoje = Agenda.objects.filter(
         subscritor=subscritor,
-        data_inicio__date=today
+        **faixa_de_dias(today, today)
     ).count()
 
     # Pending orcamentos value
@@ -80,7 +83,7 @@ def dashboard(request):
 @login_required
 def proximos_agendamentos(request):
     """Partial HTMX: retorna os próximos 5 agendamentos (para polling)."""
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     proximos_agendamentos = Agenda.objects.filter(
         subscritor=subscritor,
         data_inicio__gte=timezone.now(),
@@ -89,3 +92,36 @@ def proximos_agendamentos(request):
     return render(request, 'pages/partials/proximos_agendamentos.html', {
         'proximos_agendamentos': proximos_agendamentos,
     })
+
+
+def metrics(request):
+    """
+    Métricas no formato texto do Prometheus.
+    Acesso por ``Authorization: Bearer <METRICS_TOKEN>`` (scraper) ou staff logado.
+    """
+    from agenda_modesta.core.metrics import renderizar_prometheus
+
+    token = getattr(settings, "METRICS_TOKEN", "")
+    auth = request.headers.get("Authorization", "")
+    autorizado = (token and constant_time_compare(auth, f"Bearer {token}")) or (
+        request.user.is_authenticated and request.user.is_staff
+    )
+    if not autorizado:
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        renderizar_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@staff_member_required
+def desempenho_views(request):
+    """Página staff: percentis de tempo e de queries por view e requests lentos recentes."""
+    from agenda_modesta.core.middleware import amostras_lentas, resumo_views
+
+    return render(request, 'pages/desempenho.html', {
+        'views': resumo_views(),
+        'amostras': amostras_lentas(),
+        'limite_lento_ms': getattr(settings, 'VIEW_METRICS_SLOW_MS', 500),
+    })
@@ -12,16 +12,16 @@ from .models import Orcamento, Recibo, PacoteServico
 from .forms import OrcamentoForm, ReciboForm, PacoteServicoForm
 from agenda_modesta.clients.models import Cliente
 from agenda_modesta.projects.models import Projeto
-from agenda_modesta.core.utils import get_user_subscritor
 
 
 # ============ ORÇAMENTOS ============
 
 @login_required
 def orcamento_list(request):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
+    # Os de cliente com exclusão em andamento somem junto com ele (core/exclusao.py)
     orcamentos = Orcamento.objects.filter(
-        subscritor=subscritor
+        subscritor=subscritor, cliente__excluido_em__isnull=True
     ).select_related('cliente', 'projeto').order_by('-data_criacao')
 
     clientes = Cliente.objects.filter(subscritor=subscritor, ativo=True)
@@ -65,7 +65,7 @@ def orcamento_list(request):
 
 @login_required
 def orcamento_create(request):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     clientes = Cliente.objects.filter(subscritor=subscritor, ativo=True)
     projetos = Projeto.objects.filter(subscritor=subscritor, ativo=True)
     pacotes = PacoteServico.objects.filter(subscritor=subscritor, ativo=True)
@@ -113,7 +113,7 @@ def orcamento_create(request):
 
 @login_required
 def orcamento_edit(request, pk):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     orcamento = get_object_or_404(Orcamento, pk=pk, subscritor=subscritor)
     clientes = Cliente.objects.filter(subscritor=subscritor, ativo=True)
     projetos = Projeto.objects.filter(subscritor=subscritor, ativo=True)
@@ -149,7 +149,7 @@ def orcamento_edit(request, pk):
 @login_required
 @require_http_methods(["DELETE"])
 def orcamento_delete(request, pk):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     orcamento = get_object_or_404(Orcamento, pk=pk, subscritor=subscritor)
     orcamento.delete()
     messages.success(request, 'Orçamento excluído com sucesso!')
@@ -159,17 +159,17 @@ def orcamento_delete(request, pk):
 @login_required
 @require_http_methods(["POST"])
 def orcamento_marcar_pago(request, pk):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     orcamento = get_object_or_404(Orcamento, pk=pk, subscritor=subscritor)
     orcamento.status_pagamento = 'pago'
-    orcamento.save()
+    orcamento.save(update_fields=['status_pagamento', 'data_atualizacao'])
     return render(request, 'finance/partials/orcamento_row.html', {'orcamento': orcamento})
 
 
 @login_required
 @require_http_methods(["POST"])
 def orcamento_enviar_email(request, pk):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     orcamento = get_object_or_404(Orcamento, pk=pk, subscritor=subscritor)
     # TODO: Implement email sending
     messages.success(request, f'Orçamento enviado para {orcamento.cliente.email}')
@@ -178,7 +178,7 @@ def orcamento_enviar_email(request, pk):
 
 @login_required
 def orcamento_pdf(request, pk):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     orcamento = get_object_or_404(Orcamento, pk=pk, subscritor=subscritor)
     # TODO: Generate PDF
     return HttpResponse("PDF generation not implemented", content_type='text/plain')
@@ -186,7 +186,7 @@ def orcamento_pdf(request, pk):
 
 @login_required
 def get_pacote_info(request):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     pacote_id = request.GET.get('pacote')
     if pacote_id:
         pacote = get_object_or_404(PacoteServico, pk=pacote_id, subscritor=subscritor)
@@ -202,9 +202,10 @@ def get_pacote_info(request):
 
 @login_required
 def recibo_list(request):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
+    # Os de cliente com exclusão em andamento somem junto com ele (core/exclusao.py)
     recibos = Recibo.objects.filter(
-        subscritor=subscritor
+        subscritor=subscritor, cliente__excluido_em__isnull=True
     ).select_related('cliente', 'projeto').order_by('-data_criacao')
 
     clientes = Cliente.objects.filter(subscritor=subscritor, ativo=True)
@@ -242,7 +243,7 @@ def recibo_list(request):
 
 @login_required
 def recibo_create(request):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     clientes = Cliente.objects.filter(subscritor=subscritor, ativo=True)
     projetos = Projeto.objects.filter(subscritor=subscritor, ativo=True)
 
@@ -271,7 +272,7 @@ def recibo_create(request):
 @login_required
 def recibo_from_orcamento(request, pk):
     """Create a recibo from an orcamento"""
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     orcamento = get_object_or_404(Orcamento, pk=pk, subscritor=subscritor)
 
     # Generate sequential number
@@ -297,7 +298,7 @@ def recibo_from_orcamento(request, pk):
 
 @login_required
 def recibo_detail(request, pk):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     recibo = get_object_or_404(Recibo, pk=pk, subscritor=subscritor)
     return render(request, 'finance/recibo_detail.html', {'recibo': recibo})
 
@@ -305,7 +306,7 @@ def recibo_detail(request, pk):
 @login_required
 @require_http_methods(["DELETE"])
 def recibo_delete(request, pk):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     recibo = get_object_or_404(Recibo, pk=pk, subscritor=subscritor)
     recibo.delete()
     messages.success(request, 'Recibo excluído com sucesso!')
@@ -315,7 +316,7 @@ def recibo_delete(request, pk):
 @login_required
 @require_http_methods(["POST"])
 def recibo_enviar_email(request, pk):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     recibo = get_object_or_404(Recibo, pk=pk, subscritor=subscritor)
     # TODO: Implement email sending
     messages.success(request, f'Recibo enviado para {recibo.cliente.email}')
@@ -324,7 +325,7 @@ def recibo_enviar_email(request, pk):
 
 @login_required
 def recibo_pdf(request, pk):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     recibo = get_object_or_404(Recibo, pk=pk, subscritor=subscritor)
     # TODO: Generate PDF
     return HttpResponse("PDF generation not implemented", content_type='text/plain')
@@ -334,7 +335,7 @@ def recibo_pdf(request, pk):
 
 @login_required
 def pacote_list(request):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     pacotes = PacoteServico.objects.filter(
         subscritor=subscritor
     ).order_by('-data_criacao')
@@ -344,7 +345,7 @@ def pacote_list(request):
 
 @login_required
 def pacote_create(request):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     if request.method == 'POST':
         form = PacoteServicoForm(request.POST)
         if form.is_valid():
@@ -372,7 +373,7 @@ def _get_money_amount(money_value):
 
 @login_required
 def pacote_edit(request, pk):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     pacote = get_object_or_404(PacoteServico, pk=pk, subscritor=subscritor)
 
     if request.method == 'POST':
@@ -395,7 +396,7 @@ def pacote_edit(request, pk):
 @login_required
 @require_http_methods(["DELETE"])
 def pacote_delete(request, pk):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     pacote = get_object_or_404(PacoteServico, pk=pk, subscritor=subscritor)
     pacote.delete()
     messages.success(request, 'Pacote excluído com sucesso!')
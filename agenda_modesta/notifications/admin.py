@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import EntregaNotificacao
+
+
+@admin.register(EntregaNotificacao)
+class EntregaNotificacaoAdmin(admin.ModelAdmin):
+    list_display = ["agenda", "tipo", "agendado_para", "status", "tentativas", "enviado_em"]
+    list_filter = ["tipo", "status"]
+    search_fields = ["agenda__titulo"]
+    readonly_fields = ["id", "criado_em", "enviado_em"]
+    raw_id_fields = ["agenda"]
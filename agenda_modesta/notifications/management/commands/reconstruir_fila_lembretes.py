@@ -0,0 +1,22 @@
+"""
+Management command para recriar a fila de timers de lembretes no Redis.
+
+Uso:
+  python manage.py reconstruir_fila_lembretes
+"""
+
+from django.core.management.base import BaseCommand
+
+from agenda_modesta.notifications.scheduler import fila_habilitada, reconstruir_fila
+
+
+class Command(BaseCommand):
+    help = "Recria a fila de lembretes (Redis ZSET) a partir dos agendamentos futuros."
+
+    def handle(self, *args, **options):
+        if not fila_habilitada():
+            self.stderr.write("REMINDER_TIMER_QUEUE_ENABLED está desligado.")
+            return
+
+        total = reconstruir_fila()
+        self.stdout.write(self.style.SUCCESS(f"Fila reconstruída: {total} lembretes."))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.11 on 2026-10-19 14:09
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('agenda', '0006_agenda_lembrete_pendente_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntregaNotificacao',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('confirmacao', 'Confirmação'), ('lembrete', 'Lembrete')], max_length=20)),
+                ('agendado_para', models.DateTimeField()),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('enviado', 'Enviado'), ('falhou', 'Falhou')], default='pendente', max_length=20)),
+                ('tentativas', models.PositiveSmallIntegerField(default=0)),
+                ('erro', models.TextField(blank=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('enviado_em', models.DateTimeField(blank=True, null=True)),
+                ('agenda', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entregas', to='agenda.agenda')),
+            ],
+            options={
+                'verbose_name': 'Entrega de notificação',
+                'verbose_name_plural': 'Entregas de notificações',
+                'indexes': [models.Index(condition=models.Q(('status', 'enviado')), fields=['enviado_em'], name='notif_entrega_enviado_idx'), models.Index(fields=['criado_em', 'status'], name='notif_entrega_criado_idx')],
+                'constraints': [models.UniqueConstraint(fields=('agenda', 'tipo', 'agendado_para'), name='notif_entrega_unica')],
+            },
+        ),
+    ]
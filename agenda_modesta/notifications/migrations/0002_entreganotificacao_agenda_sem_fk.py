@@ -0,0 +1,20 @@
+# Generated by Django 5.2.11 on 2026-10-19 15:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agenda', '0010_execucaosync'),
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='entreganotificacao',
+            name='agenda',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='entregas', to='agenda.agenda'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.11 on 2026-10-19 15:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_entreganotificacao_agenda_sem_fk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entreganotificacao',
+            name='reivindicado_em',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,118 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from agenda_modesta.agenda.models import Agenda
+
+
+class TipoNotificacao(models.TextChoices):
+    CONFIRMACAO = "confirmacao", "Confirmação"
+    LEMBRETE = "lembrete", "Lembrete"
+
+
+class StatusEntrega(models.TextChoices):
+    PENDENTE = "pendente", "Pendente"
+    ENVIADO = "enviado", "Enviado"
+    FALHOU = "falhou", "Falhou"
+
+
+class EntregaNotificacao(models.Model):
+    """
+    Registro de entrega de uma notificação (ledger idempotente).
+
+    A chave (agenda, tipo, agendado_para) é única: uma task só envia depois de
+    reivindicá-la, então retries e enfileiramentos duplicados não geram
+    e-mails repetidos.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    # Sem FK no banco: a Agenda é particionada e o Postgres não aceita FK
+    # para ``id`` sozinho (ver agenda/particoes.py). O CASCADE é do ORM.
+    agenda = models.ForeignKey(
+        Agenda,
+        on_delete=models.CASCADE,
+        related_name="entregas",
+        db_constraint=False,
+    )
+    tipo = models.CharField(max_length=20, choices=TipoNotificacao.choices)
+    # Instante a que a notificação se refere (início do agendamento na
+    # confirmação; início menos a antecedência no lembrete)
+    agendado_para = models.DateTimeField()
+
+    status = models.CharField(
+        max_length=20,
+        choices=StatusEntrega.choices,
+        default=StatusEntrega.PENDENTE,
+    )
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    erro = models.TextField(blank=True)
+
+    criado_em = models.DateTimeField(auto_now_add=True)
+    # Última reivindicação; uma entrega pendente há muito tempo foi perdida
+    reivindicado_em = models.DateTimeField(default=timezone.now)
+    enviado_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Entrega de notificação"
+        verbose_name_plural = "Entregas de notificações"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["agenda", "tipo", "agendado_para"],
+                name="notif_entrega_unica",
+            ),
+        ]
+        indexes = [
+            # "Enviados hoje"
+            models.Index(
+                fields=["enviado_em"],
+                condition=models.Q(status="enviado"),
+                name="notif_entrega_enviado_idx",
+            ),
+            # Taxa de falhas por período
+            models.Index(fields=["criado_em", "status"], name="notif_entrega_criado_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} – {self.agenda_id} ({self.status})"
+
+    @classmethod
+    def reivindicar(cls, agenda, tipo, agendado_para):
+        """
+        Reivindica a chave de idempotência antes do envio.
+
+        Retorna o registro quando esta chamada deve enviar, ou ``None`` se a
+        notificação já foi enviada ou está em andamento. Entregas que falharam
+        podem ser reivindicadas de novo, assim como as pendentes há mais de
+        ``EMAIL_ENTREGA_PENDENTE_EXPIRA_MINUTOS`` (o worker morreu depois de
+        reivindicar). Quando nenhuma task volta a ser chamada para a chave
+        (mensagem perdida da caixa de saída), quem reenvia é a varredura
+        ``retomar_entregas_pendentes``.
+        """
+        entrega, criada = cls.objects.get_or_create(
+            agenda=agenda,
+            tipo=tipo,
+            agendado_para=agendado_para,
+        )
+        if criada:
+            return entrega
+
+        agora = timezone.now()
+        expira = timedelta(minutes=getattr(settings, "EMAIL_ENTREGA_PENDENTE_EXPIRA_MINUTOS", 30))
+        if entrega.status == StatusEntrega.FALHOU:
+            filtro = models.Q(status=StatusEntrega.FALHOU)
+        elif entrega.status == StatusEntrega.PENDENTE and entrega.reivindicado_em < agora - expira:
+            filtro = models.Q(status=StatusEntrega.PENDENTE, reivindicado_em=entrega.reivindicado_em)
+        else:
+            return None
+
+        # Só um dos concorrentes encontra a linha ainda no estado lido
+        reivindicados = cls.objects.filter(filtro, pk=entrega.pk).update(
+            status=StatusEntrega.PENDENTE,
+            erro="",
+            reivindicado_em=agora,
+        )
+        return entrega if reivindicados else None
@@ -0,0 +1,251 @@
+"""
+Caixa de saída de e-mails com envio em lote.
+
+As tasks de notificação montam a mensagem e a colocam em uma lista no Redis;
+a task ``enviar_emails_pendentes`` roda ao fim de uma janela curta
+(``EMAIL_BATCH_WINDOW_SECONDS``), drena a lista e envia tudo por uma única
+sessão SMTP (``get_connection()`` + ``send_messages``). Cada mensagem é
+enviada e contabilizada individualmente: falhas voltam para a fila com o
+contador de tentativas incrementado, até ``MAX_TENTATIVAS``.
+
+Nada sai do Redis antes de o resultado estar no ledger: cada lote passa
+atomicamente (``LMOVE`` numa transação) para ``notifications:outbox:processando``
+e só é apagado de lá depois de ``_registrar_resultado``; as falhas do lote
+vão na mesma transação para ``notifications:outbox:retentar``. Se o worker
+morrer ou estourar o time limit no meio, a drenagem seguinte devolve as
+duas listas para a caixa de saída (entrega "pelo menos uma vez": um lote
+enviado mas não registrado sai de novo). Uma drenagem por vez, com lock.
+
+Com ``EMAIL_BATCHING_ENABLED=False`` (ex.: testes) a mensagem é enviada na
+hora, pelo mesmo caminho de envio.
+"""
+
+import json
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from agenda_modesta.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_KEY = "notifications:outbox"
+JANELA_KEY = "notifications:outbox:janela"
+PROCESSANDO_KEY = "notifications:outbox:processando"
+RETENTAR_KEY = "notifications:outbox:retentar"
+DRENAGEM_LOCK_KEY = "notifications:outbox:drenando"
+# Bem acima de uma drenagem normal; o lock expira sozinho se o worker morrer
+DRENAGEM_LOCK_TIMEOUT = 10 * 60
+MAX_TENTATIVAS = 3
+ATRASO_RETENTATIVA = 60  # segundos
+
+
+def lote_habilitado() -> bool:
+    return getattr(settings, "EMAIL_BATCHING_ENABLED", False)
+
+
+def _janela() -> int:
+    return getattr(settings, "EMAIL_BATCH_WINDOW_SECONDS", 5)
+
+
+def _tamanho_lote() -> int:
+    return getattr(settings, "EMAIL_BATCH_SIZE", 100)
+
+
+def montar_item(
+    tipo: str, agenda_id, assunto: str, mensagem: str, destinatarios, entrega_id=None,
+) -> dict:
+    """Item serializável da caixa de saída."""
+    return {
+        "tipo": tipo,
+        "agenda_id": str(agenda_id),
+        "entrega_id": str(entrega_id) if entrega_id else None,
+        "assunto": assunto,
+        "mensagem": mensagem,
+        "destinatarios": list(destinatarios),
+        "tentativas": 0,
+    }
+
+
+def _to_email(item: dict, connection) -> EmailMessage:
+    return EmailMessage(
+        subject=item["assunto"],
+        body=item["mensagem"],
+        from_email=None,  # usa DEFAULT_FROM_EMAIL
+        to=item["destinatarios"],
+        connection=connection,
+    )
+
+
+def enviar_lote(itens: list[dict]) -> tuple[list[dict], list[dict]]:
+    """
+    Envia os itens por uma única conexão SMTP.
+    Retorna (enviados, falhas); cada item é tratado isoladamente.
+    """
+    enviados, falhas = [], []
+    if not itens:
+        return enviados, falhas
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception:
+        logger.exception("Falha ao abrir conexão SMTP para %d e-mails", len(itens))
+        return enviados, list(itens)
+
+    try:
+        for item in itens:
+            try:
+                connection.send_messages([_to_email(item, connection)])
+            except Exception:
+                logger.exception(
+                    "Falha ao enviar e-mail %s da agenda %s", item["tipo"], item["agenda_id"],
+                )
+                falhas.append(item)
+            else:
+                enviados.append(item)
+    finally:
+        connection.close()
+
+    logger.info("Lote de e-mails enviado: ok=%d falhas=%d", len(enviados), len(falhas))
+    return enviados, falhas
+
+
+def _registrar_resultado(enviados: list[dict], falhas: list[dict], descartados: list[dict]):
+    """Atualiza o ledger de entregas (``EntregaNotificacao``) com o resultado do lote."""
+    from django.db.models import F
+    from django.utils import timezone
+
+    from .models import EntregaNotificacao, StatusEntrega
+
+    def _ids(itens):
+        return [item["entrega_id"] for item in itens if item.get("entrega_id")]
+
+    tentados = _ids(enviados) + _ids(falhas)
+    if tentados:
+        EntregaNotificacao.objects.filter(pk__in=tentados).update(tentativas=F("tentativas") + 1)
+    if enviados:
+        EntregaNotificacao.objects.filter(pk__in=_ids(enviados)).update(
+            status=StatusEntrega.ENVIADO,
+            enviado_em=timezone.now(),
+            erro="",
+        )
+    if descartados:
+        EntregaNotificacao.objects.filter(pk__in=_ids(descartados)).update(
+            status=StatusEntrega.FALHOU,
+            erro=f"Falha no envio após {MAX_TENTATIVAS} tentativas",
+        )
+
+
+def _agendar_drenagem(atraso: int):
+    """Agenda uma drenagem da caixa de saída, no máximo uma por janela."""
+    from .tasks import enviar_emails_pendentes
+
+    if get_redis().set(JANELA_KEY, 1, nx=True, ex=atraso):
+        enviar_emails_pendentes.apply_async(countdown=atraso)
+
+
+def enfileirar(item: dict):
+    """Coloca o item na caixa de saída (ou envia na hora se o lote estiver desligado)."""
+    if not lote_habilitado():
+        enviados, falhas = enviar_lote([item])
+        _registrar_resultado(enviados, falhas, descartados=falhas)
+        if falhas:
+            msg = f"Falha ao enviar e-mail {item['tipo']} da agenda {item['agenda_id']}"
+            raise RuntimeError(msg)
+        return
+
+    get_redis().rpush(OUTBOX_KEY, json.dumps(item))
+    _agendar_drenagem(_janela())
+
+
+def _retirar(limite: int) -> list[dict]:
+    """Move até ``limite`` itens da caixa de saída para a lista em processamento."""
+    pipe = get_redis().pipeline(transaction=True)
+    for _ in range(limite):
+        pipe.lmove(OUTBOX_KEY, PROCESSANDO_KEY, "LEFT", "RIGHT")
+    return [json.loads(bruto) for bruto in pipe.execute() if bruto is not None]
+
+
+def _concluir_lote(retentar: list[dict]):
+    """Tira o lote do processamento, guardando as falhas para a próxima drenagem."""
+    pipe = get_redis().pipeline(transaction=True)
+    if retentar:
+        pipe.rpush(RETENTAR_KEY, *(json.dumps(item) for item in retentar))
+    pipe.delete(PROCESSANDO_KEY)
+    pipe.execute()
+
+
+def _devolver(chave: str, *, inicio: bool) -> int:
+    """Devolve todos os itens de ``chave`` para o início ou o fim da caixa de saída."""
+    client = get_redis()
+    brutos = client.lrange(chave, 0, -1)
+    if not brutos:
+        return 0
+    pipe = client.pipeline(transaction=True)
+    if inicio:
+        # LPUSH insere um a um na frente: invertido, a ordem se mantém
+        pipe.lpush(OUTBOX_KEY, *reversed(brutos))
+    else:
+        pipe.rpush(OUTBOX_KEY, *brutos)
+    pipe.delete(chave)
+    pipe.execute()
+    return len(brutos)
+
+
+def drenar() -> tuple[int, int]:
+    """
+    Envia tudo que estiver na caixa de saída, em lotes de ``EMAIL_BATCH_SIZE``.
+    Falhas voltam para a fila (até ``MAX_TENTATIVAS``) e o resultado de cada
+    mensagem é gravado no ledger de entregas. Retorna (enviados, falhas).
+    """
+    client = get_redis()
+    lock = client.lock(DRENAGEM_LOCK_KEY, timeout=DRENAGEM_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        # Outra drenagem em curso; esta volta depois da janela
+        _agendar_drenagem(_janela())
+        return 0, 0
+
+    try:
+        # Novas mensagens que chegarem durante a drenagem abrem outra janela
+        client.delete(JANELA_KEY)
+        # Sobras de uma drenagem interrompida: o lote em curso volta para a frente
+        recuperados = _devolver(PROCESSANDO_KEY, inicio=True)
+        if recuperados:
+            logger.warning("%d e-mails de uma drenagem interrompida voltaram para a caixa de saída", recuperados)
+        _devolver(RETENTAR_KEY, inicio=False)
+
+        total_enviados = total_falhas = 0
+        retentativas = False
+        while True:
+            itens = _retirar(_tamanho_lote())
+            if not itens:
+                break
+            enviados, falhas = enviar_lote(itens)
+            total_enviados += len(enviados)
+            total_falhas += len(falhas)
+            retentar, descartados = [], []
+            for item in falhas:
+                item["tentativas"] += 1
+                if item["tentativas"] < MAX_TENTATIVAS:
+                    retentar.append(item)
+                else:
+                    descartados.append(item)
+                    logger.error(
+                        "E-mail %s da agenda %s descartado após %d tentativas",
+                        item["tipo"], item["agenda_id"], item["tentativas"],
+                    )
+            _registrar_resultado(enviados, falhas, descartados)
+            _concluir_lote(retentar)
+            retentativas = retentativas or bool(retentar)
+    finally:
+        try:
+            lock.release()
+        except Exception:  # lock expirado: outra drenagem pode já ter assumido
+            logger.warning("Lock da drenagem de e-mails expirou antes do fim")
+
+    if retentativas:
+        _agendar_drenagem(ATRASO_RETENTATIVA)
+
+    return total_enviados, total_falhas
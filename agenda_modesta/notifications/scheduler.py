@@ -0,0 +1,148 @@
+"""
+Fila de timers de lembretes em um sorted set do Redis.
+
+Cada agendamento com ``notificar_email`` vira um membro por antecedência
+configurada (``REMINDER_LEAD_TIMES_MINUTES``), com score igual ao instante
+em que o lembrete deve sair:
+
+    ZADD notifications:lembretes <timestamp> "<agenda_id>|<antecedencia_min>"
+
+Os signals de Agenda mantêm o ZSET atualizado (upsert no save, remoção no
+delete) e a task ``processar_fila_lembretes`` retira atomicamente os membros
+vencidos e dispara ``enviar_lembrete_agendamento``. Em regime normal o banco
+não é varrido; ``reconstruir_fila`` só é usado após perda do Redis.
+"""
+
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+from agenda_modesta.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+FILA_KEY = "notifications:lembretes"
+
+# Retira até ARGV[2] membros com score <= ARGV[1] de forma atômica: dois
+# pollers concorrentes nunca recebem o mesmo membro.
+_POP_VENCIDOS_LUA = """
+local itens = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #itens > 0 then
+    redis.call('ZREM', KEYS[1], unpack(itens))
+end
+return itens
+"""
+
+_pop_script = None
+
+
+def fila_habilitada() -> bool:
+    return getattr(settings, "REMINDER_TIMER_QUEUE_ENABLED", False)
+
+
+def _antecedencias() -> list[int]:
+    return list(getattr(settings, "REMINDER_LEAD_TIMES_MINUTES", [24 * 60]))
+
+
+def _membro(agenda_id, antecedencia: int) -> str:
+    return f"{agenda_id}|{antecedencia}"
+
+
+def parse_membro(membro) -> tuple[str, int]:
+    """Converte ``b"<agenda_id>|<min>"`` em (agenda_id, antecedencia_min)."""
+    if isinstance(membro, bytes):
+        membro = membro.decode()
+    agenda_id, _, antecedencia = membro.partition("|")
+    return agenda_id, int(antecedencia)
+
+
+def calcular_membros(agenda, agora=None) -> dict[str, float]:
+    """
+    Retorna {membro: score} dos lembretes futuros do agendamento.
+    Antecedências cujo horário já passou são ignoradas.
+    """
+    from datetime import timedelta
+
+    agora = agora or timezone.now()
+    if not agenda.notificar_email or agenda.data_inicio <= agora:
+        return {}
+
+    membros = {}
+    for antecedencia in _antecedencias():
+        disparo = agenda.data_inicio - timedelta(minutes=antecedencia)
+        if disparo > agora:
+            membros[_membro(agenda.pk, antecedencia)] = disparo.timestamp()
+    return membros
+
+
+def agendar_lembretes(agenda):
+    """Upsert dos lembretes do agendamento no ZSET (e remoção dos obsoletos)."""
+    membros = calcular_membros(agenda)
+    obsoletos = [
+        _membro(agenda.pk, antecedencia)
+        for antecedencia in _antecedencias()
+        if _membro(agenda.pk, antecedencia) not in membros
+    ]
+    pipe = get_redis().pipeline(transaction=True)
+    if obsoletos:
+        pipe.zrem(FILA_KEY, *obsoletos)
+    if membros:
+        pipe.zadd(FILA_KEY, membros)
+    pipe.execute()
+
+
+def cancelar_lembretes(agenda_id):
+    """Remove todos os lembretes pendentes do agendamento."""
+    membros = [_membro(agenda_id, antecedencia) for antecedencia in _antecedencias()]
+    get_redis().zrem(FILA_KEY, *membros)
+
+
+def pop_vencidos(agora=None, limite: int = 500) -> list[tuple[str, int]]:
+    """Retira atomicamente até ``limite`` lembretes vencidos da fila."""
+    global _pop_script  # noqa: PLW0603
+    if _pop_script is None:
+        _pop_script = get_redis().register_script(_POP_VENCIDOS_LUA)
+
+    agora = agora or timezone.now()
+    itens = _pop_script(keys=[FILA_KEY], args=[agora.timestamp(), limite])
+    return [parse_membro(item) for item in itens]
+
+
+def devolver(itens):
+    """Recoloca lembretes retirados (e não enfileirados) para o próximo poll."""
+    if not itens:
+        return
+    agora = timezone.now().timestamp()
+    get_redis().zadd(FILA_KEY, {_membro(agenda_id, ant): agora for agenda_id, ant in itens})
+
+
+def reconstruir_fila(lote: int = 2000) -> int:
+    """
+    Recria o ZSET a partir do banco (após flush/perda do Redis).
+    Varre apenas agendamentos futuros com notificação ativa.
+    """
+    from agenda_modesta.agenda.models import Agenda
+
+    client = get_redis()
+    agora = timezone.now()
+    agendamentos = (
+        Agenda.objects.filter(data_inicio__gt=agora, notificar_email=True)
+        .only("pk", "data_inicio", "notificar_email")
+        .order_by()
+        .iterator(chunk_size=lote)
+    )
+
+    total = 0
+    pipe = client.pipeline(transaction=False)
+    for agenda in agendamentos:
+        membros = calcular_membros(agenda, agora)
+        if membros:
+            pipe.zadd(FILA_KEY, membros)
+            total += len(membros)
+        if len(pipe) >= lote:
+            pipe.execute()
+    pipe.execute()
+
+    logger.info("Fila de lembretes reconstruída: %d membros", total)
+    return total
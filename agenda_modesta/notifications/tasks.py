@@ -5,10 +5,45 @@ Tasks Celery para envio de notificações por e-mail.
 import logging
 
 from celery import shared_task
-from django.core.mail import send_mail
+
+from agenda_modesta.core.metrics import Contador, Histograma
+
+from . import outbox
+from .models import EntregaNotificacao, StatusEntrega, TipoNotificacao
 
 logger = logging.getLogger(__name__)
 
+# Um sync de calendário não deve passar disso; o lock expira sozinho se o worker morrer
+SYNC_LOCK_TIMEOUT = 10 * 60
+
+RENOVACOES = Contador(
+    "google_webhook_renovacoes_total", "Canais do webhook do Google renovados por resultado (renovado, falhou).",
+)
+RENOVACAO_DURACAO = Histograma(
+    "google_webhook_renovacao_seconds", "Duração de cada execução de renovar_webhooks_google.",
+)
+
+
+def _liberar_entrega(entrega, exc):
+    """Marca a entrega como falha para que o retry da task possa reivindicá-la."""
+    EntregaNotificacao.objects.filter(pk=entrega.pk).update(
+        status=StatusEntrega.FALHOU,
+        erro=str(exc),
+    )
+
+
+def _montar_mensagem(agenda, introducao: str) -> str:
+    cliente_nome = agenda.projeto.cliente.nome if agenda.projeto and agenda.projeto.cliente else "N/A"
+    return (
+        f"Olá {agenda.usuario.nome_completo or agenda.usuario.name},\n\n"
+        f"{introducao}\n"
+        f"  Título : {agenda.titulo}\n"
+        f"  Início : {agenda.data_inicio:%d/%m/%Y %H:%M}\n"
+        f"  Fim    : {agenda.data_fim:%d/%m/%Y %H:%M}\n"
+        f"  Cliente: {cliente_nome}\n\n"
+        "Atenciosamente,\nEstúdio Modesto"
+    )
+
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
 def enviar_email_confirmacao_agenda(self, agenda_id: str):
@@ -21,36 +56,46 @@ def enviar_email_confirmacao_agenda(self, agenda_id: str):
         logger.warning("Agenda %s não encontrada para notificação.", agenda_id)
         return
 
-    cliente_nome = agenda.projeto.cliente.nome if agenda.projeto and agenda.projeto.cliente else "N/A"
-    assunto = f"Confirmação de agendamento – {agenda.titulo}"
-    mensagem = (
-        f"Olá {agenda.usuario.nome_completo or agenda.usuario.name},\n\n"
-        f"Seu agendamento está confirmado:\n"
-        f"  Título : {agenda.titulo}\n"
-        f"  Início : {agenda.data_inicio:%d/%m/%Y %H:%M}\n"
-        f"  Fim    : {agenda.data_fim:%d/%m/%Y %H:%M}\n"
-        f"  Cliente: {cliente_nome}\n"
-        f"  Local  : {agenda.local or '—'}\n\n"
-        "Atenciosamente,\nEstúdio Modesto"
+    entrega = EntregaNotificacao.reivindicar(agenda, TipoNotificacao.CONFIRMACAO, agenda.data_inicio)
+    if entrega is None:
+        logger.info("Confirmação da agenda %s já enviada ou em andamento.", agenda_id)
+        return
+
+    item = outbox.montar_item(
+        TipoNotificacao.CONFIRMACAO,
+        agenda_id,
+        assunto=f"Confirmação de agendamento – {agenda.titulo}",
+        mensagem=_montar_mensagem(agenda, "Seu agendamento está confirmado:"),
+        destinatarios=[agenda.usuario.email],
+        entrega_id=entrega.pk,
     )
 
     try:
-        send_mail(
-            subject=assunto,
-            message=mensagem,
-            from_email=None,  # usa DEFAULT_FROM_EMAIL
-            recipient_list=[agenda.usuario.email],
-            fail_silently=False,
-        )
-        logger.info("E-mail de confirmação enviado para %s (agenda %s)", agenda.usuario.email, agenda_id)
+        outbox.enfileirar(item)
+        logger.info("E-mail de confirmação enfileirado para %s (agenda %s)", agenda.usuario.email, agenda_id)
     except Exception as exc:
         logger.exception("Falha ao enviar e-mail para agenda %s", agenda_id)
+        _liberar_entrega(entrega, exc)
         raise self.retry(exc=exc)
 
 
+def _descrever_antecedencia(minutos: int | None) -> str:
+    """Texto do lembrete conforme a antecedência (ex.: "amanhã", "em 1h30")."""
+    if minutos is None or minutos == 24 * 60:
+        return "amanhã"
+    horas, resto = divmod(minutos, 60)
+    if not horas:
+        return f"em {resto} min"
+    return f"em {horas}h{resto:02d}" if resto else f"em {horas}h"
+
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def enviar_lembrete_agendamento(self, agenda_id: str):
+def enviar_lembrete_agendamento(self, agenda_id: str, antecedencia_minutos: int | None = None):
     """Envia lembrete de agendamento (ex.: 24h antes)."""
+    from datetime import timedelta
+
+    from django.utils import timezone
+
     from agenda_modesta.agenda.models import Agenda
 
     try:
@@ -59,49 +104,83 @@ def enviar_lembrete_agendamento(self, agenda_id: str):
         logger.warning("Agenda %s não encontrada para lembrete.", agenda_id)
         return
 
-    cliente_nome = agenda.projeto.cliente.nome if agenda.projeto and agenda.projeto.cliente else "N/A"
-    assunto = f"Lembrete de agendamento – {agenda.titulo}"
-    mensagem = (
-        f"Olá {agenda.usuario.nome_completo or agenda.usuario.name},\n\n"
-        f"Lembrete: você tem um agendamento amanhã.\n"
-        f"  Título : {agenda.titulo}\n"
-        f"  Início : {agenda.data_inicio:%d/%m/%Y %H:%M}\n"
-        f"  Fim    : {agenda.data_fim:%d/%m/%Y %H:%M}\n"
-        f"  Cliente: {cliente_nome}\n"
-        f"  Local  : {agenda.local or '—'}\n\n"
-        "Atenciosamente,\nEstúdio Modesto"
+    # Entradas da fila de timers podem sobreviver a uma edição concorrente
+    if not agenda.notificar_email or agenda.data_inicio <= timezone.now():
+        logger.info("Lembrete da agenda %s descartado (desativado ou já iniciado).", agenda_id)
+        return
+
+    agendado_para = agenda.data_inicio - timedelta(minutes=antecedencia_minutos or 24 * 60)
+    entrega = EntregaNotificacao.reivindicar(agenda, TipoNotificacao.LEMBRETE, agendado_para)
+    if entrega is None:
+        logger.info("Lembrete da agenda %s já enviado ou em andamento.", agenda_id)
+        return
+
+    introducao = f"Lembrete: você tem um agendamento {_descrever_antecedencia(antecedencia_minutos)}."
+    item = outbox.montar_item(
+        TipoNotificacao.LEMBRETE,
+        agenda_id,
+        assunto=f"Lembrete de agendamento – {agenda.titulo}",
+        mensagem=_montar_mensagem(agenda, introducao),
+        destinatarios=[agenda.usuario.email],
+        entrega_id=entrega.pk,
     )
 
     try:
-        send_mail(
-            subject=assunto,
-            message=mensagem,
-            from_email=None,
-            recipient_list=[agenda.usuario.email],
-            fail_silently=False,
-        )
-        logger.info("Lembrete enviado para %s (agenda %s)", agenda.usuario.email, agenda_id)
+        outbox.enfileirar(item)
+        logger.info("Lembrete enfileirado para %s (agenda %s)", agenda.usuario.email, agenda_id)
     except Exception as exc:
         logger.exception("Falha ao enviar lembrete para agenda %s", agenda_id)
+        _liberar_entrega(entrega, exc)
         raise self.retry(exc=exc)
 
 
+@shared_task
+def enviar_emails_pendentes():
+    """
+    Drena a caixa de saída e envia os e-mails acumulados na janela por uma
+    única conexão SMTP. Agendada automaticamente por ``outbox.enfileirar``;
+    pode também rodar no Celery Beat como rede de segurança.
+    """
+    if not outbox.lote_habilitado():
+        return 0
+    enviados, _falhas = outbox.drenar()
+    return enviados
+
+
+LOTE_LEMBRETES = 500
+
+
 @shared_task
 def verificar_lembretes():
     """
     Periodic task (Celery Beat) – busca agendamentos nas próximas 24h
     que ainda não foram notificados e dispara lembretes.
+
+    Só é usada quando a fila de timers está desligada
+    (``REMINDER_TIMER_QUEUE_ENABLED=False``); caso contrário os lembretes
+    saem por ``processar_fila_lembretes``.
+
+    Os agendamentos são reivindicados em lotes (SELECT … FOR UPDATE SKIP
+    LOCKED + UPDATE notificado=true na mesma transação), então duas execuções
+    sobrepostas nunca pegam a mesma linha e a memória fica limitada ao lote.
     """
     from datetime import timedelta
 
+    from celery import group
+    from django.db import transaction
     from django.utils import timezone
 
     from agenda_modesta.agenda.models import Agenda
+    from agenda_modesta.notifications.scheduler import fila_habilitada
+
+    if fila_habilitada():
+        logger.info("Fila de timers ativa; varredura de lembretes ignorada.")
+        return 0
 
     agora = timezone.now()
     limite = agora + timedelta(hours=24)
 
-    agendamentos = Agenda.objects.filter(
+    pendentes = Agenda.objects.filter(
         data_inicio__gte=agora,
         data_inicio__lte=limite,
         notificar_email=True,
@@ -109,15 +188,115 @@ def verificar_lembretes():
     )
 
     enviados = 0
-    for agenda in agendamentos:
-        enviar_lembrete_agendamento.delay(str(agenda.pk))
-        Agenda.objects.filter(pk=agenda.pk).update(notificado=True)
-        enviados += 1
+    while True:
+        with transaction.atomic():
+            ids = list(
+                pendentes.select_for_update(skip_locked=True)
+                .order_by()
+                .values_list("pk", flat=True)[:LOTE_LEMBRETES],
+            )
+            if not ids:
+                break
+            # Com a janela o UPDATE só abre as partições dela (agenda/particoes.py);
+            # as linhas estão travadas, a data não muda até o commit
+            Agenda.objects.filter(pk__in=ids, data_inicio__gte=agora, data_inicio__lte=limite).update(notificado=True)
+
+        try:
+            group(enviar_lembrete_agendamento.s(str(pk)) for pk in ids).apply_async()
+        except Exception:
+            # Devolve o lote para a próxima execução em vez de perder os lembretes
+            logger.exception("Erro ao enfileirar lote de %d lembretes", len(ids))
+            Agenda.objects.filter(pk__in=ids).update(notificado=False)
+            break
+        enviados += len(ids)
 
     logger.info("Lembretes enfileirados: %d", enviados)
     return enviados
 
 
+@shared_task
+def processar_fila_lembretes():
+    """
+    Periodic task (Celery Beat) – retira da fila de timers os lembretes
+    vencidos e dispara ``enviar_lembrete_agendamento`` para cada um.
+    Configurar no Django Admin do django-celery-beat com intervalo curto
+    (ex.: a cada 5 segundos); cada execução é O(log N + vencidos).
+    """
+    from celery import group
+
+    from agenda_modesta.notifications.scheduler import devolver, fila_habilitada, pop_vencidos
+
+    if not fila_habilitada():
+        return 0
+
+    enviados = 0
+    while True:
+        vencidos = pop_vencidos(limite=LOTE_LEMBRETES)
+        if not vencidos:
+            break
+        try:
+            group(
+                enviar_lembrete_agendamento.s(agenda_id, antecedencia)
+                for agenda_id, antecedencia in vencidos
+            ).apply_async()
+        except Exception:
+            logger.exception("Erro ao enfileirar %d lembretes da fila de timers", len(vencidos))
+            devolver(vencidos)
+            break
+        enviados += len(vencidos)
+
+    if enviados:
+        logger.info("Lembretes disparados pela fila de timers: %d", enviados)
+    return enviados
+
+
+@shared_task
+def retomar_entregas_pendentes():
+    """
+    Periodic task (Celery Beat) – reenvia notificações presas em "pendente"
+    há mais de ``EMAIL_ENTREGA_PENDENTE_EXPIRA_MINUTOS``: o worker morreu
+    depois de reivindicar ou a mensagem sumiu da caixa de saída no Redis.
+    Nada mais chama a task de envio de novo (a varredura e a fila de timers
+    já deram o lembrete por disparado). Configurar no Django Admin do
+    django-celery-beat para rodar a cada 5 minutos.
+
+    Cada entrega passa a "falhou" e a task de envio a reivindica de novo; se
+    a task a descartar (agendamento já começou, e-mail desligado), ela fica
+    em "falhou" e não volta a ser varrida.
+    """
+    from datetime import timedelta
+
+    from django.conf import settings
+    from django.utils import timezone
+
+    expira = timedelta(minutes=getattr(settings, "EMAIL_ENTREGA_PENDENTE_EXPIRA_MINUTOS", 30))
+    presas = EntregaNotificacao.objects.filter(
+        status=StatusEntrega.PENDENTE,
+        reivindicado_em__lt=timezone.now() - expira,
+    ).values_list("pk", "reivindicado_em", "agenda_id", "tipo", "agendado_para", "agenda__data_inicio")
+
+    reenviadas = 0
+    for pk, reivindicado_em, agenda_id, tipo, agendado_para, data_inicio in presas[:LOTE_LEMBRETES]:
+        # Só um dos concorrentes (outra varredura, a própria task) muda a linha
+        if not EntregaNotificacao.objects.filter(
+            pk=pk, status=StatusEntrega.PENDENTE, reivindicado_em=reivindicado_em,
+        ).update(status=StatusEntrega.FALHOU, erro="Entrega perdida; reenviada pela varredura"):
+            continue
+        if tipo == TipoNotificacao.CONFIRMACAO:
+            enviar_email_confirmacao_agenda.delay(str(agenda_id))
+        else:
+            # agendado_para = início - antecedência (ver enviar_lembrete_agendamento)
+            antecedencia = int((data_inicio - agendado_para).total_seconds() // 60)
+            if antecedencia <= 0:
+                continue  # o agendamento mudou de data: o lembrete antigo não vale mais
+            enviar_lembrete_agendamento.delay(str(agenda_id), antecedencia)
+        reenviadas += 1
+
+    if reenviadas:
+        logger.warning("Notificações presas em pendente reenviadas: %d", reenviadas)
+    return reenviadas
+
+
 # ---------------------------------------------------------------------------
 # Google Calendar – sincronização bilateral
 # ---------------------------------------------------------------------------
@@ -127,10 +306,19 @@ def verificar_lembretes():
 def sincronizar_google_calendar(self, subscritor_id: str, sync_token: str = ""):
     """
     Task Celery disparada pelo webhook do Google Calendar.
-    Faz sync incremental Google → App.
+    Faz sync incremental Google → App do calendário do subscritor. Sem
+    ``sync_token``, usa o do canal atual desse calendário.
+
+    Syncs de calendários diferentes rodam em paralelo; do mesmo calendário,
+    um de cada vez (lock no Redis). Quem encontra o lock ocupado se
+    reagenda para depois da janela de debounce do webhook.
     """
-    from agenda_modesta.agenda.google_calendar import sincronizar_eventos_google
-    from agenda_modesta.agenda.models import GoogleCalendarChannel
+    from django.conf import settings
+
+    from agenda_modesta.agenda.google_calendar import canal_atual, sincronizar_eventos_google
+    from agenda_modesta.agenda.google_quota import CotaGoogleExcedida
+    from agenda_modesta.agenda.models import OrigemSync
+    from agenda_modesta.core.redis_client import get_redis
     from agenda_modesta.subscriptions.models import Subscritor
 
     try:
@@ -139,60 +327,235 @@ def sincronizar_google_calendar(self, subscritor_id: str, sync_token: str = ""):
         logger.warning("Subscritor %s não encontrado para sync Google.", subscritor_id)
         return
 
+    calendar_id = subscritor.calendario_google
+    lock = get_redis().lock(f"google:sync:lock:{calendar_id}", timeout=SYNC_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        atraso = getattr(settings, "GOOGLE_WEBHOOK_DEBOUNCE_SECONDS", 5)
+        sincronizar_google_calendar.apply_async((subscritor_id, sync_token), countdown=max(atraso, 1))
+        return
+
     try:
+        channel = canal_atual(subscritor)
+        if not sync_token and channel:
+            sync_token = channel.sync_token
+
         new_token = sincronizar_eventos_google(
             subscritor=subscritor,
             usuario=subscritor.usuario,
             sync_token=sync_token,
+            origem=OrigemSync.WEBHOOK,
         )
 
-        # Atualizar sync_token no canal mais recente
-        channel = GoogleCalendarChannel.objects.filter(
-            subscritor=subscritor,
-        ).order_by("-criado_em").first()
+        # Atualizar sync_token no canal do calendário
         if channel and new_token:
             channel.sync_token = new_token
             channel.save(update_fields=["sync_token"])
 
-        logger.info("Sync Google finalizado para subscritor %s", subscritor_id)
+        logger.info("Sync Google finalizado para subscritor %s (%s)", subscritor_id, calendar_id)
+    except CotaGoogleExcedida as exc:
+        # Cota não é falha do sync: reagenda sem gastar as tentativas da task
+        logger.warning("Cota do Google esgotada no sync de %s; nova tentativa em %.1fs", calendar_id, exc.atraso)
+        sincronizar_google_calendar.apply_async((subscritor_id, sync_token), countdown=max(exc.atraso, 1))
     except Exception as exc:
         logger.exception("Erro no sync Google para subscritor %s", subscritor_id)
         raise self.retry(exc=exc)
+    finally:
+        try:
+            lock.release()
+        except Exception:  # lock expirado: outro sync pode já ter assumido
+            logger.warning("Lock do sync de %s expirou antes do fim", calendar_id)
+
+
+@shared_task(bind=True, max_retries=10)
+def reenviar_agenda_google(self, agenda_id: str):
+    """
+    Push App → Google adiado por falta de cota no request. Envia o estado
+    atual da agenda (o hash pula se outro push já levou este conteúdo).
+    """
+    from agenda_modesta.agenda.google_quota import CotaGoogleExcedida
+    from agenda_modesta.agenda.models import Agenda
+    from agenda_modesta.agenda.signals import GOOGLE_PUSH, enviar_agenda_google
+
+    agenda = Agenda.objects.select_related("subscritor").filter(pk=agenda_id).first()
+    if agenda is None:
+        return
+
+    try:
+        GOOGLE_PUSH.incrementar(acao=enviar_agenda_google(agenda))
+    except CotaGoogleExcedida as exc:
+        raise self.retry(exc=exc, countdown=max(exc.atraso, 1))
+    except Exception:
+        logger.exception("Erro no push adiado da agenda %s para o Google", agenda_id)
+
+
+@shared_task(bind=True, max_retries=10)
+def remover_evento_google(self, calendar_id: str, google_event_id: str):
+    """Remoção no Google adiada por falta de cota quando a Agenda foi apagada."""
+    from agenda_modesta.agenda.google_calendar import remover_evento
+    from agenda_modesta.agenda.google_quota import CotaGoogleExcedida
+
+    try:
+        remover_evento(calendar_id, google_event_id)
+    except CotaGoogleExcedida as exc:
+        raise self.retry(exc=exc, countdown=max(exc.atraso, 1))
+    except Exception as exc:
+        # Já removido no Google (à mão ou por outra tentativa)
+        if getattr(getattr(exc, "resp", None), "status", None) in (404, 410):
+            return
+        logger.exception("Erro na remoção adiada do evento %s no Google", google_event_id)
+
+
+def _renovar_canal(channel_pk) -> bool:
+    """
+    Renova um canal sem janela descoberta: registra o novo (herdando o
+    sync_token) e só depois de confirmado pelo Google para o antigo.
+    """
+    from agenda_modesta.agenda.google_calendar import cancelar_webhook, registrar_webhook
+    from agenda_modesta.agenda.models import GoogleCalendarChannel
+
+    try:
+        antigo = GoogleCalendarChannel.objects.select_related("subscritor").get(pk=channel_pk)
+        # O canal novo vai para o calendário atual do tenant; sync_token de
+        # outro calendário não vale lá
+        mesmo_calendario = antigo.google_calendar_id == antigo.subscritor.calendario_google
+        registrar_webhook(antigo.subscritor, sync_token=antigo.sync_token if mesmo_calendario else "")
+    except Exception:
+        logger.exception("Erro ao renovar webhook %s; canal antigo mantido", channel_pk)
+        return False
+    else:
+        cancelar_webhook(antigo)
+        logger.info("Webhook renovado para %s", antigo.subscritor)
+        return True
+
+
+def _renovar_canal_em_thread(channel_pk) -> bool:
+    from django.db import connection
+
+    try:
+        return _renovar_canal(channel_pk)
+    finally:
+        # Cada thread do pool abre a própria conexão
+        connection.close()
 
 
 @shared_task
 def renovar_webhooks_google():
     """
-    Periodic task (Celery Beat) – renova webhooks que expiram em < 2 dias.
+    Periodic task (Celery Beat) – renova webhooks que expiram em < 2 dias,
+    em paralelo (até ``GOOGLE_WEBHOOK_RENEWAL_WORKERS`` ao mesmo tempo).
     Configurar no Django Admin do django-celery-beat para rodar diariamente.
     """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
     from datetime import timedelta
 
+    from django.conf import settings
     from django.utils import timezone
 
-    from agenda_modesta.agenda.google_calendar import cancelar_webhook, registrar_webhook
     from agenda_modesta.agenda.models import GoogleCalendarChannel
 
+    inicio = time.perf_counter()
     limite = timezone.now() + timedelta(days=2)
-    channels = GoogleCalendarChannel.objects.filter(expiration__lte=limite)
+    canais = list(GoogleCalendarChannel.objects.filter(expiration__lte=limite).values_list("pk", flat=True))
 
-    renovados = 0
-    for ch in channels:
-        old_token = ch.sync_token
-        subscritor = ch.subscritor
-        try:
-            cancelar_webhook(ch)
-            result = registrar_webhook(subscritor)
+    renovados = falhas = 0
+    if canais:
+        workers = min(getattr(settings, "GOOGLE_WEBHOOK_RENEWAL_WORKERS", 8), len(canais))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="renovar-webhook") as pool:
+            for ok in pool.map(_renovar_canal_em_thread, canais):
+                renovados += ok
+                falhas += not ok
 
-            # Preservar o sync_token do canal antigo
-            GoogleCalendarChannel.objects.filter(
-                channel_id=result["channel_id"],
-            ).update(sync_token=old_token)
+    duracao = time.perf_counter() - inicio
+    if renovados:
+        RENOVACOES.incrementar(renovados, resultado="renovado")
+    if falhas:
+        RENOVACOES.incrementar(falhas, resultado="falhou")
+    RENOVACAO_DURACAO.observar(duracao)
 
-            renovados += 1
-            logger.info("Webhook renovado para %s", subscritor)
-        except Exception:
-            logger.exception("Erro ao renovar webhook para %s", subscritor)
+    logger.info("Webhooks renovados: %d, falhas: %d em %.1fs", renovados, falhas, duracao)
+    return {"renovados": renovados, "falhas": falhas, "duracao_s": round(duracao, 2)}
+
+
+@shared_task
+def purgar_execucoes_sync():
+    """
+    Periodic task (Celery Beat) – apaga a telemetria de sync (``ExecucaoSync``)
+    mais velha que ``GOOGLE_SYNC_EXECUCOES_RETENCAO_DIAS``. Configurar no
+    Django Admin do django-celery-beat para rodar diariamente.
+    """
+    from agenda_modesta.agenda.google_calendar import purgar_execucoes
+
+    apagadas = purgar_execucoes()
+    if apagadas:
+        logger.info("Execuções de sync antigas apagadas: %d", apagadas)
+    return apagadas
+
+
+# ---------------------------------------------------------------------------
+# Exclusão de Cliente/Projeto em segundo plano (core/exclusao.py)
+# ---------------------------------------------------------------------------
+
+
+@shared_task(bind=True, max_retries=5, default_retry_delay=60)
+def excluir_cliente_em_lotes(self, cliente_id: str):
+    """Apaga um cliente marcado como excluído; se o prazo acabar, continua noutra execução."""
+    from agenda_modesta.core.exclusao import excluir_cliente, prazo_task
+
+    try:
+        concluido = excluir_cliente(cliente_id, prazo_task())
+    except Exception as exc:
+        logger.exception("Erro ao excluir cliente %s", cliente_id)
+        raise self.retry(exc=exc)
+    if not concluido:
+        excluir_cliente_em_lotes.delay(cliente_id)
+
+
+@shared_task(bind=True, max_retries=5, default_retry_delay=60)
+def excluir_projeto_em_lotes(self, projeto_id: str):
+    """Apaga um projeto marcado como excluído; se o prazo acabar, continua noutra execução."""
+    from agenda_modesta.core.exclusao import excluir_projeto, prazo_task
+
+    try:
+        concluido = excluir_projeto(projeto_id, prazo_task())
+    except Exception as exc:
+        logger.exception("Erro ao excluir projeto %s", projeto_id)
+        raise self.retry(exc=exc)
+    if not concluido:
+        excluir_projeto_em_lotes.delay(projeto_id)
+
+
+@shared_task
+def retomar_exclusoes_pendentes():
+    """
+    Periodic task (Celery Beat) – reenfileira exclusões cuja task se perdeu
+    (worker morto, retries esgotados). Configurar no Django Admin do
+    django-celery-beat para rodar a cada hora.
+    """
+    from agenda_modesta.core.exclusao import exclusoes_pendentes
+
+    clientes, projetos = exclusoes_pendentes()
+    for cliente_id in clientes:
+        excluir_cliente_em_lotes.delay(str(cliente_id))
+    for projeto_id in projetos:
+        excluir_projeto_em_lotes.delay(str(projeto_id))
+    if clientes or projetos:
+        logger.warning("Exclusões retomadas: %d clientes, %d projetos", len(clientes), len(projetos))
+    return {"clientes": len(clientes), "projetos": len(projetos)}
+
+
+# ---------------------------------------------------------------------------
+# Partições da Agenda (agenda/particoes.py)
+# ---------------------------------------------------------------------------
+
+
+@shared_task
+def manter_particoes_agenda():
+    """
+    Periodic task (Celery Beat) – cria as partições mensais dos próximos
+    meses e arquiva os anos vencidos. Configurar no Django Admin do
+    django-celery-beat para rodar diariamente, fora do horário de pico.
+    """
+    from agenda_modesta.agenda.particoes import manter_particoes
 
-    logger.info("Webhooks renovados: %d", renovados)
-    return renovados
+    return manter_particoes()
@@ -0,0 +1,270 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from celery.exceptions import SoftTimeLimitExceeded
+from django.core import mail
+from django.utils import timezone
+
+from agenda_modesta.agenda.models import Agenda
+from agenda_modesta.notifications import outbox
+from agenda_modesta.notifications import scheduler
+from agenda_modesta.notifications import tasks
+from agenda_modesta.notifications.models import EntregaNotificacao
+from agenda_modesta.notifications.models import StatusEntrega
+from agenda_modesta.notifications.models import TipoNotificacao
+from agenda_modesta.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def _criar_agenda(user: User, inicio, **kwargs) -> Agenda:
+    agenda = Agenda.objects.create(
+        usuario=user,
+        subscritor=user.subscritor,
+        titulo="Sessão",
+        data_inicio=inicio,
+        data_fim=inicio + timedelta(hours=1),
+        notificar_email=False,  # evita o e-mail de confirmação no post_save
+    )
+    Agenda.objects.filter(pk=agenda.pk).update(**kwargs)
+    return agenda
+
+
+def test_verificar_lembretes_reivindica_em_lotes(user: User, monkeypatch):
+    agora = timezone.now()
+    devidos = [_criar_agenda(user, agora + timedelta(hours=h), notificar_email=True) for h in (1, 2, 3)]
+    _criar_agenda(user, agora + timedelta(hours=30), notificar_email=True)
+    _criar_agenda(user, agora + timedelta(hours=1), notificar_email=True, notificado=True)
+    monkeypatch.setattr(tasks, "LOTE_LEMBRETES", 2)
+
+    with mock.patch("celery.group") as group:
+        assert tasks.verificar_lembretes() == len(devidos)
+        assert tasks.verificar_lembretes() == 0
+
+    enfileirados = [sig.args[0] for call in group.call_args_list for sig in call.args[0]]
+    assert sorted(enfileirados) == sorted(str(a.pk) for a in devidos)
+    assert Agenda.objects.filter(notificado=False, notificar_email=True).count() == 1
+
+
+def test_calcular_membros_ignora_antecedencias_vencidas(settings):
+    settings.REMINDER_LEAD_TIMES_MINUTES = [24 * 60, 60]
+    agora = timezone.now()
+    agenda = Agenda(pk="a1", data_inicio=agora + timedelta(hours=3), notificar_email=True)
+
+    membros = scheduler.calcular_membros(agenda, agora)
+
+    assert membros == {"a1|60": (agenda.data_inicio - timedelta(hours=1)).timestamp()}
+    assert scheduler.parse_membro(b"a1|60") == ("a1", 60)
+
+    agenda.notificar_email = False
+    assert scheduler.calcular_membros(agenda, agora) == {}
+
+
+def test_enviar_email_confirmacao_agenda_idempotente(user: User):
+    agenda = _criar_agenda(user, timezone.now() + timedelta(days=2))
+
+    tasks.enviar_email_confirmacao_agenda(str(agenda.pk))
+    tasks.enviar_email_confirmacao_agenda(str(agenda.pk))  # retry/duplicata
+
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == [user.email]
+    assert agenda.titulo in mail.outbox[0].subject
+    entrega = EntregaNotificacao.objects.get(agenda=agenda)
+    assert entrega.status == StatusEntrega.ENVIADO
+    assert entrega.tentativas == 1
+
+
+def test_entrega_presa_em_pendente_pode_ser_reivindicada_depois_de_expirar(user: User, settings):
+    settings.EMAIL_ENTREGA_PENDENTE_EXPIRA_MINUTOS = 30
+    agenda = _criar_agenda(user, timezone.now() + timedelta(days=2))
+    # O worker reivindicou e morreu (ou a outbox sumiu num flush do Redis)
+    entrega = EntregaNotificacao.reivindicar(agenda, TipoNotificacao.CONFIRMACAO, agenda.data_inicio)
+    assert entrega.status == StatusEntrega.PENDENTE
+
+    # Ainda dentro do prazo: outra task considera em andamento
+    tasks.enviar_email_confirmacao_agenda(str(agenda.pk))
+    assert len(mail.outbox) == 0
+
+    EntregaNotificacao.objects.filter(pk=entrega.pk).update(
+        reivindicado_em=timezone.now() - timedelta(minutes=31),
+    )
+    tasks.enviar_email_confirmacao_agenda(str(agenda.pk))
+    tasks.enviar_email_confirmacao_agenda(str(agenda.pk))  # a nova reivindicação vale de novo
+
+    assert len(mail.outbox) == 1
+    assert EntregaNotificacao.objects.get(pk=entrega.pk).status == StatusEntrega.ENVIADO
+
+
+def test_varredura_reenvia_lembrete_perdido_da_caixa_de_saida(user: User, settings):
+    settings.EMAIL_ENTREGA_PENDENTE_EXPIRA_MINUTOS = 30
+    agenda = _criar_agenda(user, timezone.now() + timedelta(hours=3), notificar_email=True)
+
+    # Com lote ligado o item vai para o Redis... e some (flush, worker morto)
+    settings.EMAIL_BATCHING_ENABLED = True
+    with (
+        mock.patch.object(outbox, "get_redis", return_value=mock.Mock()),
+        mock.patch.object(outbox, "_agendar_drenagem"),
+    ):
+        tasks.enviar_lembrete_agendamento(str(agenda.pk), 60)
+    entrega = EntregaNotificacao.objects.get(agenda=agenda)
+    assert entrega.status == StatusEntrega.PENDENTE
+    assert len(mail.outbox) == 0
+
+    settings.EMAIL_BATCHING_ENABLED = False
+    reenviar = mock.patch.object(
+        tasks.enviar_lembrete_agendamento, "delay", side_effect=tasks.enviar_lembrete_agendamento,
+    )
+    with reenviar as delay:
+        assert tasks.retomar_entregas_pendentes() == 0  # ainda dentro do prazo
+        EntregaNotificacao.objects.filter(pk=entrega.pk).update(
+            reivindicado_em=timezone.now() - timedelta(minutes=31),
+        )
+        assert tasks.retomar_entregas_pendentes() == 1
+        assert tasks.retomar_entregas_pendentes() == 0
+
+    delay.assert_called_once_with(str(agenda.pk), 60)
+    assert len(mail.outbox) == 1
+    entrega.refresh_from_db()
+    assert entrega.status == StatusEntrega.ENVIADO
+    assert entrega.agendado_para == agenda.data_inicio - timedelta(hours=1)
+
+
+class _RedisEmMemoria:
+    """Só os comandos de lista que a caixa de saída usa."""
+
+    def __init__(self):
+        self.listas = {}
+        self.fila = None
+
+    def rpush(self, chave, *valores):
+        self.listas.setdefault(chave, []).extend(valores)
+
+    def lpush(self, chave, *valores):
+        for valor in valores:
+            self.listas.setdefault(chave, []).insert(0, valor)
+
+    def lmove(self, origem, destino, _de, _para):
+        if not self.listas.get(origem):
+            return None
+        valor = self.listas[origem].pop(0)
+        self.rpush(destino, valor)
+        return valor
+
+    def lrange(self, chave, _inicio, _fim):
+        return list(self.listas.get(chave, []))
+
+    def delete(self, chave):
+        self.listas.pop(chave, None)
+
+    def lock(self, _chave, timeout):
+        return mock.Mock(acquire=mock.Mock(return_value=True))
+
+    def pipeline(self, transaction=True):  # noqa: FBT002
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.comandos = []
+
+            def __getattr__(self, nome):
+                return lambda *args: self.comandos.append((nome, args))
+
+            def execute(self):
+                return [getattr(redis, nome)(*args) for nome, args in self.comandos]
+
+        return Pipeline()
+
+
+def test_drenagem_interrompida_nao_perde_o_lote(settings):
+    settings.EMAIL_BATCH_SIZE = 2
+    redis = _RedisEmMemoria()
+    itens = [
+        outbox.montar_item("lembrete", f"a{i}", "Assunto", "Corpo", ["x@example.com"])
+        for i in range(3)
+    ]
+    with (
+        mock.patch.object(outbox, "get_redis", return_value=redis),
+        mock.patch.object(outbox, "_agendar_drenagem"),
+    ):
+        redis.rpush(outbox.OUTBOX_KEY, *(json.dumps(item) for item in itens))
+        # Worker morto / soft time limit no meio do SMTP do primeiro lote
+        with (
+            mock.patch.object(outbox, "enviar_lote", side_effect=SoftTimeLimitExceeded),
+            pytest.raises(SoftTimeLimitExceeded),
+        ):
+            outbox.drenar()
+        assert len(redis.listas[outbox.PROCESSANDO_KEY]) == 2  # noqa: PLR2004
+        assert len(redis.listas[outbox.OUTBOX_KEY]) == 1
+
+        assert outbox.drenar() == (3, 0)
+
+    assert [m.to for m in mail.outbox] == [["x@example.com"]] * 3
+    assert not any(redis.listas.values())
+
+
+def test_enviar_lote_isola_falhas():
+    itens = [
+        outbox.montar_item("lembrete", f"a{i}", "Assunto", "Corpo", ["x@example.com"])
+        for i in range(3)
+    ]
+    itens[1]["destinatarios"] = ["invalido\n@example.com"]  # header injection → erro
+
+    enviados, falhas = outbox.enviar_lote(itens)
+
+    assert [item["agenda_id"] for item in enviados] == ["a0", "a2"]
+    assert [item["agenda_id"] for item in falhas] == ["a1"]
+    assert len(mail.outbox) == 2
+
+
+@pytest.mark.django_db
+def test_renovar_canal_registra_o_novo_antes_de_parar_o_antigo(settings):
+    from agenda_modesta.core.tests.factories import GoogleCalendarChannelFactory
+
+    settings.GOOGLE_CALENDAR_ID = "primary"
+    canal = GoogleCalendarChannelFactory(sync_token="tok-1")
+    ordem = []
+    with (
+        mock.patch(
+            "agenda_modesta.agenda.google_calendar.registrar_webhook",
+            side_effect=lambda sub, sync_token: ordem.append(("registrar", sync_token)),
+        ),
+        mock.patch(
+            "agenda_modesta.agenda.google_calendar.cancelar_webhook",
+            side_effect=lambda ch: ordem.append(("cancelar", ch.pk)),
+        ),
+    ):
+        assert tasks._renovar_canal(canal.pk) is True
+
+    assert ordem == [("registrar", "tok-1"), ("cancelar", canal.pk)]
+
+
+@pytest.mark.django_db
+def test_renovar_canal_mantem_o_antigo_se_o_registro_falhar():
+    from agenda_modesta.core.tests.factories import GoogleCalendarChannelFactory
+
+    canal = GoogleCalendarChannelFactory()
+    with (
+        mock.patch("agenda_modesta.agenda.google_calendar.registrar_webhook", side_effect=RuntimeError("quota")),
+        mock.patch("agenda_modesta.agenda.google_calendar.cancelar_webhook") as cancelar,
+    ):
+        assert tasks._renovar_canal(canal.pk) is False
+
+    cancelar.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_renovar_webhooks_google_conta_renovados_e_falhas():
+    from agenda_modesta.core.tests.factories import GoogleCalendarChannelFactory
+
+    vencendo = GoogleCalendarChannelFactory.create_batch(3, expiration=timezone.now() + timedelta(hours=5))
+    GoogleCalendarChannelFactory(expiration=timezone.now() + timedelta(days=10))
+    falha = vencendo[0].pk
+
+    with mock.patch.object(tasks, "_renovar_canal", side_effect=lambda pk: pk != falha) as renovar:
+        resultado = tasks.renovar_webhooks_google()
+
+    assert {c.args[0] for c in renovar.call_args_list} == {c.pk for c in vencendo}
+    assert resultado["renovados"] == 2  # noqa: PLR2004
+    assert resultado["falhas"] == 1
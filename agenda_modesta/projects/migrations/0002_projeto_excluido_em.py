@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 15:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projeto',
+            name='excluido_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
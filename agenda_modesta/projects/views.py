@@ -8,14 +8,14 @@ from django.views.decorators.http import require_http_methods
 from .models import Projeto
 from .forms import ProjetoForm
 from agenda_modesta.clients.models import Cliente
-from agenda_modesta.core.utils import get_user_subscritor
+from agenda_modesta.core.exclusao import marcar_projeto_excluido
 
 
 @login_required
 def project_list(request):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     projetos = Projeto.objects.filter(
-        subscritor=subscritor
+        subscritor=subscritor, excluido_em__isnull=True
     ).select_related('cliente').order_by('-data_criacao')
 
     clientes = Cliente.objects.filter(subscritor=subscritor, ativo=True)
@@ -51,7 +51,7 @@ def project_list(request):
 
 @login_required
 def project_create(request):
-    subscritor = get_user_subscritor(request.user)
+    subscritor = request.subscritor
     clientes = Cliente.objects.filter(subscritor=subscritor, ativo=True)
     cliente_selecionado = request.GET.get('cliente')
 
@@ -76,8 +76,8 @@ def project_create(request):
 
 @login_required
 def project_edit(request, pk):
-    subscritor = get_user_subscritor(request.user)
-    projeto = get_object_or_404(Projeto, pk=pk, subscritor=subscritor)
+    subscritor = request.subscritor
+    projeto = get_object_or_404(Projeto, pk=pk, subscritor=subscritor, excluido_em__isnull=True)
     clientes = Cliente.objects.filter(subscritor=subscritor, ativo=True)
 
     if request.method == 'POST':
@@ -98,16 +98,24 @@ def project_edit(request, pk):
 
 @login_required
 def project_detail(request, pk):
-    subscritor = get_user_subscritor(request.user)
-    projeto = get_object_or_404(Projeto, pk=pk, subscritor=subscritor)
-    return render(request, 'projects/project_detail.html', {'projeto': projeto})
+    subscritor = request.subscritor
+    projeto = get_object_or_404(
+        Projeto.objects.select_related('cliente'), pk=pk, subscritor=subscritor, excluido_em__isnull=True,
+    )
+    # Avaliados uma vez aqui: o template testa e itera cada lista
+    return render(request, 'projects/project_detail.html', {
+        'projeto': projeto,
+        'agendamentos_recentes': list(projeto.agendamentos.all()[:5]),
+        'orcamentos_recentes': list(projeto.orcamentos.order_by('-data_criacao')[:5]),
+    })
 
 
 @login_required
 @require_http_methods(["DELETE"])
 def project_delete(request, pk):
-    subscritor = get_user_subscritor(request.user)
-    projeto = get_object_or_404(Projeto, pk=pk, subscritor=subscritor)
-    projeto.delete()
+    subscritor = request.subscritor
+    projeto = get_object_or_404(Projeto, pk=pk, subscritor=subscritor, excluido_em__isnull=True)
+    # Some da lista na hora; agendamentos e orçamentos são desvinculados numa task
+    marcar_projeto_excluido(projeto)
     messages.success(request, 'Projeto excluído com sucesso!')
     return HttpResponse("")
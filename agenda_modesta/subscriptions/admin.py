@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Subscritor
+
+
+@admin.register(Subscritor)
+class SubscritorAdmin(admin.ModelAdmin):
+    list_display = ["__str__", "usuario", "google_calendar_id", "ativo", "data_criacao"]
+    list_filter = ["ativo"]
+    search_fields = ["nome_empresa", "usuario__username", "usuario__email", "google_calendar_id"]
+    readonly_fields = ["id", "data_criacao", "data_atualizacao"]
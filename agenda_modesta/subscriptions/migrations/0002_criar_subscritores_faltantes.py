@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def criar_subscritores_faltantes(apps, schema_editor):
+    """O Subscritor passa a ser criado só no cadastro; completa os usuários antigos."""
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Subscritor = apps.get_model("subscriptions", "Subscritor")
+    sem_subscritor = User.objects.filter(subscritor__isnull=True).values_list("pk", flat=True)
+    Subscritor.objects.bulk_create(
+        [Subscritor(usuario_id=pk) for pk in sem_subscritor.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("subscriptions", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_subscritores_faltantes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 14:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0002_criar_subscritores_faltantes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscritor',
+            name='google_calendar_id',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -15,8 +15,15 @@ class Subscritor(models.Model):
     logo = models.ImageField(upload_to='subscriptions/logos', null=True, blank=True)
 
     ativo = models.BooleanField(default=True)
+    # Calendário do Google do tenant; vazio usa o compartilhado (GOOGLE_CALENDAR_ID)
+    google_calendar_id = models.CharField(max_length=255, blank=True)
     data_criacao = models.DateTimeField(auto_now_add=True)
     data_atualizacao = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.nome_empresa or self.usuario.get_full_name()
+
+    @property
+    def calendario_google(self) -> str:
+        """ID do calendário do Google onde ficam os eventos do tenant."""
+        return self.google_calendar_id or getattr(settings, "GOOGLE_CALENDAR_ID", "")
@@ -1,9 +1,14 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.conf import settings
 
+from agenda_modesta.core.utils import invalidar_cache_subscritor
+
 from .models import Subscritor
 
+# Campos do usuário exibidos junto com o tenant (nome, logo, status)
+CAMPOS_USUARIO_DO_SUBSCRITOR = ("name", "nome_completo", "logo_empresa", "ativo")
+
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_subscritor(sender, instance, created, **kwargs):
@@ -15,10 +20,22 @@ def create_subscritor(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def save_subscritor(sender, instance, **kwargs):
+def save_subscritor(sender, instance, created, **kwargs):
     """
-    Save the Subscritor when the User is saved.
+    Touch the Subscritor when a User field it depends on changed.
+    Saves that only touch other fields (e.g. ``last_login`` on every login)
+    don't write to the subscriptions table.
     """
+    if created or not instance.alterou(*CAMPOS_USUARIO_DO_SUBSCRITOR):
+        return
     if hasattr(instance, 'subscritor'):
-        instance.subscritor.save()
+        instance.subscritor.save(update_fields=['data_atualizacao'])
+
 
+@receiver(post_save, sender=Subscritor)
+@receiver(post_delete, sender=Subscritor)
+def invalidar_subscritor_cacheado(sender, instance, **kwargs):
+    """
+    Remove do cache o contexto do tenant usado pelo SubscritorMiddleware.
+    """
+    invalidar_cache_subscritor(instance.usuario_id)
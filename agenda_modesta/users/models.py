@@ -4,8 +4,10 @@ from django.db.models import CharField
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
+from agenda_modesta.core.models import CamposAlteradosMixin
 
-class User(AbstractUser):
+
+class User(CamposAlteradosMixin, AbstractUser):
     """
     Default custom user model for Agenda Modesta.
     If adding fields that need to be filled at user signup,
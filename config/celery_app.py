@@ -2,6 +2,7 @@ import os
 
 from celery import Celery
 from celery.signals import setup_logging
+from kombu import Queue
 
 # set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
@@ -14,6 +15,94 @@ app = Celery("agenda_modesta")
 #   should have a `CELERY_` prefix.
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
+# Queues, routing and priorities
+# ------------------------------------------------------------------------------
+# Each workload has its own queue so a large Google full sync cannot starve
+# time-sensitive e-mails. Every queue is served by its own worker
+# (compose/production/django/celery/worker-<queue>/start) with concurrency and
+# prefetch tuned for it; the default "celery" queue keeps unrouted tasks.
+#   google-sync    – Google Calendar → app syncs (slow, I/O bound)
+#   notifications  – confirmation/reminder e-mails (latency sensitive)
+#   periodic       – Celery Beat sweeps and webhook renewal
+#   heavy          – bulk/maintenance jobs
+CELERY_QUEUES = ("celery", "google-sync", "notifications", "periodic", "heavy")
+
+app.conf.task_default_queue = "celery"
+app.conf.task_queues = tuple(Queue(name) for name in CELERY_QUEUES)
+# Redis emulates priorities with one list per step; 0 is the highest.
+app.conf.broker_transport_options = {
+    "priority_steps": list(range(10)),
+    "sep": ":",
+    "queue_order_strategy": "priority",
+}
+app.conf.task_default_priority = 5
+app.conf.task_routes = {
+    # notifications
+    "agenda_modesta.notifications.tasks.enviar_email_confirmacao_agenda": {
+        "queue": "notifications",
+        "priority": 0,
+    },
+    "agenda_modesta.notifications.tasks.enviar_emails_pendentes": {
+        "queue": "notifications",
+        "priority": 1,
+    },
+    "agenda_modesta.notifications.tasks.enviar_lembrete_agendamento": {
+        "queue": "notifications",
+        "priority": 3,
+    },
+    # periodic
+    "agenda_modesta.notifications.tasks.processar_fila_lembretes": {
+        "queue": "periodic",
+        "priority": 1,
+    },
+    "agenda_modesta.notifications.tasks.verificar_lembretes": {
+        "queue": "periodic",
+        "priority": 3,
+    },
+    "agenda_modesta.notifications.tasks.retomar_entregas_pendentes": {
+        "queue": "periodic",
+        "priority": 3,
+    },
+    "agenda_modesta.notifications.tasks.renovar_webhooks_google": {
+        "queue": "periodic",
+        "priority": 5,
+    },
+    "agenda_modesta.notifications.tasks.retomar_exclusoes_pendentes": {
+        "queue": "periodic",
+        "priority": 7,
+    },
+    "agenda_modesta.notifications.tasks.purgar_execucoes_sync": {
+        "queue": "periodic",
+        "priority": 7,
+    },
+    "agenda_modesta.notifications.tasks.manter_particoes_agenda": {
+        "queue": "periodic",
+        "priority": 7,
+    },
+    # google-sync
+    "agenda_modesta.notifications.tasks.sincronizar_google_calendar": {
+        "queue": "google-sync",
+        "priority": 5,
+    },
+    "agenda_modesta.notifications.tasks.reenviar_agenda_google": {
+        "queue": "google-sync",
+        "priority": 3,
+    },
+    "agenda_modesta.notifications.tasks.remover_evento_google": {
+        "queue": "google-sync",
+        "priority": 3,
+    },
+    # heavy
+    "agenda_modesta.notifications.tasks.excluir_cliente_em_lotes": {
+        "queue": "heavy",
+        "priority": 5,
+    },
+    "agenda_modesta.notifications.tasks.excluir_projeto_em_lotes": {
+        "queue": "heavy",
+        "priority": 5,
+    },
+}
+
 
 @setup_logging.connect
 def config_loggers(*args, **kwargs):
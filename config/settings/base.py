@@ -151,7 +151,10 @@ AUTH_PASSWORD_VALIDATORS = [
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    "agenda_modesta.core.middleware.MetricasViewMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    # Atende o webhook do Google sem sessão/auth (agenda/webhook.py)
+    "agenda_modesta.agenda.webhook.WebhookGoogleMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -159,6 +162,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "agenda_modesta.core.middleware.SubscritorMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
@@ -378,6 +382,63 @@ GOOGLE_CALENDAR_CREDENTIALS_FILE = env.str("GOOGLE_CALENDAR_CREDENTIALS_FILE", d
 GOOGLE_CALENDAR_CREDENTIALS_JSON = env.str("GOOGLE_CALENDAR_CREDENTIALS_JSON", default="")
 GOOGLE_CALENDAR_WEBHOOK_URL = env.str("GOOGLE_CALENDAR_WEBHOOK_URL", default="")
 GOOGLE_CALENDAR_TIMEZONE = env.str("GOOGLE_CALENDAR_TIMEZONE", default="America/Sao_Paulo")
+# Notificações do webhook dentro desta janela viram um único sync por subscritor
+GOOGLE_WEBHOOK_DEBOUNCE_SECONDS = env.int("GOOGLE_WEBHOOK_DEBOUNCE_SECONDS", default=5)
+# Canais pedem TTL menos um jitter aleatório, para as renovações não se concentrarem
+GOOGLE_WEBHOOK_TTL_DAYS = env.int("GOOGLE_WEBHOOK_TTL_DAYS", default=14)
+GOOGLE_WEBHOOK_EXPIRATION_JITTER_HOURS = env.int("GOOGLE_WEBHOOK_EXPIRATION_JITTER_HOURS", default=24)
+# Renovações simultâneas em renovar_webhooks_google
+GOOGLE_WEBHOOK_RENEWAL_WORKERS = env.int("GOOGLE_WEBHOOK_RENEWAL_WORKERS", default=8)
+# Limitador de chamadas à API (agenda/google_quota.py): token buckets no Redis,
+# compartilhados por web e workers. Taxas em requests/s; rajada = capacidade.
+GOOGLE_API_LIMITER_ENABLED = env.bool("GOOGLE_API_LIMITER_ENABLED", default=True)
+GOOGLE_API_TAXA_PROJETO = env.float("GOOGLE_API_TAXA_PROJETO", default=20)
+GOOGLE_API_RAJADA_PROJETO = env.int("GOOGLE_API_RAJADA_PROJETO", default=40)
+GOOGLE_API_TAXA_CALENDARIO = env.float("GOOGLE_API_TAXA_CALENDARIO", default=5)
+GOOGLE_API_RAJADA_CALENDARIO = env.int("GOOGLE_API_RAJADA_CALENDARIO", default=10)
+# Espera máxima por uma ficha e backoff (s) após 429/403 de cota
+GOOGLE_API_ESPERA_MAXIMA = env.float("GOOGLE_API_ESPERA_MAXIMA", default=30)
+GOOGLE_API_BACKOFF_BASE = env.float("GOOGLE_API_BACKOFF_BASE", default=1)
+GOOGLE_API_BACKOFF_MAXIMO = env.float("GOOGLE_API_BACKOFF_MAXIMO", default=64)
+GOOGLE_API_MAX_TENTATIVAS = env.int("GOOGLE_API_MAX_TENTATIVAS", default=5)
+# Loga requests e bytes trafegados por sync (google_calendar.medir_trafego)
+GOOGLE_API_MEDIR_TRAFEGO = env.bool("GOOGLE_API_MEDIR_TRAFEGO", default=False)
+# Dias de telemetria ExecucaoSync mantidos; a task purgar_execucoes_sync apaga o resto
+GOOGLE_SYNC_EXECUCOES_RETENCAO_DIAS = env.int("GOOGLE_SYNC_EXECUCOES_RETENCAO_DIAS", default=30)
+
+# EXCLUSÃO EM SEGUNDO PLANO (core/exclusao.py)
+# ------------------------------------------------------------------------------
+# Linhas apagadas/desvinculadas por transação ao excluir Cliente/Projeto
+EXCLUSAO_TAMANHO_LOTE = env.int("EXCLUSAO_TAMANHO_LOTE", default=500)
+# Tempo de cada execução da task antes de se reagendar (abaixo do soft time limit)
+EXCLUSAO_SEGUNDOS_POR_TASK = env.int("EXCLUSAO_SEGUNDOS_POR_TASK", default=30)
+
+# PARTICIONAMENTO DA AGENDA (agenda/particoes.py – só Postgres)
+# ------------------------------------------------------------------------------
+# Partições mensais criadas adiante pela task manter_particoes_agenda
+AGENDA_PARTICOES_MESES_A_FRENTE = env.int("AGENDA_PARTICOES_MESES_A_FRENTE", default=12)
+# Anos inteiros mais velhos que isso vão para uma partição anual compacta
+AGENDA_ARQUIVO_MESES = env.int("AGENDA_ARQUIVO_MESES", default=24)
+# Tablespace (disco mais barato) das partições de arquivo; vazio = o padrão
+AGENDA_ARQUIVO_TABLESPACE = env.str("AGENDA_ARQUIVO_TABLESPACE", default="")
+
+# METRICS (core/metrics.py – agregadas no Redis, expostas em /metrics/)
+# ------------------------------------------------------------------------------
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=True)
+# Token Bearer para o scraper do Prometheus; sem token só staff acessa
+METRICS_TOKEN = env.str("METRICS_TOKEN", default="")
+# Requests acima deste tempo têm a lista de queries amostrada (core/middleware.py)
+VIEW_METRICS_SLOW_MS = env.int("VIEW_METRICS_SLOW_MS", default=500)
+
+# REMINDERS (fila de timers no Redis – notifications/scheduler.py)
+# ------------------------------------------------------------------------------
+REMINDER_TIMER_QUEUE_ENABLED = env.bool("REMINDER_TIMER_QUEUE_ENABLED", default=True)
+# Antecedências dos lembretes, em minutos (ex.: 24h e 1h antes)
+REMINDER_LEAD_TIMES_MINUTES = env.list(
+    "REMINDER_LEAD_TIMES_MINUTES",
+    cast=int,
+    default=[24 * 60, 60],
+)
 
 # EMAIL
 # ------------------------------------------------------------------------------
@@ -390,3 +451,11 @@ EMAIL_PORT = env.int("EMAIL_PORT", default=587)
 EMAIL_HOST_USER = env("EMAIL_HOST_USER", default="")
 EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD", default="")
 EMAIL_USE_TLS = env.bool("EMAIL_USE_TLS", default=True)
+# Envio em lote (notifications/outbox.py): mensagens acumuladas por alguns
+# segundos e enviadas por uma única conexão SMTP
+EMAIL_BATCHING_ENABLED = env.bool("EMAIL_BATCHING_ENABLED", default=True)
+EMAIL_BATCH_WINDOW_SECONDS = env.int("EMAIL_BATCH_WINDOW_SECONDS", default=5)
+EMAIL_BATCH_SIZE = env.int("EMAIL_BATCH_SIZE", default=100)
+# Entrega presa em "pendente" além disso (worker morto, outbox perdida num
+# flush do Redis) pode ser reivindicada de novo; bem acima das retentativas
+EMAIL_ENTREGA_PENDENTE_EXPIRA_MINUTOS = env.int("EMAIL_ENTREGA_PENDENTE_EXPIRA_MINUTOS", default=30)
@@ -36,3 +36,10 @@ TEMPLATES[0]["OPTIONS"]["debug"] = True  # type: ignore[index]
 MEDIA_URL = "http://media.testserver/"
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Tests do not have a Redis server: reminders fall back to verificar_lembretes
+# e-mails are sent right away, metrics are dropped and Google calls skip the
+# rate limiter.
+REMINDER_TIMER_QUEUE_ENABLED = False
+EMAIL_BATCHING_ENABLED = False
+METRICS_ENABLED = False
+GOOGLE_API_LIMITER_ENABLED = False
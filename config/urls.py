@@ -9,11 +9,13 @@ from drf_spectacular.views import SpectacularAPIView
 from drf_spectacular.views import SpectacularSwaggerView
 from rest_framework.authtoken.views import obtain_auth_token
 
-from agenda_modesta.core.views import dashboard, proximos_agendamentos
+from agenda_modesta.core.views import dashboard, desempenho_views, metrics, proximos_agendamentos
 
 urlpatterns = [
     path("", dashboard, name="home"),
     path("proximos-agendamentos/", proximos_agendamentos, name="proximos_agendamentos"),
+    path("metrics/", metrics, name="metrics"),
+    path("desempenho/", desempenho_views, name="desempenho_views"),
     path(
         "about/",
         TemplateView.as_view(template_name="pages/about.html"),